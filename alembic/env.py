@@ -4,7 +4,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from app.database import DATABASE_URL
+from app.config import DATABASE_URL
 from app.models import Base
 
 # this is the Alembic Config object, which provides
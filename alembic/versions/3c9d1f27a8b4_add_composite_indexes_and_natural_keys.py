@@ -0,0 +1,71 @@
+"""Add composite indexes and natural key constraints
+
+Revision ID: 3c9d1f27a8b4
+Revises: be3a5332e6c1
+Create Date: 2026-10-18 10:12:41.502318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d1f27a8b4'
+down_revision: Union[str, None] = 'be3a5332e6c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns), the leading column of every composite index is the one the routers filter on
+INDEXES = [
+    ('ix_races_circuit', 'races', ['circuitId']),
+    ('ix_results_race_position_order', 'results', ['raceId', 'positionOrder']),
+    ('ix_results_driver_race', 'results', ['driverId', 'raceId']),
+    ('ix_results_constructor_race', 'results', ['constructorId', 'raceId']),
+    ('ix_results_status', 'results', ['statusId']),
+    ('ix_pit_stops_driver_race', 'pit_stops', ['driverId', 'raceId']),
+    ('ix_pit_stops_lap', 'pit_stops', ['lapId']),
+    ('ix_qualifying_race_driver', 'qualifying', ['raceId', 'driverId']),
+    ('ix_qualifying_driver_race', 'qualifying', ['driverId', 'raceId']),
+    ('ix_qualifying_constructor_race', 'qualifying', ['constructorId', 'raceId']),
+    ('ix_constructor_results_race_constructor', 'constructor_results', ['raceId', 'constructorId']),
+    ('ix_constructor_results_constructor_race', 'constructor_results', ['constructorId', 'raceId']),
+    ('ix_constructor_standings_constructor_race', 'constructor_standings', ['constructorId', 'raceId']),
+    ('ix_driver_standings_driver_race', 'driver_standings', ['driverId', 'raceId']),
+    ('ix_lap_times_driver_race', 'lap_times', ['driverId', 'raceId']),
+    ('ix_sprint_results_race_position_order', 'sprint_results', ['raceId', 'positionOrder']),
+    ('ix_sprint_results_driver_race', 'sprint_results', ['driverId', 'raceId']),
+    ('ix_sprint_results_constructor_race', 'sprint_results', ['constructorId', 'raceId']),
+]
+
+# Natural keys, each unique constraint is backed by a B-tree index that also serves lookups on its prefix
+UNIQUE_CONSTRAINTS = [
+    ('uq_drivers_driver_ref', 'drivers', ['driverRef']),
+    ('uq_seasons_year', 'seasons', ['year']),
+    ('uq_constructors_constructor_ref', 'constructors', ['constructorRef']),
+    ('uq_circuits_circuit_ref', 'circuits', ['circuitRef']),
+    ('uq_races_season_round', 'races', ['seasonId', 'round']),
+    ('uq_pit_stops_race_driver_stop', 'pit_stops', ['raceId', 'driverId', 'stop']),
+    ('uq_constructor_standings_race_constructor', 'constructor_standings', ['raceId', 'constructorId']),
+    ('uq_driver_standings_race_driver', 'driver_standings', ['raceId', 'driverId']),
+    ('uq_lap_times_race_driver_lap', 'lap_times', ['raceId', 'driverId', 'lap']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in UNIQUE_CONSTRAINTS:
+        op.create_unique_constraint(name, table, columns)
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    for table in {table for _, table, _ in INDEXES + UNIQUE_CONSTRAINTS}:
+        op.execute(f'ANALYZE {table}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    for name, table, _ in reversed(UNIQUE_CONSTRAINTS):
+        op.drop_constraint(name, table, type_='unique')
@@ -0,0 +1,34 @@
+"""Add table_versions change counters
+
+Revision ID: 5d2e8a61c0f7
+Revises: 3c9d1f27a8b4
+Create Date: 2026-10-18 14:03:27.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e8a61c0f7'
+down_revision: Union[str, None] = '3c9d1f27a8b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'table_versions',
+        sa.Column('tableName', sa.String(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('changedAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('tableName'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
@@ -0,0 +1,68 @@
+"""Add lap_gaps and lap_stints analytics views
+
+Revision ID: 8b41f7c2d9e3
+Revises: 5d2e8a61c0f7
+Create Date: 2026-10-18 15:21:09.640215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41f7c2d9e3'
+down_revision: Union[str, None] = '5d2e8a61c0f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Per lap of every driver: race time so far, gaps to the leader and to the car ahead at the end
+# of that lap, and the average of the last five laps
+LAP_GAPS = '''
+CREATE MATERIALIZED VIEW lap_gaps AS
+WITH cumulative AS (
+    SELECT "raceId", "driverId", lap, position, milliseconds,
+           SUM(milliseconds) OVER (PARTITION BY "raceId", "driverId" ORDER BY lap)::bigint AS "cumulativeMs",
+           ROUND(AVG(milliseconds) OVER (
+               PARTITION BY "raceId", "driverId" ORDER BY lap ROWS BETWEEN 4 PRECEDING AND CURRENT ROW
+           ))::int AS "rollingPaceMs"
+    FROM lap_times
+)
+SELECT "raceId", "driverId", lap, position, milliseconds, "cumulativeMs",
+       "cumulativeMs" - MIN("cumulativeMs") OVER (PARTITION BY "raceId", lap) AS "gapToLeaderMs",
+       "cumulativeMs" - LAG("cumulativeMs") OVER (PARTITION BY "raceId", lap ORDER BY "cumulativeMs", "driverId") AS "gapToAheadMs",
+       "rollingPaceMs"
+FROM cumulative
+'''
+
+# One row per stint, a stop on lap n ends the stint on lap n and the next one starts on lap n + 1
+LAP_STINTS = '''
+CREATE MATERIALIZED VIEW lap_stints AS
+SELECT l."raceId", l."driverId", s.stint,
+       MIN(l.lap) AS "startLap", MAX(l.lap) AS "endLap", COUNT(*)::int AS laps,
+       ROUND(AVG(l.milliseconds))::int AS "averageMs", MIN(l.milliseconds) AS "bestMs"
+FROM lap_times l
+CROSS JOIN LATERAL (
+    SELECT 1 + COUNT(*)::int AS stint
+    FROM pit_stops p
+    WHERE p."raceId" = l."raceId" AND p."driverId" = l."driverId" AND p.lap < l.lap
+) s
+GROUP BY l."raceId", l."driverId", s.stint
+'''
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(LAP_GAPS)
+    # Unique indexes let REFRESH MATERIALIZED VIEW CONCURRENTLY keep the views readable
+    op.create_index('uq_lap_gaps_race_lap_driver', 'lap_gaps', ['raceId', 'lap', 'driverId'], unique=True)
+    op.create_index('ix_lap_gaps_race_driver', 'lap_gaps', ['raceId', 'driverId', 'lap'])
+    op.execute(LAP_STINTS)
+    op.create_index('uq_lap_stints_race_driver_stint', 'lap_stints', ['raceId', 'driverId', 'stint'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP MATERIALIZED VIEW lap_stints')
+    op.execute('DROP MATERIALIZED VIEW lap_gaps')
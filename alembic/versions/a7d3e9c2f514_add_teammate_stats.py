@@ -0,0 +1,41 @@
+"""Add teammate_stats
+
+Revision ID: a7d3e9c2f514
+Revises: f3a6c1d8b2e4
+Create Date: 2026-10-18 22:31:54.903127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9c2f514'
+down_revision: Union[str, None] = 'f3a6c1d8b2e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'teammate_stats',
+        sa.Column('driverId', sa.Integer(), nullable=False),
+        sa.Column('teammateId', sa.Integer(), nullable=False),
+        sa.Column('seasonId', sa.Integer(), nullable=False),
+        sa.Column('constructorId', sa.Integer(), nullable=False),
+        sa.Column('races', sa.Integer(), nullable=False),
+        sa.Column('raceAhead', sa.Integer(), nullable=False),
+        sa.Column('qualifying', sa.Integer(), nullable=False),
+        sa.Column('qualifyingAhead', sa.Integer(), nullable=False),
+        sa.Column('laps', sa.Integer(), nullable=False),
+        sa.Column('paceGapMs', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('driverId', 'teammateId', 'seasonId', 'constructorId'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('teammate_stats')
@@ -0,0 +1,53 @@
+"""Change points columns to float
+
+Revision ID: b5e2c8f4a913
+Revises: a7d3e9c2f514
+Create Date: 2026-10-19 09:12:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e2c8f4a913'
+down_revision: Union[str, None] = 'a7d3e9c2f514'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Half points were awarded for shortened races, e.g. 4.5 for a win, an integer column drops the half
+POINTS_COLUMNS = [
+    ('results', 'points', True),
+    ('sprint_results', 'points', True),
+    ('constructor_results', 'points', True),
+    ('driver_standings', 'points', True),
+    ('constructor_standings', 'points', True),
+    ('driver_season_stats', 'points', False),
+    ('driver_season_stats', 'sprintPoints', False),
+    ('driver_career_stats', 'points', False),
+    ('driver_career_stats', 'sprintPoints', False),
+    ('constructor_season_stats', 'points', False),
+    ('constructor_season_stats', 'sprintPoints', False),
+    ('constructor_career_stats', 'points', False),
+    ('constructor_career_stats', 'sprintPoints', False),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column, nullable in POINTS_COLUMNS:
+        op.alter_column(table, column,
+                   existing_type=sa.Integer(),
+                   type_=sa.Float(),
+                   existing_nullable=nullable)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column, nullable in reversed(POINTS_COLUMNS):
+        op.alter_column(table, column,
+                   existing_type=sa.Float(),
+                   type_=sa.Integer(),
+                   existing_nullable=nullable)
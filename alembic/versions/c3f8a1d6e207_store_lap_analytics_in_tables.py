@@ -0,0 +1,101 @@
+"""Store lap_gaps and lap_stints in tables
+
+Revision ID: c3f8a1d6e207
+Revises: b5e2c8f4a913
+Create Date: 2026-10-19 10:04:17.552981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a1d6e207'
+down_revision: Union[str, None] = 'b5e2c8f4a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The queries of the 8b41f7c2d9e3 views, the loaders now run them per changed raceId
+LAP_GAPS = '''
+SELECT "raceId", "driverId", lap, position, milliseconds, "cumulativeMs",
+       "cumulativeMs" - MIN("cumulativeMs") OVER (PARTITION BY "raceId", lap) AS "gapToLeaderMs",
+       "cumulativeMs" - LAG("cumulativeMs") OVER (PARTITION BY "raceId", lap ORDER BY "cumulativeMs", "driverId") AS "gapToAheadMs",
+       "rollingPaceMs"
+FROM (
+    SELECT "raceId", "driverId", lap, position, milliseconds,
+           SUM(milliseconds) OVER (PARTITION BY "raceId", "driverId" ORDER BY lap)::bigint AS "cumulativeMs",
+           ROUND(AVG(milliseconds) OVER (
+               PARTITION BY "raceId", "driverId" ORDER BY lap ROWS BETWEEN 4 PRECEDING AND CURRENT ROW
+           ))::int AS "rollingPaceMs"
+    FROM lap_times
+) cumulative
+'''
+
+LAP_STINTS = '''
+SELECT l."raceId", l."driverId", s.stint,
+       MIN(l.lap) AS "startLap", MAX(l.lap) AS "endLap", COUNT(*)::int AS laps,
+       ROUND(AVG(l.milliseconds))::int AS "averageMs", MIN(l.milliseconds) AS "bestMs"
+FROM lap_times l
+CROSS JOIN LATERAL (
+    SELECT 1 + COUNT(*)::int AS stint
+    FROM pit_stops p
+    WHERE p."raceId" = l."raceId" AND p."driverId" = l."driverId" AND p.lap < l.lap
+) s
+GROUP BY l."raceId", l."driverId", s.stint
+'''
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('DROP MATERIALIZED VIEW lap_stints')
+    op.execute('DROP MATERIALIZED VIEW lap_gaps')
+    op.create_table(
+        'lap_gaps',
+        sa.Column('raceId', sa.Integer(), nullable=False),
+        sa.Column('lap', sa.Integer(), nullable=False),
+        sa.Column('driverId', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=True),
+        sa.Column('milliseconds', sa.Integer(), nullable=True),
+        sa.Column('cumulativeMs', sa.BigInteger(), nullable=True),
+        sa.Column('gapToLeaderMs', sa.BigInteger(), nullable=True),
+        sa.Column('gapToAheadMs', sa.BigInteger(), nullable=True),
+        sa.Column('rollingPaceMs', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('raceId', 'lap', 'driverId'),
+    )
+    op.create_index('ix_lap_gaps_race_driver', 'lap_gaps', ['raceId', 'driverId', 'lap'])
+    op.create_table(
+        'lap_stints',
+        sa.Column('raceId', sa.Integer(), nullable=False),
+        sa.Column('driverId', sa.Integer(), nullable=False),
+        sa.Column('stint', sa.Integer(), nullable=False),
+        sa.Column('startLap', sa.Integer(), nullable=True),
+        sa.Column('endLap', sa.Integer(), nullable=True),
+        sa.Column('laps', sa.Integer(), nullable=True),
+        sa.Column('averageMs', sa.Integer(), nullable=True),
+        sa.Column('bestMs', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('raceId', 'driverId', 'stint'),
+    )
+    op.execute(f'''
+        INSERT INTO lap_gaps ("raceId", "driverId", lap, position, milliseconds, "cumulativeMs",
+                              "gapToLeaderMs", "gapToAheadMs", "rollingPaceMs")
+        {LAP_GAPS}
+    ''')
+    op.execute(f'''
+        INSERT INTO lap_stints ("raceId", "driverId", stint, "startLap", "endLap", laps, "averageMs", "bestMs")
+        {LAP_STINTS}
+    ''')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('lap_stints')
+    op.drop_index('ix_lap_gaps_race_driver', table_name='lap_gaps')
+    op.drop_table('lap_gaps')
+    op.execute(f'CREATE MATERIALIZED VIEW lap_gaps AS {LAP_GAPS}')
+    op.create_index('uq_lap_gaps_race_lap_driver', 'lap_gaps', ['raceId', 'lap', 'driverId'], unique=True)
+    op.create_index('ix_lap_gaps_race_driver', 'lap_gaps', ['raceId', 'driverId', 'lap'])
+    op.execute(f'CREATE MATERIALIZED VIEW lap_stints AS {LAP_STINTS}')
+    op.create_index('uq_lap_stints_race_driver_stint', 'lap_stints', ['raceId', 'driverId', 'stint'], unique=True)
@@ -0,0 +1,71 @@
+"""Add integer millisecond columns for the lap and qualifying time strings
+
+Revision ID: c7a9e5d13f60
+Revises: 8b41f7c2d9e3
+Create Date: 2026-10-18 16:02:44.915370
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a9e5d13f60'
+down_revision: Union[str, None] = '8b41f7c2d9e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same function as app.models.LAP_TIME_MS_FUNCTION at the time of this revision
+LAP_TIME_MS_FUNCTION = r'''
+CREATE OR REPLACE FUNCTION lap_time_ms(value text) RETURNS integer
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE
+        WHEN value ~ '^\d+:\d{1,2}:\d{1,2}(\.\d+)?$' THEN round((
+            split_part(value, ':', 1)::numeric * 3600 + split_part(value, ':', 2)::numeric * 60 + split_part(value, ':', 3)::numeric
+        ) * 1000)::integer
+        WHEN value ~ '^\d+:\d{1,2}(\.\d+)?$' THEN round((
+            split_part(value, ':', 1)::numeric * 60 + split_part(value, ':', 2)::numeric
+        ) * 1000)::integer
+        WHEN value ~ '^\d+(\.\d+)?$' THEN round(value::numeric * 1000)::integer
+    END
+$$
+'''
+
+# (table, new column, time string column). Generated columns are filled for every existing row
+# while the column is added, one rewrite per table instead of a row by row backfill.
+TIME_COLUMNS = [
+    ('results', 'fastestLapMs', 'fastestLapTime'),
+    ('sprint_results', 'fastestLapMs', 'fastestLapTime'),
+    ('qualifying', 'q1Ms', 'q1'),
+    ('qualifying', 'q2Ms', 'q2'),
+    ('qualifying', 'q3Ms', 'q3'),
+]
+
+INDEXES = [
+    ('ix_lap_times_race_milliseconds', 'lap_times', ['raceId', 'milliseconds']),
+    ('ix_results_race_fastest_lap', 'results', ['raceId', 'fastestLapMs']),
+    ('ix_qualifying_race_position', 'qualifying', ['raceId', 'position']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(LAP_TIME_MS_FUNCTION)
+    for table, column, source in TIME_COLUMNS:
+        op.add_column(table, sa.Column(column, sa.Integer(), sa.Computed(f'lap_time_ms("{source}")', persisted=True)))
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    for table in {table for table, _, _ in TIME_COLUMNS} | {table for _, table, _ in INDEXES}:
+        op.execute(f'ANALYZE {table}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    for table, column, _ in reversed(TIME_COLUMNS):
+        op.drop_column(table, column)
+    op.execute('DROP FUNCTION lap_time_ms(text)')
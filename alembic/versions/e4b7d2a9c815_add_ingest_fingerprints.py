@@ -0,0 +1,47 @@
+"""Add ingest_files and ingest_partitions fingerprints
+
+Revision ID: e4b7d2a9c815
+Revises: c7a9e5d13f60
+Create Date: 2026-10-18 18:42:09.517230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7d2a9c815'
+down_revision: Union[str, None] = 'c7a9e5d13f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'ingest_files',
+        sa.Column('tableName', sa.String(), nullable=False),
+        sa.Column('fileName', sa.String(), nullable=False),
+        sa.Column('fingerprint', sa.String(), nullable=False),
+        sa.Column('rows', sa.Integer(), nullable=False),
+        sa.Column('highWaterRaceId', sa.Integer(), nullable=True),
+        sa.Column('loadedAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('tableName'),
+    )
+    op.create_table(
+        'ingest_partitions',
+        sa.Column('tableName', sa.String(), nullable=False),
+        sa.Column('raceId', sa.Integer(), nullable=False),
+        sa.Column('fingerprint', sa.String(), nullable=False),
+        sa.Column('rows', sa.Integer(), nullable=False),
+        sa.Column('loadedAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('tableName', 'raceId'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ingest_partitions')
+    op.drop_table('ingest_files')
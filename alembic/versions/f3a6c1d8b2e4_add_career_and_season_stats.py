@@ -0,0 +1,58 @@
+"""Add driver and constructor career and season stats
+
+Revision ID: f3a6c1d8b2e4
+Revises: e4b7d2a9c815
+Create Date: 2026-10-18 21:05:37.284611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a6c1d8b2e4'
+down_revision: Union[str, None] = 'e4b7d2a9c815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, key columns), the rows are filled by python -m app.stats
+TABLES = [
+    ('driver_season_stats', ['driverId', 'seasonId']),
+    ('driver_career_stats', ['driverId']),
+    ('constructor_season_stats', ['constructorId', 'seasonId']),
+    ('constructor_career_stats', ['constructorId']),
+]
+
+
+def stat_columns():
+    return [
+        sa.Column('races', sa.Integer(), nullable=False),
+        sa.Column('wins', sa.Integer(), nullable=False),
+        sa.Column('podiums', sa.Integer(), nullable=False),
+        sa.Column('poles', sa.Integer(), nullable=False),
+        sa.Column('fastestLaps', sa.Integer(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('sprintWins', sa.Integer(), nullable=False),
+        sa.Column('sprintPoints', sa.Integer(), nullable=False),
+        sa.Column('bestFinish', sa.Integer(), nullable=True),
+        sa.Column('dnfs', sa.Integer(), nullable=False),
+        sa.Column('dnfsByStatus', postgresql.JSONB(astext_type=sa.Text()), server_default='{}', nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, keys in TABLES:
+        columns = [sa.Column(key, sa.Integer(), nullable=False) for key in keys]
+        if 'seasonId' not in keys:
+            columns.append(sa.Column('seasons', sa.Integer(), nullable=False))
+        op.create_table(table, *columns, *stat_columns(), sa.PrimaryKeyConstraint(*keys))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _ in reversed(TABLES):
+        op.drop_table(table)
@@ -0,0 +1,89 @@
+import time
+
+from sqlalchemy import text
+
+from app.changes import notify
+from app.compare import affected_seasons
+from app.database import engine
+from app.models import LapGap, LapStint
+
+# Lap analytics derived from lap_times and pit_stops, stored in the lap_gaps and lap_stints tables
+# and refreshed by the loaders after those tables change. Every row only depends on the laps and
+# stops of its own race, so the rows of the changed races are deleted and computed again and a
+# post-race refresh costs one race. Tables rather than materialized views because a view can only
+# be refreshed whole.
+
+# Tables the analytics are computed from
+SOURCE_TABLES = {"lap_times", "pit_stops"}
+
+ANALYTICS_TABLES = [LapGap.__tablename__, LapStint.__tablename__]
+
+# Per lap of every driver: race time so far, gaps to the leader and to the car ahead at the end
+# of that lap, and the average of the last five laps
+LAP_GAPS_SQL = '''
+INSERT INTO lap_gaps ("raceId", "driverId", lap, position, milliseconds, "cumulativeMs",
+                      "gapToLeaderMs", "gapToAheadMs", "rollingPaceMs")
+WITH cumulative AS (
+    SELECT "raceId", "driverId", lap, position, milliseconds,
+           SUM(milliseconds) OVER (PARTITION BY "raceId", "driverId" ORDER BY lap)::bigint AS "cumulativeMs",
+           ROUND(AVG(milliseconds) OVER (
+               PARTITION BY "raceId", "driverId" ORDER BY lap ROWS BETWEEN 4 PRECEDING AND CURRENT ROW
+           ))::int AS "rollingPaceMs"
+    FROM lap_times
+    WHERE true{races}
+)
+SELECT "raceId", "driverId", lap, position, milliseconds, "cumulativeMs",
+       "cumulativeMs" - MIN("cumulativeMs") OVER (PARTITION BY "raceId", lap) AS "gapToLeaderMs",
+       "cumulativeMs" - LAG("cumulativeMs") OVER (PARTITION BY "raceId", lap ORDER BY "cumulativeMs", "driverId") AS "gapToAheadMs",
+       "rollingPaceMs"
+FROM cumulative
+'''
+
+# One row per stint, a stop on lap n ends the stint on lap n and the next one starts on lap n + 1
+LAP_STINTS_SQL = '''
+INSERT INTO lap_stints ("raceId", "driverId", stint, "startLap", "endLap", laps, "averageMs", "bestMs")
+SELECT l."raceId", l."driverId", s.stint,
+       MIN(l.lap), MAX(l.lap), COUNT(*)::int,
+       ROUND(AVG(l.milliseconds))::int, MIN(l.milliseconds)
+FROM lap_times l
+CROSS JOIN LATERAL (
+    SELECT 1 + COUNT(*)::int AS stint
+    FROM pit_stops p
+    WHERE p."raceId" = l."raceId" AND p."driverId" = l."driverId" AND p.lap < l.lap
+) s
+WHERE true{races}
+GROUP BY l."raceId", l."driverId", s.stint
+'''
+
+REFRESH_SQL = {
+    LapGap.__tablename__: LAP_GAPS_SQL,
+    LapStint.__tablename__: LAP_STINTS_SQL,
+}
+
+
+def refresh_analytics(connection, race_ids=None):
+    """Recompute the analytics in the connection's transaction, readers keep the old rows until it commits.
+
+    race_ids limits the refresh to those races, None refreshes every race.
+    """
+    seasons = affected_seasons(connection, race_ids) if race_ids is not None else None
+    if seasons is not None and not seasons:
+        return
+    races = ' AND "raceId" = ANY(:race_ids)' if race_ids is not None else ''
+    params = {'race_ids': sorted(race_ids)} if race_ids is not None else {}
+    connection.execute(text('SET LOCAL statement_timeout = 0'))
+    for table, insert in REFRESH_SQL.items():
+        connection.execute(text(f'DELETE FROM {table} WHERE true{races}'), params)
+        connection.execute(text(insert.format(races=races)), params)
+    notify(connection, set(ANALYTICS_TABLES), seasons)
+
+
+def refresh_all():
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        refresh_analytics(connection)
+    print(f"✅ Refreshed {', '.join(ANALYTICS_TABLES)} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    refresh_all()
@@ -0,0 +1,296 @@
+from typing import Optional
+
+from sqlalchemy import case, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    Constructor,
+    Driver, Season, Circuit, Status, Race, Result, PitStop, LapTime, Qualifying, SprintResult,
+    ConstructorResult, ConstructorStanding, DriverStanding, LapGap, LapStint
+)
+from app.fast_json import select_rows
+from app.pagination import Page, paginate_async
+from app.query_spec import ListQuery
+
+# Read functions used by the GET routes, the write helpers are in crud.py.
+# The write functions and the loaders stay on the sync engine. List functions of the large
+# tables take the response schema to select only its columns as row tuples, see app/fast_json.py.
+# The top level list routes take a ListQuery with their filters, fields and sort, see app/query_spec.py.
+
+
+async def get_by_id(db: AsyncSession, model, key, value: int, options=()):
+    return await db.scalar(select(model).where(key == value).options(*options))
+
+
+async def exists(db: AsyncSession, key, value: int):
+    return await db.scalar(select(key).where(key == value)) is not None
+
+
+async def list_rows(db: AsyncSession, query: ListQuery, page: Optional[Page] = None):
+    """Rows of a list route, filtered, projected and sorted by its query in one statement."""
+    return await paginate_async(db, query.statement(), page, *query.keys())
+
+
+async def children(db: AsyncSession, statement, page: Optional[Page], parent_key, parent_id: int, *keys):
+    """Child rows selected by foreign key, None when the parent does not exist.
+
+    The parent is only looked up when no rows come back, so a hit is one statement.
+    """
+    rows = await paginate_async(db, statement, page, *keys)
+    if not rows and not await exists(db, parent_key, parent_id):
+        return None
+    return rows
+
+
+# --------------- DRIVER ---------------
+async def get_drivers(db: AsyncSession, page: Optional[Page] = None):
+    return await paginate_async(db, select(Driver), page, Driver.driverId)
+
+async def get_driver_by_id(db: AsyncSession, driver_id: int):
+    return await get_by_id(db, Driver, Driver.driverId, driver_id)
+
+async def get_results_from_driver(db: AsyncSession, driver_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(Result, schema).where(Result.driverId == driver_id), page, Driver.driverId, driver_id, Result.resultId)
+
+async def get_qualifying_from_driver(db: AsyncSession, driver_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(Qualifying, schema).where(Qualifying.driverId == driver_id), page, Driver.driverId, driver_id, Qualifying.qualifyId)
+
+async def get_pit_stops_from_driver(db: AsyncSession, driver_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(PitStop, schema).where(PitStop.driverId == driver_id), page, Driver.driverId, driver_id, PitStop.pitStopId)
+
+async def get_lap_times_from_driver(db: AsyncSession, driver_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(LapTime, schema).where(LapTime.driverId == driver_id), page, Driver.driverId, driver_id, LapTime.lapId)
+
+async def get_driver_standings_from_driver(db: AsyncSession, driver_id: int, page: Optional[Page] = None):
+    return await children(db, select(DriverStanding).where(DriverStanding.driverId == driver_id), page, Driver.driverId, driver_id, DriverStanding.driverStandingsId)
+
+async def get_sprint_results_from_driver(db: AsyncSession, driver_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(SprintResult, schema).where(SprintResult.driverId == driver_id), page, Driver.driverId, driver_id, SprintResult.sprintResultId)
+
+async def get_races_by_driver_id(db: AsyncSession, driver_id: int, page: Optional[Page] = None):
+    """Get all unique races where the driver has participated (via results)."""
+    statement = select(Race).join(Result).where(Result.driverId == driver_id).distinct()
+    return await children(db, statement, page, Driver.driverId, driver_id, Race.raceId)
+
+
+#----------------------------Driver Standings-----------------------------
+async def get_driver_standings(db: AsyncSession, query: ListQuery, page: Optional[Page] = None):
+    return await list_rows(db, query, page)
+
+async def get_driver_standing_by_id(db: AsyncSession, standing_id: int):
+    return await get_by_id(db, DriverStanding, DriverStanding.driverStandingsId, standing_id)
+
+
+# --------------- CIRCUIT ---------------
+async def get_circuits(db: AsyncSession, page: Optional[Page] = None):
+    return await paginate_async(db, select(Circuit), page, Circuit.circuitId)
+
+async def get_circuit(db: AsyncSession, circuit_id: int, options=()):
+    return await get_by_id(db, Circuit, Circuit.circuitId, circuit_id, options)
+
+async def get_races_on_circuit(db: AsyncSession, circuit_id: int, page: Optional[Page] = None):
+    return await children(db, select(Race).where(Race.circuitId == circuit_id), page, Circuit.circuitId, circuit_id, Race.raceId)
+
+
+# --------------- RACE ---------------
+async def get_races(db: AsyncSession, query: ListQuery, page: Optional[Page] = None):
+    return await list_rows(db, query, page)
+
+async def get_race(db: AsyncSession, race_id: int):
+    return await get_by_id(db, Race, Race.raceId, race_id)
+
+async def get_results_from_race(db: AsyncSession, race_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(Result, schema).where(Result.raceId == race_id), page, Race.raceId, race_id, Result.resultId)
+
+async def get_sprint_results_from_race(db: AsyncSession, race_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(SprintResult, schema).where(SprintResult.raceId == race_id), page, Race.raceId, race_id, SprintResult.sprintResultId)
+
+async def get_qualifying_from_race(db: AsyncSession, race_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(Qualifying, schema).where(Qualifying.raceId == race_id), page, Race.raceId, race_id, Qualifying.qualifyId)
+
+async def get_pit_stops_from_race(db: AsyncSession, race_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(PitStop, schema).where(PitStop.raceId == race_id), page, Race.raceId, race_id, PitStop.pitStopId)
+
+async def get_laps_from_race(db: AsyncSession, race_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(LapTime, schema).where(LapTime.raceId == race_id), page, Race.raceId, race_id, LapTime.lapId)
+
+async def get_driver_standings_from_race(db: AsyncSession, race_id: int, page: Optional[Page] = None):
+    return await children(db, select(DriverStanding).where(DriverStanding.raceId == race_id), page, Race.raceId, race_id, DriverStanding.driverStandingsId)
+
+async def get_constructor_results_from_race(db: AsyncSession, race_id: int, page: Optional[Page] = None):
+    return await children(db, select(ConstructorResult).where(ConstructorResult.raceId == race_id), page, Race.raceId, race_id, ConstructorResult.constructorResultsId)
+
+async def get_constructor_standings_from_race(db: AsyncSession, race_id: int, page: Optional[Page] = None):
+    return await children(db, select(ConstructorStanding).where(ConstructorStanding.raceId == race_id), page, Race.raceId, race_id, ConstructorStanding.constructorStandingsId)
+
+
+# --------------- RACE ANALYTICS ---------------
+async def get_lap_gaps_from_race(db: AsyncSession, race_id: int, driver_id: Optional[int] = None, page: Optional[Page] = None, schema=None):
+    statement = select_rows(LapGap, schema).where(LapGap.raceId == race_id)
+    if driver_id:
+        statement = statement.where(LapGap.driverId == driver_id)
+    return await children(db, statement, page, Race.raceId, race_id, LapGap.lap, LapGap.driverId)
+
+async def get_stints_from_race(db: AsyncSession, race_id: int, driver_id: Optional[int] = None, page: Optional[Page] = None, schema=None):
+    statement = select_rows(LapStint, schema).where(LapStint.raceId == race_id)
+    if driver_id:
+        statement = statement.where(LapStint.driverId == driver_id)
+    return await children(db, statement, page, Race.raceId, race_id, LapStint.driverId, LapStint.stint)
+
+
+# --------------- TIMING ---------------
+def fastest_laps():
+    """Fastest timed lap of every race, one scan of the (raceId, milliseconds) index per race."""
+    fastest = (
+        select(LapTime.driverId, LapTime.lap, LapTime.time, LapTime.milliseconds)
+        .where(LapTime.raceId == Race.raceId, LapTime.milliseconds.isnot(None))
+        .order_by(LapTime.milliseconds, LapTime.lap)
+        .limit(1)
+        .lateral()
+    )
+    return select(
+        Race.raceId, Race.round, fastest.c.driverId, fastest.c.lap, fastest.c.time, fastest.c.milliseconds
+    ).join(fastest, true())
+
+async def get_fastest_lap(db: AsyncSession, race_id: int):
+    return (await db.execute(fastest_laps().where(Race.raceId == race_id))).first()
+
+async def get_fastest_laps_from_season(db: AsyncSession, season_id: int):
+    return await children(db, fastest_laps().where(Race.seasonId == season_id), None, Season.seasonId, season_id, Race.round)
+
+async def get_poles_from_season(db: AsyncSession, season_id: int):
+    """Pole sitter of every race with the time of the last session they set one in."""
+    sessions = ((Qualifying.q3Ms, Qualifying.q3), (Qualifying.q2Ms, Qualifying.q2), (Qualifying.q1Ms, Qualifying.q1))
+    pole_time = case(*((milliseconds.isnot(None), time) for milliseconds, time in sessions))
+    pole_ms = case(*((milliseconds.isnot(None), milliseconds) for milliseconds, _ in sessions))
+    statement = (
+        select(Race.raceId, Race.round, Qualifying.driverId, Qualifying.constructorId, pole_time, pole_ms)
+        .join(Qualifying, (Qualifying.raceId == Race.raceId) & (Qualifying.position == 1))
+        .where(Race.seasonId == season_id)
+    )
+    return await children(db, statement, None, Season.seasonId, season_id, Race.round)
+
+def standings_after_round(model, entity, season_id: int, after_round: Optional[int] = None):
+    """Standings of the last round of the season up to after_round that has any, the stored rows are per round snapshots."""
+    last_race = select(Race.raceId).where(Race.seasonId == season_id, select(model.raceId).where(model.raceId == Race.raceId).exists())
+    if after_round is not None:
+        last_race = last_race.where(Race.round <= after_round)
+    last_race = last_race.order_by(Race.round.desc()).limit(1).scalar_subquery()
+    return (
+        select(model.raceId, Race.round, entity, model.points, model.position, model.positionText, model.wins)
+        .join(Race, Race.raceId == model.raceId)
+        .where(model.raceId == last_race)
+    )
+
+async def get_driver_standings_from_season(db: AsyncSession, season_id: int, after_round: Optional[int] = None):
+    statement = standings_after_round(DriverStanding, DriverStanding.driverId, season_id, after_round)
+    return await children(db, statement, None, Season.seasonId, season_id, DriverStanding.position, DriverStanding.driverId)
+
+async def get_constructor_standings_from_season(db: AsyncSession, season_id: int, after_round: Optional[int] = None):
+    statement = standings_after_round(ConstructorStanding, ConstructorStanding.constructorId, season_id, after_round)
+    return await children(db, statement, None, Season.seasonId, season_id, ConstructorStanding.position, ConstructorStanding.constructorId)
+
+
+# --------------- SEASON ---------------
+async def get_seasons(db: AsyncSession, page: Optional[Page] = None):
+    return await paginate_async(db, select(Season), page, Season.seasonId)
+
+async def get_season(db: AsyncSession, season_id: int):
+    return await get_by_id(db, Season, Season.seasonId, season_id)
+
+async def get_races_from_seasons(db: AsyncSession, season_id: int, page: Optional[Page] = None):
+    return await children(db, select(Race).where(Race.seasonId == season_id), page, Season.seasonId, season_id, Race.raceId)
+
+
+# --------------- LAP TIME ---------------
+async def get_lap_times(db: AsyncSession, query: ListQuery, page: Optional[Page] = None):
+    return await list_rows(db, query, page)
+
+async def get_lap_time(db: AsyncSession, lap_id: int):
+    return await get_by_id(db, LapTime, LapTime.lapId, lap_id)
+
+
+# --------------------------- Results ---------------------------------------
+async def get_results_all(db: AsyncSession, query: ListQuery, page: Optional[Page] = None):
+    return await list_rows(db, query, page)
+
+async def get_results_by_id(db: AsyncSession, result_id: int):
+    return await get_by_id(db, Result, Result.resultId, result_id)
+
+
+# -------------------------------- Sprint Results -------------------------------------------------------
+async def get_sprint_results(db: AsyncSession, query: ListQuery, page: Optional[Page] = None):
+    return await list_rows(db, query, page)
+
+async def get_sprint_result_by_id(db: AsyncSession, sprint_result_id: int):
+    return await get_by_id(db, SprintResult, SprintResult.sprintResultId, sprint_result_id)
+
+
+#-----------------------------------Qualifying--------------------------------------------------
+async def get_qualifying_id(db: AsyncSession, qualify_id: int):
+    return await get_by_id(db, Qualifying, Qualifying.qualifyId, qualify_id)
+
+
+# --------------------------------Status----------------------------------------
+async def get_statuses(db: AsyncSession, page: Optional[Page] = None, options=()):
+    return await paginate_async(db, select(Status).options(*options), page, Status.statusId)
+
+async def get_status_by_id(db: AsyncSession, status_id: int):
+    return await get_by_id(db, Status, Status.statusId, status_id)
+
+async def get_results_from_status(db: AsyncSession, status_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(Result, schema).where(Result.statusId == status_id), page, Status.statusId, status_id, Result.resultId)
+
+async def get_sprint_results_from_status(db: AsyncSession, status_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(SprintResult, schema).where(SprintResult.statusId == status_id), page, Status.statusId, status_id, SprintResult.sprintResultId)
+
+
+#-------------------------------- Pit stops ---------------------------------------
+async def get_pit_stops(db: AsyncSession, query: ListQuery, page: Optional[Page] = None):
+    return await list_rows(db, query, page)
+
+async def get_pit_stop_by_id(db: AsyncSession, pit_stop_id: int):
+    return await get_by_id(db, PitStop, PitStop.pitStopId, pit_stop_id)
+
+async def get_pit_stop_by_lap(db: AsyncSession, pit_stop_id: int):
+    statement = select(LapTime).join(PitStop, PitStop.lapId == LapTime.lapId).where(PitStop.pitStopId == pit_stop_id)
+    return await db.scalar(statement)
+
+
+#-----------------------------ConstructorStandings------------------------------
+async def get_constructor_standings(db: AsyncSession, query: ListQuery, page: Optional[Page] = None):
+    return await list_rows(db, query, page)
+
+async def get_constructor_standing_by_id(db: AsyncSession, standing_id: int):
+    return await get_by_id(db, ConstructorStanding, ConstructorStanding.constructorStandingsId, standing_id)
+
+
+#-----------------------------ConstructorResults------------------------------
+async def get_constructor_results(db: AsyncSession, query: ListQuery, page: Optional[Page] = None):
+    return await list_rows(db, query, page)
+
+async def get_constructor_result_by_id(db: AsyncSession, result_id: int):
+    return await get_by_id(db, ConstructorResult, ConstructorResult.constructorResultsId, result_id)
+
+
+#----------------------------Constructor-----------------------------------------
+async def get_constructors(db: AsyncSession, page: Optional[Page] = None):
+    return await paginate_async(db, select(Constructor), page, Constructor.constructorId)
+
+async def get_constructor_by_id(db: AsyncSession, constructor_id: int):
+    return await get_by_id(db, Constructor, Constructor.constructorId, constructor_id)
+
+async def get_constructor_standings_by_constructor(db: AsyncSession, constructor_id: int, page: Optional[Page] = None):
+    return await children(db, select(ConstructorStanding).where(ConstructorStanding.constructorId == constructor_id), page, Constructor.constructorId, constructor_id, ConstructorStanding.constructorStandingsId)
+
+async def get_constructor_results_by_constructor(db: AsyncSession, constructor_id: int, page: Optional[Page] = None):
+    return await children(db, select(ConstructorResult).where(ConstructorResult.constructorId == constructor_id), page, Constructor.constructorId, constructor_id, ConstructorResult.constructorResultsId)
+
+async def get_results_from_constructor(db: AsyncSession, constructor_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(Result, schema).where(Result.constructorId == constructor_id), page, Constructor.constructorId, constructor_id, Result.resultId)
+
+async def get_qualifying_constructor(db: AsyncSession, constructor_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(Qualifying, schema).where(Qualifying.constructorId == constructor_id), page, Constructor.constructorId, constructor_id, Qualifying.qualifyId)
+
+async def get_constructor_sprint_results(db: AsyncSession, constructor_id: int, page: Optional[Page] = None, schema=None):
+    return await children(db, select_rows(SprintResult, schema).where(SprintResult.constructorId == constructor_id), page, Constructor.constructorId, constructor_id, SprintResult.sprintResultId)
@@ -0,0 +1,282 @@
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+from sqlalchemy import text
+
+from app.analytics import SOURCE_TABLES, refresh_analytics
+from app.changes import notify
+from app.config import DATA_DIR
+from app.csv_specs import TABLE_SPECS, RejectionStats, TableSpec
+from app.database import engine
+from app.models import Race, PitStop
+from app.compare import SOURCE_TABLES as TEAMMATE_SOURCES, refresh_teammates
+from app.stats import SOURCE_TABLES as STATS_SOURCES, refresh_stats
+
+# Rows parsed and streamed per COPY round trip, keeps memory bounded for lap_times.csv
+CHUNK_SIZE = 50_000
+
+
+def quote(name: str):
+    return engine.dialect.identifier_preparer.quote(name)
+
+
+def season_ids(connection):
+    """Map year -> seasonId, seasons get their ids in CSV order just like load_seasons."""
+    rows = connection.execute(text('SELECT year, "seasonId" FROM seasons')).all()
+    return {year: season_id for year, season_id in rows}
+
+
+def copy_frame(cursor, table: str, frame: pd.DataFrame):
+    """Stream one coerced chunk through COPY ... FROM STDIN."""
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, na_rep='')
+    buffer.seek(0)
+    columns = ', '.join(quote(name) for name in frame.columns)
+    cursor.copy_expert(f"COPY {quote(table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '')", buffer)
+
+
+def resolve_pit_stop_laps(connection):
+    """Fill pit_stops.lapId with one set-based join against lap_times, returns the stops left without a lap."""
+    connection.execute(text('''
+        UPDATE pit_stops p
+        SET "lapId" = l."lapId"
+        FROM lap_times l
+        WHERE p."lapId" IS NULL
+          AND l."raceId" = p."raceId"
+          AND l."driverId" = p."driverId"
+          AND l.lap = p.lap
+    '''))
+    return connection.execute(text('SELECT COUNT(*) FROM pit_stops WHERE "lapId" IS NULL')).scalar()
+
+
+def reset_sequence(connection, model):
+    """COPY with explicit ids does not advance serial sequences, move them past the loaded ids."""
+    table = model.__table__
+    for column in table.primary_key.columns:
+        sequence = connection.execute(
+            text('SELECT pg_get_serial_sequence(:table, :column)'),
+            {'table': quote(table.name), 'column': column.name},
+        ).scalar()
+        if sequence:
+            connection.execute(
+                text(f'SELECT setval(:sequence, COALESCE(MAX({quote(column.name)}), 0) + 1, false) FROM {quote(table.name)}'),
+                {'sequence': sequence},
+            )
+
+
+def upsert_statement(table: str, staging: str, columns: list, key: tuple, races: bool = False, previous: tuple = ()):
+    """Build the set-based diff statement, it returns (inserted, updated) row counts.
+
+    With races it also returns the distinct raceIds of the inserted and updated rows, then one array
+    per previous column with its distinct values before the update in the updated rows.
+    """
+    names = ', '.join(quote(name) for name in columns)
+    conflict = ', '.join(quote(name) for name in key)
+    changing = [name for name in columns if name not in key]
+    if changing:
+        assignments = ', '.join(f'{quote(name)} = EXCLUDED.{quote(name)}' for name in changing)
+        target = ', '.join(f't.{quote(name)}' for name in changing)
+        excluded = ', '.join(f'EXCLUDED.{quote(name)}' for name in changing)
+        action = f'DO UPDATE SET {assignments} WHERE ({target}) IS DISTINCT FROM ({excluded})'
+    else:
+        action = 'DO NOTHING'
+    returned = list(dict.fromkeys((['raceId'] if races else []) + (list(key) if previous else [])))
+    returning = ''.join(f', t.{quote(name)}' for name in returned)
+    aggregates = ', array_agg(DISTINCT "raceId")' if races else ''
+    before = ''
+    if previous:
+        # Every CTE sees the table as it was before the statement
+        matches = ' AND '.join(f'p.{quote(name)} = s.{quote(name)}' for name in key)
+        picked = ', '.join(f'p.{quote(name)}' for name in dict.fromkeys(list(key) + list(previous)))
+        before = f'previous AS (SELECT {picked} FROM {quote(table)} p JOIN {staging} s ON {matches}), '
+        updated = ' AND '.join(f'p.{quote(name)} = u.{quote(name)}' for name in key)
+        aggregates += ''.join(
+            f', (SELECT array_agg(DISTINCT p.{quote(name)}) FROM previous p JOIN upserted u ON {updated} WHERE NOT u.inserted)'
+            for name in previous
+        )
+    return f'''
+        WITH {before}upserted AS (
+            INSERT INTO {quote(table)} AS t ({names})
+            SELECT {names} FROM {staging}
+            ON CONFLICT ({conflict}) {action}
+            RETURNING (xmax = 0) AS inserted{returning}
+        )
+        SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted){aggregates} FROM upserted
+    '''
+
+
+def secondary_indexes(connection, table: str):
+    """(name, definition) of the table's non unique indexes that back no constraint, they can be dropped and rebuilt."""
+    rows = connection.execute(text('''
+        SELECT i.relname, pg_get_indexdef(i.oid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = CAST(:table AS regclass)
+          AND NOT x.indisunique
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+    '''), {'table': quote(table)}).all()
+    return [(name, definition) for name, definition in rows]
+
+
+def drop_indexes(table: str):
+    """Drop the secondary indexes before a bulk load, returns their definitions for create_indexes."""
+    with engine.begin() as connection:
+        indexes = secondary_indexes(connection, table)
+        for name, _ in indexes:
+            connection.execute(text(f'DROP INDEX {quote(name)}'))
+    return indexes
+
+
+def create_indexes(indexes):
+    with engine.begin() as connection:
+        connection.execute(text('SET LOCAL statement_timeout = 0'))
+        for _, definition in indexes:
+            connection.execute(text(definition))
+
+
+def read_frames(spec: TableSpec, data_dir: str = DATA_DIR, chunk_size: int = CHUNK_SIZE, stats: RejectionStats = None):
+    """Yield the CSV as coerced chunks of at most chunk_size rows, ready for COPY.
+
+    Values the spec rejects are counted in stats.
+    """
+    stats = stats if stats is not None else RejectionStats(spec.table)
+    years = None
+    if spec.model is Race:
+        with engine.connect() as connection:
+            years = season_ids(connection)
+
+    path = os.path.join(data_dir, spec.file_name)
+    reader = pd.read_csv(path, chunksize=chunk_size, **spec.read_options())
+    for chunk in reader:
+        if years is not None:
+            year = pd.to_numeric(chunk['year'], errors='coerce').astype('Int64')
+            # A year without a season row leaves seasonId empty, the row is skipped as missing it
+            chunk['seasonId'] = year.map(lambda value: years.get(value), na_action='ignore')
+        yield spec.coerce(chunk, stats)
+
+
+def copy_table(spec: TableSpec, data_dir: str = DATA_DIR, chunk_size: int = CHUNK_SIZE, stats: RejectionStats = None,
+               rebuild_indexes: bool = False):
+    """Load one CSV into its table in bounded chunks, returns the number of rows copied.
+
+    With rebuild_indexes the secondary indexes are dropped for the COPY and built once afterwards,
+    which is cheaper than maintaining them row by row on an empty table.
+    """
+    table = spec.table
+    rows = 0
+    indexes = drop_indexes(table) if rebuild_indexes else []
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        # A full table load can run longer than the statement timeout meant for API requests
+        cursor.execute('SET LOCAL statement_timeout = 0')
+        for frame in read_frames(spec, data_dir=data_dir, chunk_size=chunk_size, stats=stats):
+            copy_frame(cursor, table, frame)
+            rows += len(frame)
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+        if indexes:
+            create_indexes(indexes)
+
+    with engine.begin() as connection:
+        if spec.model is PitStop:
+            unmatched = resolve_pit_stop_laps(connection)
+            print(f"⚠️ {unmatched} pit stops could not be matched to a lap")
+        reset_sequence(connection, spec.model)
+        notify(connection, {table})
+
+    return rows
+
+
+def table_dependencies(specs):
+    """Map each table to the tables its foreign keys point at, among the tables being loaded."""
+    tables = {spec.table for spec in specs}
+    return {
+        spec.table: ({key.column.table.name for key in spec.model.__table__.foreign_keys} & tables) - {spec.table}
+        for spec in specs
+    }
+
+
+def timed_copy(spec: TableSpec, data_dir: str, chunk_size: int, rebuild_indexes: bool):
+    stats = RejectionStats(spec.table)
+    started = time.perf_counter()
+    rows = copy_table(spec, data_dir=data_dir, chunk_size=chunk_size, stats=stats, rebuild_indexes=rebuild_indexes)
+    return rows, time.perf_counter() - started, stats
+
+
+def refresh_derived(loaded: set):
+    """Recompute the analytics, stats and teammate tables whose source tables were loaded."""
+    if SOURCE_TABLES & loaded:
+        with engine.begin() as connection:
+            refresh_analytics(connection)
+        print("✅ Lap analytics refreshed")
+    if STATS_SOURCES & loaded:
+        with engine.begin() as connection:
+            refresh_stats(connection)
+        print("✅ Career and season stats refreshed")
+    if TEAMMATE_SOURCES & loaded:
+        with engine.begin() as connection:
+            refresh_teammates(connection)
+        print("✅ Teammate head to heads refreshed")
+
+
+def load_all(data_dir: str = DATA_DIR, chunk_size: int = CHUNK_SIZE, workers: int = 1,
+             rebuild_indexes: bool = False, specs=TABLE_SPECS):
+    """Load every CSV with COPY and print per-table row counts, throughput and rejected values.
+
+    A table starts as soon as the tables its foreign keys reference are loaded, up to workers
+    tables at a time, each on its own connection. When a table fails the tables depending on
+    it are skipped and the others still load.
+    """
+    by_table = {spec.table: spec for spec in specs}
+    pending = table_dependencies(specs)
+    loaded, failed = set(), set()
+    running = {}
+    report = []
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            blocked = [table for table, needs in pending.items() if needs & failed]
+            for table in blocked:
+                print(f"❌ Skipped {table}, it depends on {', '.join(sorted(pending[table] & failed))}")
+                failed.add(table)
+                del pending[table]
+            for table in [table for table, needs in pending.items() if needs <= loaded]:
+                del pending[table]
+                running[pool.submit(timed_copy, by_table[table], data_dir, chunk_size, rebuild_indexes)] = table
+            if not running:
+                if blocked:
+                    continue
+                raise ValueError(f"Foreign key cycle between {', '.join(sorted(pending))}")
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                table = running.pop(future)
+                try:
+                    rows, elapsed, stats = future.result()
+                except Exception as e:
+                    print(f"❌ Error loading {table}: {e}")
+                    failed.add(table)
+                    continue
+                loaded.add(table)
+                report.append((table, rows, elapsed))
+                print(f"✅ {table}: {rows} rows loaded")
+                stats.report()
+
+    refresh_derived(loaded)
+
+    print(f"{'table':<24}{'rows':>10}{'seconds':>10}{'rows/sec':>12}")
+    for table, rows, elapsed in report:
+        rate = rows / elapsed if elapsed else 0
+        print(f"{table:<24}{rows:>10}{elapsed:>10.2f}{rate:>12.0f}")
+    print(f"{len(loaded)} tables in {time.perf_counter() - started:.2f}s with {workers} workers")
+    return report
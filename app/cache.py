@@ -0,0 +1,286 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, parse_qsl, urlencode
+
+from sqlalchemy import text
+
+from app.changes import subscribe
+from app.config import CACHE_ENABLED, CACHE_MAX_BYTES, CACHE_TTL_CLOSED, CACHE_TTL_LIVE
+from app.database import async_engine
+
+# Tables whose rows belong to one race, a route reading any of them is invalidated by a change to any of them
+RACE_TABLES = {
+    "races", "results", "sprint_results", "qualifying", "pit_stops", "lap_times",
+    "driver_standings", "constructor_standings", "constructor_results",
+}
+
+# Literal path segment -> tables the route reads, including the children of nested responses
+SEGMENT_TABLES = {
+    "drivers": {"drivers"},
+    "constructors": {"constructors"},
+    "circuits": {"circuits", "races"},
+    "seasons": {"seasons"},
+    "status": {"status", "results", "sprint_results"},
+    "races": {"races"},
+    "results": {"results"},
+    "sprint_races": {"sprint_results"},
+    "sprint_results": {"sprint_results"},
+    "qualifying": {"qualifying"},
+    "pit_stops": {"pit_stops"},
+    "lap_times": {"lap_times"},
+    "driver_standings": {"driver_standings"},
+    "constructor_standings": {"constructor_standings"},
+    "constructor_results": {"constructor_results"},
+    "fastest_lap": {"lap_times"},
+    "fastest_laps": {"races", "lap_times"},
+    "poles": {"races", "qualifying"},
+    "analytics": {"lap_gaps", "lap_stints"},
+    "gaps": {"lap_gaps"},
+    "stints": {"lap_stints"},
+    "weekend": RACE_TABLES | {"drivers", "seasons", "circuits"},
+    "full_data": RACE_TABLES | {"drivers", "seasons", "circuits"},
+    "profile": RACE_TABLES | {"drivers", "seasons"},
+    "standings": {"races", "driver_standings", "constructor_standings"},
+    "progression": {"seasons", "races", "driver_standings", "constructor_standings"},
+    "stats": {"seasons", "driver_season_stats", "driver_career_stats", "constructor_season_stats", "constructor_career_stats"},
+    "teammates": {"seasons", "teammate_stats"},
+    "compare": RACE_TABLES | {"drivers", "seasons", "teammate_stats"},
+}
+
+# Routes that are never cached, streams and live counters
+EXCLUDED_PREFIXES = ("/export", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+# A single response may use at most this share of the memory budget
+MAX_ENTRY_SHARE = 16
+
+
+def route_tables(path: str):
+    """Tables a route template or request path depends on, "*" when it has a segment we do not know."""
+    tables = set()
+    for segment in path.strip("/").split("/"):
+        if not segment or segment.startswith("{") or segment.isdigit():
+            continue
+        if segment not in SEGMENT_TABLES:
+            return {"*"}
+        tables |= SEGMENT_TABLES[segment]
+    if tables & RACE_TABLES:
+        tables |= RACE_TABLES
+    return tables
+
+
+class CacheEntry:
+    __slots__ = ("headers", "body", "tables", "season", "expires", "size")
+
+    def __init__(self, headers: list, body: bytes, tables: set, ttl: int, season: int = None):
+        self.headers = headers
+        self.body = body
+        self.tables = tables
+        # seasonId the response is pinned to by its race_id or season_id, None when it spans seasons
+        self.season = season
+        self.expires = time.monotonic() + ttl
+        self.size = len(body) + sum(len(name) + len(value) for name, value in headers)
+
+
+class ResponseCache:
+    """LRU of serialized GET responses bounded by the total size of the cached bodies."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.by_table = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self.remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: CacheEntry):
+        if entry.size > self.max_bytes // MAX_ENTRY_SHARE:
+            return
+        with self.lock:
+            self.remove(key)
+            self.entries[key] = entry
+            self.bytes += entry.size
+            for table in entry.tables:
+                self.by_table.setdefault(table, set()).add(key)
+            while self.bytes > self.max_bytes:
+                self.remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def remove(self, key: str):
+        """Drop one entry, the caller holds the lock."""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry.size
+        for table in entry.tables:
+            keys = self.by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+
+    def invalidate(self, tables, seasons: set = None):
+        """Drop the entries reading any of the tables, only those of the given seasons when seasons is set."""
+        with self.lock:
+            for table in set(tables) | {"*"}:
+                for key in list(self.by_table.get(table, ())):
+                    entry = self.entries[key]
+                    if seasons is not None and entry.season is not None and entry.season not in seasons:
+                        continue
+                    self.remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.by_table.clear()
+            self.bytes = 0
+
+    def snapshot(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": CACHE_ENABLED,
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class SeasonIndex:
+    """Championship year of every race and season, to tell closed seasons from the live one."""
+
+    def __init__(self):
+        self.loaded = False
+        self.race_seasons = {}
+        self.season_years = {}
+        self.current = None
+
+    async def load(self):
+        async with async_engine.connect() as connection:
+            self.season_years = dict((await connection.execute(text('SELECT "seasonId", year FROM seasons'))).all())
+            self.race_seasons = dict((await connection.execute(text('SELECT "raceId", "seasonId" FROM races'))).all())
+        self.current = max(self.season_years.values(), default=None)
+        self.loaded = True
+
+    def reset(self):
+        self.loaded = False
+
+    async def season(self, params: dict):
+        """seasonId the route parameters pin the response to, None when they do not pin one."""
+        if not self.loaded:
+            await self.load()
+        try:
+            if "race_id" in params:
+                return self.race_seasons.get(int(params["race_id"]))
+            if "season_id" in params:
+                season_id = int(params["season_id"])
+                return season_id if season_id in self.season_years else None
+        except ValueError:
+            pass
+        return None
+
+    async def year(self, params: dict):
+        """Year the route parameters pin the response to, None when they do not pin one."""
+        # season() may reload the index, read season_years only after it
+        season = await self.season(params)
+        return self.season_years.get(season)
+
+    async def closed(self, tables: set, params: dict):
+        """Whether the response can no longer change with the live season."""
+        if not tables & RACE_TABLES and "*" not in tables:
+            # Reference tables only, they change through the write routes which invalidate them
+            return True
+        year = await self.year(params)
+        return year is not None and self.current is not None and year < self.current
+
+    async def ttl(self, tables: set, params: dict):
+        return CACHE_TTL_CLOSED if await self.closed(tables, params) else CACHE_TTL_LIVE
+
+
+response_cache = ResponseCache(CACHE_MAX_BYTES)
+season_index = SeasonIndex()
+
+
+@subscribe
+def invalidate_responses(tables: set, seasons: set = None):
+    response_cache.invalidate(tables, seasons)
+    if tables & {"races", "seasons"}:
+        season_index.reset()
+
+
+def season_params(query_string: bytes, path_params: dict):
+    """Query and path parameters for SeasonIndex, a race_id or season_id given more than once pins no season."""
+    query = parse_qs(query_string.decode(), keep_blank_values=True)
+    if any(len(query.get(name, ())) > 1 for name in ("race_id", "season_id")):
+        return {}
+    return {**{name: values[0] for name, values in query.items()}, **path_params}
+
+
+def cache_key(scope):
+    query = sorted(parse_qsl(scope["query_string"].decode(), keep_blank_values=True))
+    return f"{scope['path']}?{urlencode(query)}"
+
+
+class ResponseCacheMiddleware:
+    """Serve repeated GET requests from the response cache.
+
+    Must sit inside the CORS middleware, which adds per-origin headers that must not be cached.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (not CACHE_ENABLED or scope["type"] != "http" or scope["method"] != "GET"
+                or scope["path"].startswith(EXCLUDED_PREFIXES)):
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope)
+        entry = response_cache.get(key)
+        if entry is not None:
+            await send({"type": "http.response.start", "status": 200, "headers": entry.headers + [(b"x-cache", b"HIT")]})
+            await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        start = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"x-cache", b"MISS")]}
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+        route = scope.get("route")
+        if start.get("status") != 200 or route is None:
+            return
+        tables = route_tables(route.path)
+        params = season_params(scope["query_string"], scope.get("path_params", {}))
+        ttl = await season_index.ttl(tables, params)
+        season = await season_index.season(params)
+        response_cache.put(key, CacheEntry(list(start.get("headers", [])), b"".join(chunks), tables, ttl, season))
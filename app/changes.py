@@ -0,0 +1,99 @@
+from itertools import chain
+
+import asyncpg
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.config import DATABASE_URL, DB_PGBOUNCER
+
+# Every write announces the tables it touched on this channel with NOTIFY. The notification is
+# part of the writing transaction, so it is only delivered when the transaction commits.
+# The api listens on it so writes from the loaders and reload scripts, which run in their own
+# process, reach the in-process caches too.
+CHANNEL = "table_changes"
+
+# Callbacks taking the set of changed table names and the set of seasonIds the change is limited
+# to, None when it can touch any season
+subscribers = []
+
+
+def subscribe(callback):
+    subscribers.append(callback)
+    return callback
+
+
+def publish(tables, seasons=None):
+    tables = set(tables)
+    seasons = set(seasons) if seasons is not None else None
+    for callback in subscribers:
+        callback(tables, seasons)
+
+
+def encode_payload(tables, seasons=None):
+    """NOTIFY payload, "table,table" or "table,table;seasonId,seasonId" for a change limited to some seasons."""
+    payload = ",".join(tables)
+    if seasons is not None:
+        payload += ";" + ",".join(str(season) for season in sorted(seasons))
+    return payload
+
+
+def decode_payload(payload: str):
+    tables, limited, seasons = payload.partition(";")
+    return tables.split(","), ({int(season) for season in seasons.split(",") if season} if limited else None)
+
+
+# Bumps the change counter of every table in the writing transaction, the ETags are computed from them
+BUMP_VERSIONS = text('''
+    INSERT INTO table_versions ("tableName", version, "changedAt")
+    SELECT name, 1, now() FROM unnest(CAST(:names AS text[])) AS name
+    ON CONFLICT ("tableName") DO UPDATE SET version = table_versions.version + 1, "changedAt" = now()
+''')
+
+
+def notify(connection, tables, seasons=None):
+    """Bump the table versions and queue the NOTIFY in the transaction of a Connection or Session, it is sent on commit.
+
+    seasons limits the change to those seasonIds, the caches keep what they hold for other seasons.
+    """
+    tables = sorted(tables)
+    connection.execute(BUMP_VERSIONS, {"names": tables})
+    connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": encode_payload(tables, seasons)})
+
+
+@event.listens_for(Session, "after_flush")
+def collect_changed_tables(session, flush_context):
+    tables = {obj.__table__.name for obj in chain(session.new, session.dirty, session.deleted)}
+    if not tables - session.info.get("changed_tables", set()):
+        return
+    session.info.setdefault("changed_tables", set()).update(tables)
+    notify(session.connection(), tables)
+
+
+@event.listens_for(Session, "after_commit")
+def publish_changed_tables(session):
+    # The listener gets the same tables a moment later, this makes the api's own writes visible right away
+    tables = session.info.pop("changed_tables", None)
+    if tables:
+        publish(tables)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_changed_tables(session, previous_transaction):
+    session.info.pop("changed_tables", None)
+
+
+async def listen():
+    """Open a dedicated connection that LISTENs for table changes, None when that is not possible.
+
+    PgBouncer in transaction mode does not support LISTEN, the caches then rely on their TTL
+    for changes made by other processes.
+    """
+    if DB_PGBOUNCER:
+        return None
+    try:
+        connection = await asyncpg.connect(DATABASE_URL)
+        await connection.add_listener(CHANNEL, lambda conn, pid, channel, payload: publish(*decode_payload(payload)))
+    except (OSError, asyncpg.PostgresError) as e:
+        print(f"⚠️ Not listening for table changes: {e}")
+        return None
+    return connection
@@ -0,0 +1,127 @@
+import os
+import threading
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from sqlalchemy import BigInteger, Date, Float, Integer, String, Time
+
+from app.database import engine
+
+# Arrow and Parquet exports. PostgreSQL writes the rows with COPY ... TO STDOUT as CSV into a
+# pipe and Arrow's CSV reader parses them into typed record batches, so no Python object is
+# created per row or per value between the database and the Arrow buffers.
+
+# Bytes Arrow parses per record batch
+ARROW_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Checked in order, BigInteger is a subclass of Integer
+ARROW_TYPES = (
+    (BigInteger, pa.int64()),
+    (Integer, pa.int32()),
+    (Float, pa.float64()),
+    (Date, pa.date32()),
+    (Time, pa.time64("us")),
+    (String, pa.string()),
+)
+
+
+def arrow_type(column):
+    for sql_type, type_ in ARROW_TYPES:
+        if isinstance(column.type, sql_type):
+            return type_
+    raise TypeError(f"No Arrow type for {column.key} ({column.type})")
+
+
+def arrow_schema(table):
+    return pa.schema([pa.field(column.key, arrow_type(column)) for column in table.columns])
+
+
+def copy_sql(cursor, statement):
+    """The statement as a COPY to CSV, the bound filter values are quoted by psycopg2."""
+    compiled = statement.compile(dialect=engine.dialect)
+    query = cursor.mogrify(str(compiled), compiled.params).decode()
+    return f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+
+
+def record_batches(statement, schema):
+    """Yield typed record batches for a select() of table columns, streamed from COPY."""
+    read_fd, write_fd = os.pipe()
+    failures = []
+
+    with engine.connect() as connection:
+        cursor = connection.connection.cursor()
+        cursor.execute('SET LOCAL statement_timeout = 0')
+        sql = copy_sql(cursor, statement)
+
+        def copy():
+            try:
+                with os.fdopen(write_fd, "wb") as sink:
+                    cursor.copy_expert(sql, sink)
+            except Exception as e:
+                failures.append(e)
+
+        writer = threading.Thread(target=copy, daemon=True)
+        writer.start()
+        try:
+            with os.fdopen(read_fd, "rb") as source:
+                reader = pacsv.open_csv(
+                    source,
+                    read_options=pacsv.ReadOptions(block_size=ARROW_BLOCK_SIZE),
+                    # COPY writes NULL as an empty field and an empty string as "", keep them apart
+                    convert_options=pacsv.ConvertOptions(
+                        column_types=schema, null_values=[""],
+                        strings_can_be_null=True, quoted_strings_can_be_null=False,
+                    ),
+                )
+                for batch in reader:
+                    yield batch
+        finally:
+            writer.join()
+        if failures:
+            raise failures[0]
+
+
+class ChunkSink:
+    """Write-only file object that hands out what was written since the last call to take()."""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def ipc_stream(statement, schema):
+    """Arrow IPC stream format, one message per record batch."""
+    sink = ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in record_batches(statement, schema):
+            writer.write_batch(batch)
+            yield sink.take()
+    yield sink.take()
+
+
+def parquet_stream(statement, schema):
+    """Parquet file, one row group per record batch, the footer follows the last one."""
+    sink = ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for batch in record_batches(statement, schema):
+            writer.write_batch(batch)
+            data = sink.take()
+            if data:
+                yield data
+    yield sink.take()
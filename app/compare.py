@@ -0,0 +1,216 @@
+import time
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.changes import notify
+from app.database import engine
+from app.models import TeammateStat
+
+# Head to head of two drivers over the races they both took part in: who finished ahead, who
+# qualified ahead and the mean lap time difference over the laps where neither was on an in or
+# out lap. The pairs are joined in PostgreSQL on the (raceId, driverId) and (raceId, driverId, lap)
+# keys of results, qualifying and lap_times, the response is built as JSON like the race weekend.
+# Teammates, two drivers with a result for the same constructor in a race, are summarised per
+# season and team in teammate_stats, refreshed by the loaders for the seasons of changed races.
+
+# Tables the teammate summaries are computed from
+SOURCE_TABLES = {"results", "qualifying", "lap_times", "pit_stops"}
+
+TEAMMATE_TABLE = TeammateStat.__tablename__
+
+# Neither driver pitted on the lap or the lap before, in and out laps say little about pace
+NO_PIT_STOP = '''NOT EXISTS (
+        SELECT 1 FROM pit_stops s
+        WHERE s."raceId" = la."raceId" AND la.lap IN (s.lap, s.lap + 1) AND s."driverId" IN (la."driverId", lb."driverId")
+    )'''
+
+TEAMMATES_SQL = f'''
+INSERT INTO {TEAMMATE_TABLE} ("driverId", "teammateId", "seasonId", "constructorId", races, "raceAhead",
+                              qualifying, "qualifyingAhead", laps, "paceGapMs")
+WITH pairs AS (
+    SELECT a."driverId", b."driverId" AS "teammateId", r."seasonId", a."constructorId", a."raceId",
+        a."positionOrder" < b."positionOrder" AS ahead
+    FROM results a
+    JOIN results b ON b."raceId" = a."raceId" AND b."constructorId" = a."constructorId" AND b."driverId" <> a."driverId"
+    JOIN races r ON r."raceId" = a."raceId"
+    WHERE r."seasonId" IS NOT NULL{{seasons}}
+),
+race_stats AS (
+    SELECT "driverId", "teammateId", "seasonId", "constructorId",
+        COUNT(*) AS races, COUNT(*) FILTER (WHERE ahead) AS ahead
+    FROM pairs
+    GROUP BY 1, 2, 3, 4
+),
+qualifying_stats AS (
+    SELECT p."driverId", p."teammateId", p."seasonId", p."constructorId",
+        COUNT(*) AS sessions, COUNT(*) FILTER (WHERE qa.position < qb.position) AS ahead
+    FROM pairs p
+    JOIN qualifying qa ON qa."raceId" = p."raceId" AND qa."driverId" = p."driverId"
+    JOIN qualifying qb ON qb."raceId" = p."raceId" AND qb."driverId" = p."teammateId"
+    WHERE qa.position IS NOT NULL AND qb.position IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+),
+pace_stats AS (
+    SELECT p."driverId", p."teammateId", p."seasonId", p."constructorId",
+        COUNT(*) AS laps, round(AVG(la.milliseconds - lb.milliseconds)) AS gap
+    FROM pairs p
+    JOIN lap_times la ON la."raceId" = p."raceId" AND la."driverId" = p."driverId"
+    JOIN lap_times lb ON lb."raceId" = p."raceId" AND lb."driverId" = p."teammateId" AND lb.lap = la.lap
+    WHERE {NO_PIT_STOP}
+    GROUP BY 1, 2, 3, 4
+)
+SELECT rs."driverId", rs."teammateId", rs."seasonId", rs."constructorId", rs.races, rs.ahead,
+    COALESCE(qs.sessions, 0), COALESCE(qs.ahead, 0), COALESCE(ps.laps, 0), ps.gap
+FROM race_stats rs
+LEFT JOIN qualifying_stats qs USING ("driverId", "teammateId", "seasonId", "constructorId")
+LEFT JOIN pace_stats ps USING ("driverId", "teammateId", "seasonId", "constructorId")
+'''
+
+
+def affected_seasons(connection, race_ids):
+    return connection.execute(text('''
+        SELECT DISTINCT "seasonId" FROM races WHERE "raceId" = ANY(:race_ids) AND "seasonId" IS NOT NULL
+    '''), {'race_ids': sorted(race_ids)}).scalars().all()
+
+
+def refresh_teammates(connection, race_ids=None):
+    """Recompute the teammate summaries in the connection's transaction.
+
+    race_ids limits the refresh to the seasons of those races, None refreshes every season.
+    """
+    seasons = affected_seasons(connection, race_ids) if race_ids is not None else None
+    if seasons is not None and not seasons:
+        return
+    if seasons is None:
+        connection.execute(text(f'DELETE FROM {TEAMMATE_TABLE}'))
+        connection.execute(text(TEAMMATES_SQL.format(seasons='')))
+    else:
+        connection.execute(text(f'DELETE FROM {TEAMMATE_TABLE} WHERE "seasonId" = ANY(:seasons)'), {'seasons': seasons})
+        connection.execute(text(TEAMMATES_SQL.format(seasons=' AND r."seasonId" = ANY(:seasons)')), {'seasons': seasons})
+    notify(connection, {TEAMMATE_TABLE}, seasons)
+
+
+# Keys of a summary over season rows, gapMs is driver a's mean lap time minus driver b's
+SUMMARY = '''
+        'races', {races}, 'teammateRaces', {teammate_races},
+        'race', json_build_object('a', {race_ahead}, 'b', {races} - {race_ahead}),
+        'qualifying', json_build_object('sessions', {sessions}, 'a', {qualifying_ahead}, 'b', {sessions} - {qualifying_ahead}),
+        'pace', json_build_object('laps', {laps}, 'gapMs', round({gap}::numeric / NULLIF({laps}, 0)))'''
+
+# Teammate summaries with the championship year, in the column order of teammate_stats
+TEAMMATE_ROWS = f'''
+        SELECT COALESCE(json_agg(to_json(t) ORDER BY t.year, t."constructorId", t."teammateId"), '[]')
+        FROM (
+            SELECT se.year, x.*
+            FROM {TEAMMATE_TABLE} x
+            JOIN seasons se ON se."seasonId" = x."seasonId"
+            WHERE {{condition}}
+        ) t'''
+
+
+@lru_cache(maxsize=None)
+def comparison_sql(by_season: bool):
+    season_filter = ' AND r."seasonId" IN (SELECT "seasonId" FROM seasons WHERE year = :season)' if by_season else ''
+    season_summary = SUMMARY.format(
+        races='s.races', teammate_races='s.teammate_races', race_ahead='s.race_ahead', sessions='s.sessions',
+        qualifying_ahead='s.qualifying_ahead', laps='s.laps', gap='s.gap',
+    )
+    total_summary = SUMMARY.format(
+        races='COALESCE(SUM(s.races), 0)', teammate_races='COALESCE(SUM(s.teammate_races), 0)',
+        race_ahead='COALESCE(SUM(s.race_ahead), 0)', sessions='COALESCE(SUM(s.sessions), 0)',
+        qualifying_ahead='COALESCE(SUM(s.qualifying_ahead), 0)', laps='COALESCE(SUM(s.laps), 0)', gap='SUM(s.gap)',
+    )
+    teammates = TEAMMATE_ROWS.format(
+        condition='x."driverId" = :a AND x."teammateId" = :b' + (' AND se.year = :season' if by_season else ''),
+    )
+    return f'''
+WITH race_pairs AS (
+    SELECT r."seasonId", a."raceId",
+        a."constructorId" = b."constructorId" AS teammates,
+        a."positionOrder" < b."positionOrder" AS a_ahead
+    FROM results a
+    JOIN results b ON b."raceId" = a."raceId" AND b."driverId" = :b
+    JOIN races r ON r."raceId" = a."raceId"
+    WHERE a."driverId" = :a{season_filter}
+),
+race_stats AS (
+    SELECT "seasonId", COUNT(*) AS races, COUNT(*) FILTER (WHERE teammates) AS teammate_races,
+        COUNT(*) FILTER (WHERE a_ahead) AS race_ahead
+    FROM race_pairs
+    GROUP BY "seasonId"
+),
+qualifying_stats AS (
+    SELECT p."seasonId", COUNT(*) AS sessions, COUNT(*) FILTER (WHERE qa.position < qb.position) AS ahead
+    FROM race_pairs p
+    JOIN qualifying qa ON qa."raceId" = p."raceId" AND qa."driverId" = :a
+    JOIN qualifying qb ON qb."raceId" = p."raceId" AND qb."driverId" = :b
+    WHERE qa.position IS NOT NULL AND qb.position IS NOT NULL
+    GROUP BY p."seasonId"
+),
+pace_stats AS (
+    SELECT p."seasonId", COUNT(*) AS laps, SUM(la.milliseconds - lb.milliseconds) AS gap
+    FROM race_pairs p
+    JOIN lap_times la ON la."raceId" = p."raceId" AND la."driverId" = :a
+    JOIN lap_times lb ON lb."raceId" = p."raceId" AND lb."driverId" = :b AND lb.lap = la.lap
+    WHERE {NO_PIT_STOP}
+    GROUP BY p."seasonId"
+),
+season_stats AS (
+    SELECT se.year, rs."seasonId", rs.races, rs.teammate_races, rs.race_ahead,
+        COALESCE(qs.sessions, 0) AS sessions, COALESCE(qs.ahead, 0) AS qualifying_ahead,
+        COALESCE(ps.laps, 0) AS laps, ps.gap
+    FROM race_stats rs
+    JOIN seasons se ON se."seasonId" = rs."seasonId"
+    LEFT JOIN qualifying_stats qs ON qs."seasonId" = rs."seasonId"
+    LEFT JOIN pace_stats ps ON ps."seasonId" = rs."seasonId"
+)
+SELECT json_build_object(
+    'a', to_json(da),
+    'b', to_json(db),
+    'summary', (SELECT json_build_object({total_summary}) FROM season_stats s),
+    'seasons', (
+        SELECT COALESCE(json_agg(
+            json_build_object('year', s.year, 'seasonId', s."seasonId", {season_summary}) ORDER BY s.year
+        ), '[]')
+        FROM season_stats s
+    ),
+    'teammates', ({teammates})
+)::text
+FROM drivers da, drivers db
+WHERE da."driverId" = :a AND db."driverId" = :b
+'''
+
+
+async def get_comparison(db: AsyncSession, a: int, b: int, season: Optional[int] = None) -> Optional[str]:
+    """JSON text of the head to head of driver a against driver b, None when either does not exist."""
+    params = {"a": a, "b": b}
+    if season is not None:
+        params["season"] = season
+    return await db.scalar(text(comparison_sql(season is not None)), params)
+
+
+TEAMMATES_PAYLOAD_SQL = f'''
+SELECT ({TEAMMATE_ROWS.format(condition='x."driverId" = d."driverId"')}
+)::text
+FROM drivers d
+WHERE d."driverId" = :driver_id
+'''
+
+
+async def get_teammates(db: AsyncSession, driver_id: int) -> Optional[str]:
+    """JSON text of the driver's teammate summaries, None when the driver does not exist."""
+    return await db.scalar(text(TEAMMATES_PAYLOAD_SQL), {"driver_id": driver_id})
+
+
+def refresh_all():
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        refresh_teammates(connection)
+    print(f"✅ Refreshed {TEAMMATE_TABLE} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    refresh_all()
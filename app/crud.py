@@ -1,20 +1,21 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm import Session, selectinload
 from app import schemas
+from app.standings import update_standings
+from app.stats import refresh_stats
 from app.models import (
     Constructor,
-    Driver, Season, Circuit, Status, Race, Result, PitStop, LapTime, Qualifying, SprintResult,
+    Driver, Season, Circuit, Status, Race, PitStop, LapTime, Qualifying, SprintResult,
     ConstructorResult, ConstructorStanding, DriverStanding
 )
-from typing import Optional
 
-# --------------- DRIVER ---------------
-def get_drivers(db: Session):
-    return db.query(Driver).all()
+# ---- LOADER OPTIONS ----
+# Eager loads for the routes that return a nested schema, each collection is one
+# SELECT ... WHERE IN (...) for the whole page instead of a lazy load per parent row.
+CIRCUIT_LOADERS = (selectinload(Circuit.races),)
+STATUS_LOADERS = (selectinload(Status.results), selectinload(Status.sprint_results))
 
-def get_driver_by_id(db: Session, driver_id: int):
-    return db.query(Driver).filter(Driver.driverId == driver_id).first()
 
+# --------------- DRIVER ---------------
 def create_driver(db: Session, driver_data: dict):
     driver = Driver(**driver_data)
     db.add(driver)
@@ -40,58 +41,7 @@ def delete_driver(db: Session, driver_id: int):
     db.commit()
     return driver
 
-def get_driver_by_value(db: Session, driver_value: str):
-    """Retrieve a driver by driverRef, driverId, code, or full name."""
-    return db.query(Driver).filter(
-        or_(
-            Driver.driverId == driver_value,
-            Driver.driverRef == driver_value,
-            Driver.code == driver_value,
-            (Driver.forename + "%20" + Driver.surname) == driver_value
-        )
-    ).first()
-
-def get_driver_by_ref(db: Session, driver_ref: str):
-    return db.query(Driver).filter(Driver.driverRef == driver_ref).first()
-
-def get_results_from_driver(db: Session, driver_id: int):
-    return db.query(Driver).filter(Driver.driverId==driver_id).first().results
-
-def get_qualifying_from_driver(db: Session, driver_id: int):
-    return db.query(Driver).filter(Driver.driverId==driver_id).first().qualifying
-
-def get_pit_stops_from_driver(db: Session, driver_id: int):
-    return db.query(Driver).filter(Driver.driverId==driver_id).first().pit_stops
-
-def get_lap_times_from_driver(db: Session, driver_id: int):
-    return db.query(Driver).filter(Driver.driverId==driver_id).first().lap_times
-
-def get_driver_standings_from_driver(db: Session, driver_id:int):
-    return db.query(Driver).filter(Driver.driverId==driver_id).first().driver_standings
-
-def get_sprint_results_from_driver(db: Session, driver_id: int):
-    return db.query(Driver).filter(Driver.driverId==driver_id).first().sprint_results
-
-#Trying to get race from results
-def get_races_by_driver_id(db: Session, driver_id: int):
-    """Get all unique races where the driver has participated (via results)."""
-    return (
-        db.query(Race)
-        .join(Result)
-        .filter(Result.driverId == driver_id)
-        .distinct()
-        .all()
-    )
-
-
 #----------------------------Driver Standings-----------------------------
-def get_driver_standings(db: Session):
-    return db.query(DriverStanding).all()
-
-def get_driver_standing_by_id(db: Session, standing_id: int):
-    return db.query(DriverStanding).filter(DriverStanding.driverStandingsId == standing_id).first()
-
-
 def create_driver_standing(db: Session, driver_standing: schemas.DriverStandingCreate):
     db_driver_standing = DriverStanding(
                 raceId=driver_standing.raceId,
@@ -107,12 +57,6 @@ def create_driver_standing(db: Session, driver_standing: schemas.DriverStandingC
     return db_driver_standing
 
 # --------------- CIRCUIT ---------------
-def get_circuits(db: Session):
-    return db.query(Circuit).all()
-
-def get_circuit(db: Session, circuit_id: int):
-    return db.query(Circuit).filter(Circuit.circuitId == circuit_id).first()
-
 def create_circuit(db: Session, circuit_data: dict):
     circuit = Circuit(**circuit_data)
     db.add(circuit)
@@ -138,18 +82,7 @@ def delete_circuit(db: Session, circuit_id: int):
     db.commit()
     return circuit
 
-
-#Relationship functions
-def get_races_on_circuit(db: Session, circuit_id):
-    return db.query(Circuit).filter(Circuit.circuitId==circuit_id).first().races
-
 # --------------- RACE ---------------
-def get_races(db: Session):
-    return db.query(Race).all()
-
-def get_race(db: Session, race_id: int):
-    return db.query(Race).filter(Race.raceId == race_id).first()
-
 def create_race(db: Session, race_data: dict):
     race = Race(**race_data)
     db.add(race)
@@ -175,38 +108,7 @@ def delete_race(db: Session, race_id: int):
     db.commit()
     return race
 
-
-#Relationships
-
-def get_results_from_race(db: Session, race_id: int):
-    return db.query(Race).filter(Race.raceId == race_id).first().results
-
-def get_sprint_results_from_race(db: Session, race_id: int):
-    return db.query(Race).filter(Race.raceId == race_id).first().sprint_results
-
-def get_qualifying_from_race(db: Session, race_id: int):
-    return db.query(Race).filter(Race.raceId == race_id).first().qualifying
-
-def get_pit_stops_from_race(db: Session, race_id: int):
-    return db.query(Race).filter(Race.raceId == race_id).first().pit_stops
-
-def get_laps_from_race(db: Session, race_id: int):
-    return db.query(Race).filter(Race.raceId == race_id).first().lap_times
-
-def get_driver_standings_from_race(db: Session, race_id: int):
-    return db.query(Race).filter(Race.raceId == race_id).first().driver_standings
-
-def get_constructor_results_from_race(db: Session, race_id: int):
-    return db.query(Race).filter(Race.raceId == race_id).first().constructor_results
-
-def get_constructor_standings_from_race(db: Session, race_id: int):
-    return db.query(Race).filter(Race.raceId == race_id).first().constructor_standings
-
 # --------------- SEASON ---------------
-def get_seasons(db: Session):
-    return db.query(Season).all()
-
-
 def create_season(db: Session, season_data: dict):
     season = Season(**season_data)
     db.add(season)
@@ -232,19 +134,8 @@ def delete_season(db: Session, season_id: int):
     db.commit()
     return season
 
-def get_races_from_seasons(db: Session, season_id):
-    return db.query(Season).filter(Season.seasonId==season_id).first().races
-
-
-# Repeat for other tables...
 
 # --------------- LAP TIME ---------------
-def get_lap_times(db: Session):
-    return db.query(LapTime).all()
-
-def get_lap_time(db: Session, lap_id: int):
-    return db.query(LapTime).filter(LapTime.lapId == lap_id).first()
-
 def create_lap_time(db: Session, lap_data: dict):
     lap_time = LapTime(**lap_data)
     db.add(lap_time)
@@ -271,51 +162,7 @@ def delete_lap_time(db: Session, lap_id: int):
     return lap_time
 
 
-# --------------------------- Results ---------------------------------------
-def get_result_filtered(db: Session, race_id: Optional[int] = None,
-                        driver_id: Optional[int] = None,
-                        constructor_id: Optional[int] = None,
-                        status_id: Optional[int] = None):
-    query = db.query(Result)
-
-    if race_id:
-        query = query.filter(Result.raceId == race_id)
-    if driver_id:
-        query = query.join(Driver, Result.driverId == Driver.driverId).filter(Driver.driverId == driver_id)
-    if constructor_id:
-        query = query.join(Constructor, Result.constructorId == Constructor.constructorId).filter(Constructor.constructorId == constructor_id)
-    if status_id:
-        query = query.join(Status, Result.statusId == Status.statusId).filter(Status.statusId == status_id)
-
-    return query.all()
-
-
-def get_results_all(db: Session):
-    return db.query(Result).all()
-
-def get_results_by_id(db: Session, result_id: int):
-    return db.query(Result).filter(Result.resultId == result_id).first()
-
-def get_results_for_race(db: Session, race_id: int):
-    return db.query(Result).filter(Result.raceId == race_id).all()
-
-
-def get_result_by_driver(db: Session, driver_id: int):
-    return db.query(Result).join(Driver).filter(Driver.driverId == driver_id).all()
-
 # -------------------------------- Sprint Results -------------------------------------------------------
-def get_sprint_results(db: Session):
-    return db.query(SprintResult).all()
-
-def get_sprint_result_by_id(db: Session, sprint_result_id: int):
-    return db.query(SprintResult).filter(SprintResult.sprintResultId == sprint_result_id).first()
-
-def get_sprint_results_by_race_id(db: Session, race_id: int):
-    return db.query(SprintResult).filter(SprintResult.raceId == race_id).all()
-
-def get_sprint_results_by_driver_id(db: Session, driver_id: int):
-    return db.query(SprintResult).filter(SprintResult.driverId == driver_id).all()
-
 def create_sprint_result(db: Session, sprint_result: schemas.SprintResultCreate):
     db_sprint_result = SprintResult(
         raceId = sprint_result.raceId,
@@ -335,6 +182,9 @@ def create_sprint_result(db: Session, sprint_result: schemas.SprintResultCreate)
         statusId=sprint_result.statusId
     )
     db.add(db_sprint_result)
+    db.flush()
+    update_standings(db.connection(), {db_sprint_result.raceId})
+    refresh_stats(db.connection(), {db_sprint_result.raceId})
     db.commit()
     db.refresh(db_sprint_result)
     return db_sprint_result
@@ -368,16 +218,7 @@ def delete_qualifying(db: Session, qualifying_id: int):
         return True
     return False
 
-def get_qualifying_id(db: Session, qualify_id: int):
-    return db.query(Qualifying).filter(Qualifying.qualifyId==qualify_id).first()
-
 # --------------------------------Status----------------------------------------
-def get_statuses(db: Session):
-    return db.query(Status).all()
-
-def get_status_by_id(db: Session, status_id: int):
-    return db.query(Status).filter(Status.statusId == status_id).first()
-
 def create_status(db: Session, status: schemas.StatusCreate):
     db_status = Status(status=status.status)
     db.add(db_status)
@@ -385,25 +226,8 @@ def create_status(db: Session, status: schemas.StatusCreate):
     db.refresh(db_status)
     return db_status
 
-#relationships
-def get_results_from_status(db: Session, status_id: int):
-    return db.query(Status).filter(Status.statusId==status_id).first().results
-
-def get_sprint_results_from_status(db: Session, status_id: int):
-    return db.query(Status).filter(Status.statusId==status_id).first().sprint_results
-
-
 
 #-------------------------------- Pit stops ---------------------------------------
-def get_pit_stops(db: Session):
-    return db.query(PitStop).all()
-
-def get_pit_stop_by_id(db: Session, pit_stop_id: int):
-    return db.query(PitStop).filter(PitStop.pitStopId == pit_stop_id).first()
-
-def get_pit_stop_by_lap(db: Session, pit_stop_id: int):
-    return db.query(PitStop).filter(PitStop.pitStopId == pit_stop_id).first().lap_time
-
 def create_pit_stop(db: Session, pit_stop: schemas.PitStopCreate):
     db_pit_stop = PitStop(
         raceId=pit_stop.raceId,
@@ -420,17 +244,6 @@ def create_pit_stop(db: Session, pit_stop: schemas.PitStopCreate):
 
 
 #-----------------------------ConstructorStandings------------------------------
-# services.py
-
-from sqlalchemy.orm import Session
-from app.models import ConstructorStanding
-
-def get_constructor_standings(db: Session):
-    return db.query(ConstructorStanding).all()
-
-def get_constructor_standing_by_id(db: Session, standing_id: int):
-    return db.query(ConstructorStanding).filter(ConstructorStanding.constructorStandingsId == standing_id).first()
-
 def create_constructor_standing(db: Session, constructor_standing: schemas.ConstructorStandingCreate):
     db_constructor_standing = ConstructorStanding(
         raceId=constructor_standing.raceId,
@@ -448,12 +261,6 @@ def create_constructor_standing(db: Session, constructor_standing: schemas.Const
 
 #-----------------------------ConstructorResults------------------------------
 
-def get_constructor_results(db: Session):
-    return db.query(ConstructorResult).all()
-
-def get_constructor_result_by_id(db: Session, result_id: int):
-    return db.query(ConstructorResult).filter(ConstructorResult.constructorResultsId == result_id).first()
-
 def create_constructor_result(db: Session, constructor_result: schemas.ConstructorResultCreate):
     db_constructor_result = ConstructorResult(
         raceId=constructor_result.raceId,
@@ -469,12 +276,6 @@ def create_constructor_result(db: Session, constructor_result: schemas.Construct
 
 #----------------------------Constructor-----------------------------------------
 
-def get_constructors(db: Session):
-    return db.query(Constructor).all()
-
-def get_constructor_by_id(db: Session, constructor_id: int):
-    return db.query(Constructor).filter(Constructor.constructorId == constructor_id).first()
-
 def create_constructor(db: Session, constructor: schemas.ConstructorCreate):
     db_constructor = Constructor(
         constructorRef=constructor.constructorRef,
@@ -485,23 +286,3 @@ def create_constructor(db: Session, constructor: schemas.ConstructorCreate):
     db.commit()
     db.refresh(db_constructor)
     return db_constructor
-
-# Relationships
-
-def get_constructor_standings_by_constructor(db: Session, constructor_id):
-    return db.query(Constructor).filter(Constructor.constructorId==constructor_id).first().constructor_standings
-
-def get_constructor_results_by_constructor(db: Session, constructor_id):
-    return db.query(Constructor).filter(Constructor.constructorId==constructor_id).first().constructor_results
-
-def get_results_from_constructor(db: Session, constructor_id):
-    return db.query(Constructor).filter(Constructor.constructorId==constructor_id).first().results
-
-def get_qualifying_constructor(db: Session, constructor_id):
-    return db.query(Constructor).filter(Constructor.constructorId==constructor_id).first().qualifying
-
-def get_constructor_sprint_results(db: Session, constructor_id):
-    return db.query(Constructor).filter(Constructor.constructorId==constructor_id).first().sprint_results
-
-
-
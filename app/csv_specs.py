@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import Date, Float, Integer, String, Time
+
+from app.models import (
+    Constructor,
+    Driver, Season, Circuit, Status, Race, Result, PitStop, LapTime, Qualifying, SprintResult,
+    ConstructorResult, ConstructorStanding, DriverStanding
+)
+
+# Declarative mapping of the Ergast CSV files to the models, shared by the COPY loader, the ORM
+# loader and the reload scripts. Every column is coerced in one vectorized pass, values that do
+# not fit their column are counted per column instead of silently turning into None.
+
+# Written by Ergast for a missing value
+NULL_MARKERS = ['\\N', '']
+
+INT32_MAX = 2 ** 31 - 1
+
+
+class ColumnSpec:
+    """One CSV column: the model column it fills, how it is parsed and whether a row may leave it empty."""
+
+    def __init__(self, name: str, kind: str, required: bool = False):
+        self.name = name
+        self.kind = kind
+        self.required = required
+
+
+def column_kind(column_type):
+    if isinstance(column_type, Integer):
+        return 'int'
+    if isinstance(column_type, Float):
+        return 'float'
+    if isinstance(column_type, Date):
+        return 'date'
+    if isinstance(column_type, Time):
+        return 'time'
+    if isinstance(column_type, String):
+        return 'str'
+    raise TypeError(f"No CSV parser for {column_type}")
+
+
+class RejectionStats:
+    """Per column counts of the values that could not be loaded as they were."""
+
+    # invalid: not a value of the column type, loaded as NULL
+    # truncated: fractional value in an integer column, loaded without the fraction
+    # missing: empty required value, the row is skipped
+    REASONS = ('invalid', 'truncated', 'missing')
+
+    def __init__(self, table: str):
+        self.table = table
+        self.rows = 0
+        self.skipped = 0
+        self.columns = {}
+
+    def add(self, column: str, reason: str, count: int):
+        if count:
+            counts = self.columns.setdefault(column, dict.fromkeys(self.REASONS, 0))
+            counts[reason] += int(count)
+
+    def lines(self):
+        for column, counts in self.columns.items():
+            details = ', '.join(f"{count} {reason}" for reason, count in counts.items() if count)
+            yield f"⚠️ {self.table}.{column}: {details}"
+        if self.skipped:
+            yield f"⚠️ {self.table}: {self.skipped} of {self.rows} rows skipped"
+
+    def report(self):
+        for line in self.lines():
+            print(line)
+
+
+def coerce_column(values: pd.Series, spec: ColumnSpec, stats: RejectionStats):
+    present = values.notna()
+    if spec.kind == 'int':
+        numbers = pd.to_numeric(values, errors='coerce')
+        out_of_range = numbers.abs() > INT32_MAX
+        numbers = numbers.mask(out_of_range)
+        stats.add(spec.name, 'invalid', (present & numbers.isna()).sum())
+        whole = np.trunc(numbers)
+        stats.add(spec.name, 'truncated', (numbers.notna() & (numbers != whole)).sum())
+        return whole.astype('Int64')
+    if spec.kind == 'float':
+        numbers = pd.to_numeric(values, errors='coerce')
+        stats.add(spec.name, 'invalid', (present & numbers.isna()).sum())
+        return numbers
+    if spec.kind in ('date', 'time'):
+        layout = '%Y-%m-%d' if spec.kind == 'date' else '%H:%M:%S'
+        parsed = pd.to_datetime(values, format=layout, errors='coerce')
+        stats.add(spec.name, 'invalid', (present & parsed.isna()).sum())
+        return parsed.dt.strftime(layout)
+    return values.str.strip()
+
+
+class TableSpec:
+    """How one CSV file becomes rows of its model."""
+
+    def __init__(self, model, file_name: str, required: tuple, rename: dict = None):
+        self.model = model
+        self.file_name = file_name
+        self.rename = rename or {}
+        self.table = model.__table__.name
+        # Generated columns are computed by PostgreSQL and never come from the file
+        self.columns = [
+            ColumnSpec(column.name, column_kind(column.type), required=column.name in required)
+            for column in model.__table__.columns if column.computed is None
+        ]
+
+    def read_options(self):
+        return {'dtype': str, 'na_values': NULL_MARKERS, 'keep_default_na': False}
+
+    def coerce(self, chunk: pd.DataFrame, stats: RejectionStats):
+        """Keep the model's columns of a raw chunk, coerce them and drop the rows missing a required value."""
+        chunk = chunk.rename(columns=self.rename)
+        frame = pd.DataFrame(index=chunk.index)
+        for spec in self.columns:
+            if spec.name in chunk:
+                frame[spec.name] = coerce_column(chunk[spec.name], spec, stats)
+
+        stats.rows += len(frame)
+        keep = pd.Series(True, index=frame.index)
+        for spec in self.columns:
+            if spec.required and spec.name in frame:
+                missing = frame[spec.name].isna()
+                stats.add(spec.name, 'missing', missing.sum())
+                keep &= ~missing
+        stats.skipped += int((~keep).sum())
+        return frame[keep]
+
+
+# Load order follows the foreign keys: parents before children
+TABLE_SPECS = [
+    TableSpec(Season, 'seasons.csv', required=('year',)),
+    TableSpec(Status, 'status.csv', required=('statusId', 'status')),
+    TableSpec(Circuit, 'circuits.csv', required=('circuitId', 'circuitRef')),
+    TableSpec(Constructor, 'constructors.csv', required=('constructorId', 'constructorRef')),
+    TableSpec(Driver, 'drivers.csv', required=('driverId', 'driverRef')),
+    TableSpec(Race, 'races.csv', required=('raceId', 'seasonId', 'round')),
+    TableSpec(Result, 'results.csv', required=('resultId', 'raceId', 'driverId')),
+    TableSpec(SprintResult, 'sprint_results.csv', required=('sprintResultId', 'raceId', 'driverId'), rename={'resultId': 'sprintResultId'}),
+    TableSpec(Qualifying, 'qualifying.csv', required=('qualifyId', 'raceId', 'driverId')),
+    TableSpec(LapTime, 'lap_times.csv', required=('raceId', 'driverId', 'lap')),
+    TableSpec(PitStop, 'pit_stops.csv', required=('raceId', 'driverId', 'stop')),
+    TableSpec(ConstructorResult, 'constructor_results.csv', required=('constructorResultsId', 'raceId', 'constructorId')),
+    TableSpec(ConstructorStanding, 'constructor_standings.csv', required=('constructorStandingsId', 'raceId', 'constructorId')),
+    TableSpec(DriverStanding, 'driver_standings.csv', required=('driverStandingsId', 'raceId', 'driverId')),
+]
+
+SPECS_BY_MODEL = {spec.model: spec for spec in TABLE_SPECS}
+
+
+def records(frame: pd.DataFrame):
+    """Rows of a coerced frame as dicts of plain Python values, missing values as None."""
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
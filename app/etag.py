@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import time
+
+from sqlalchemy import text
+
+from app.cache import EXCLUDED_PREFIXES, cache_key, route_tables, season_index, season_params
+from app.changes import subscribe
+from app.config import ETAG_ENABLED, ETAG_VERSIONS_MAX_AGE, HTTP_MAX_AGE_CLOSED, HTTP_MAX_AGE_LIVE
+from app.database import async_engine
+
+
+class TableVersions:
+    """Change counters of all tables, read again after a change notification or once they are too old."""
+
+    def __init__(self, max_age: int):
+        self.max_age = max_age
+        self.versions = {}
+        self.loaded_at = None
+        self.lock = asyncio.Lock()
+
+    def fresh(self):
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.max_age
+
+    def reset(self):
+        self.loaded_at = None
+
+    async def get(self):
+        if self.fresh():
+            return self.versions
+        async with self.lock:
+            if not self.fresh():
+                loaded_at = time.monotonic()
+                async with async_engine.connect() as connection:
+                    rows = (await connection.execute(text(
+                        'SELECT "tableName", version, extract(epoch FROM "changedAt") FROM table_versions'
+                    ))).all()
+                # The change time tells a recreated database apart from the one the counters started in
+                self.versions = {name: f"{version}@{changed_at}" for name, version, changed_at in rows}
+                self.loaded_at = loaded_at
+        return self.versions
+
+
+table_versions = TableVersions(ETAG_VERSIONS_MAX_AGE)
+
+
+@subscribe
+def expire_table_versions(tables: set, seasons: set = None):
+    table_versions.reset()
+
+
+def compute_etag(key: str, tables: set, versions: dict):
+    """Strong ETag of a response from its url and the versions of the tables it reads."""
+    names = sorted(versions) if "*" in tables else sorted(tables)
+    stamp = ";".join(f"{name}={versions.get(name, 0)}" for name in names)
+    return '"' + hashlib.blake2b(f"{key}|{stamp}".encode(), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str):
+    # If-None-Match uses the weak comparison, a W/ prefix does not prevent a match. "*" is not
+    # honoured, whether the resource exists is only known once the route ran.
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def cache_control(closed: bool):
+    if closed:
+        return f"public, max-age={HTTP_MAX_AGE_CLOSED}"
+    # The live season changes during a race weekend, shared caches revalidate with the ETag once it expires
+    return f"public, max-age={HTTP_MAX_AGE_LIVE}, must-revalidate"
+
+
+# Path parameters a response is pinned to a season by, keyed by the literal segment before them
+ID_SEGMENTS = {"races": "race_id", "seasons": "season_id"}
+
+
+def path_params(path: str):
+    """Season pinning ids in a request path, read before the route runs."""
+    segments = path.strip("/").split("/")
+    return {ID_SEGMENTS[name]: value for name, value in zip(segments, segments[1:]) if name in ID_SEGMENTS}
+
+
+class ConditionalGetMiddleware:
+    """Add ETag and Cache-Control to GET responses and answer a matching If-None-Match with 304.
+
+    The ETag only depends on the url and the table versions, so a 304 is sent without running
+    the route or touching the response cache.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (not ETAG_ENABLED or scope["type"] != "http" or scope["method"] != "GET"
+                or scope["path"].startswith(EXCLUDED_PREFIXES)):
+            await self.app(scope, receive, send)
+            return
+
+        tables = route_tables(scope["path"])
+        etag = compute_etag(cache_key(scope), tables, await table_versions.get())
+        params = season_params(scope["query_string"], path_params(scope["path"]))
+        headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", cache_control(await season_index.closed(tables, params)).encode()),
+        ]
+
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match.decode("latin-1"), etag):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def add_headers(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+
+        await self.app(scope, receive, add_headers)
@@ -0,0 +1,47 @@
+from typing import Optional
+
+import orjson
+from fastapi import Response
+from sqlalchemy import select
+
+from app.pagination import Page
+
+# Fast path for the large list routes. Rather than loading ORM objects and validating a
+# response model per row, only the columns of the response schema are selected and the row
+# tuples are encoded with orjson. The JSON is the same as the response model would produce,
+# so this only works for flat schemas whose fields are all columns of the model.
+
+
+def columns(model, schema, fields=None, extra=()):
+    """Columns of the model in the field order of the response schema, or of fields when given.
+
+    The primary key and the extra columns are appended when left out, the pagination cursor is
+    built from them. encode_rows only zips the selected fields, so they never reach the response.
+    """
+    names = list(fields or schema.model_fields)
+    selected = [getattr(model, name) for name in names]
+    for key in [getattr(model, column.key) for column in model.__table__.primary_key] + list(extra):
+        if key.key not in names:
+            names.append(key.key)
+            selected.append(key)
+    return selected
+
+
+def select_rows(model, schema=None, fields=None, extra=()):
+    """select() of the whole entity, or of the schema's columns when a schema is given."""
+    if schema is None:
+        return select(model)
+    return select(*columns(model, schema, fields, extra))
+
+
+def encode_rows(rows, schema, fields=None) -> bytes:
+    names = tuple(fields or schema.model_fields)
+    return orjson.dumps([dict(zip(names, row)) for row in rows])
+
+
+def rows_response(rows, schema, page: Optional[Page] = None, fields=None):
+    """JSON response of row tuples, keeping the next page Link header the Page set."""
+    response = Response(content=encode_rows(rows, schema, fields), media_type="application/json")
+    if page is not None and "link" in page.response.headers:
+        response.headers["Link"] = page.response.headers["link"]
+    return response
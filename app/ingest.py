@@ -0,0 +1,241 @@
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from app.analytics import SOURCE_TABLES, refresh_analytics
+from app.bulk_loader import CHUNK_SIZE, read_frames
+from app.config import DATA_DIR
+from app.csv_specs import TABLE_SPECS, RejectionStats, TableSpec
+from app.database import engine
+from app.reload_data import reload_table
+from app.standings import SOURCE_TABLES as STANDINGS_SOURCES, derivable_races, update_standings
+from app.compare import SOURCE_TABLES as TEAMMATE_SOURCES, refresh_teammates
+from app.stats import SOURCE_TABLES as STATS_SOURCES, STATS, refresh_stats
+
+# Incremental ingest after a race weekend. The csv files hold the whole history, but usually only
+# the rows of the last race changed. A file whose bytes did not change since the last ingest is
+# skipped. Tables with a raceId are fingerprinted per race, and only the races whose rows are new
+# or changed go through the staging table, so a post-race run costs one race, not 75 seasons.
+# The rows of those races that are no longer in the file are deleted, as are all rows of a race
+# that disappeared from it.
+# The fingerprints are stored in ingest_files and ingest_partitions.
+
+# Bytes read per step when hashing a file
+FILE_BLOCK_SIZE = 1024 * 1024
+
+
+def file_fingerprint(path: str):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(FILE_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def partitioned(spec: TableSpec):
+    return any(column.name == 'raceId' for column in spec.columns)
+
+
+def partition_fingerprints(frames, race_seasons: dict):
+    """Fingerprint the coerced rows of every race, independent of their order in the file.
+
+    Returns {raceId: (fingerprint, rows)}. Rows carrying a seasonId add their race to race_seasons.
+    """
+    sums, counts = {}, {}
+    for frame in frames:
+        if 'seasonId' in frame:
+            race_seasons.update(zip(frame['raceId'].astype(int), frame['seasonId'].astype(int)))
+        hashes = pd.util.hash_pandas_object(frame, index=False)
+        grouped = hashes.groupby(frame['raceId'].to_numpy()).agg(['sum', 'count'])
+        for race_id, total, count in zip(grouped.index, grouped['sum'], grouped['count']):
+            race_id = int(race_id)
+            sums[race_id] = (sums.get(race_id, 0) + int(total)) % 2 ** 64
+            counts[race_id] = counts.get(race_id, 0) + int(count)
+    return {race_id: (f"{sums[race_id]:016x}", counts[race_id]) for race_id in sums}
+
+
+def stored_file(connection, table: str):
+    return connection.execute(
+        text('SELECT fingerprint, "highWaterRaceId" FROM ingest_files WHERE "tableName" = :table'),
+        {'table': table},
+    ).first()
+
+
+def stored_partitions(connection, table: str):
+    rows = connection.execute(
+        text('SELECT "raceId", fingerprint, rows FROM ingest_partitions WHERE "tableName" = :table'),
+        {'table': table},
+    ).all()
+    return {race_id: (fingerprint, count) for race_id, fingerprint, count in rows}
+
+
+def lookup_race_seasons(connection, race_ids):
+    rows = connection.execute(
+        text('SELECT "raceId", "seasonId" FROM races WHERE "raceId" = ANY(:race_ids)'),
+        {'race_ids': sorted(race_ids)},
+    ).all()
+    return dict(rows)
+
+
+def save_fingerprints(connection, spec: TableSpec, fingerprint: str, rows: int, partitions: dict, removed=()):
+    high_water = max(partitions, default=None)
+    connection.execute(text('''
+        INSERT INTO ingest_files ("tableName", "fileName", fingerprint, rows, "highWaterRaceId", "loadedAt")
+        VALUES (:table, :file_name, :fingerprint, :rows, :high_water, now())
+        ON CONFLICT ("tableName") DO UPDATE SET
+            "fileName" = EXCLUDED."fileName", fingerprint = EXCLUDED.fingerprint, rows = EXCLUDED.rows,
+            "highWaterRaceId" = GREATEST(ingest_files."highWaterRaceId", EXCLUDED."highWaterRaceId"),
+            "loadedAt" = now()
+    '''), {'table': spec.table, 'file_name': spec.file_name, 'fingerprint': fingerprint, 'rows': rows, 'high_water': high_water})
+    if partitions:
+        connection.execute(text('''
+            INSERT INTO ingest_partitions ("tableName", "raceId", fingerprint, rows, "loadedAt")
+            VALUES (:table, :race_id, :fingerprint, :rows, now())
+            ON CONFLICT ("tableName", "raceId") DO UPDATE SET
+                fingerprint = EXCLUDED.fingerprint, rows = EXCLUDED.rows, "loadedAt" = now()
+        '''), [
+            {'table': spec.table, 'race_id': race_id, 'fingerprint': fingerprint, 'rows': count}
+            for race_id, (fingerprint, count) in partitions.items()
+        ])
+    if removed:
+        connection.execute(
+            text('DELETE FROM ingest_partitions WHERE "tableName" = :table AND "raceId" = ANY(:race_ids)'),
+            {'table': spec.table, 'race_ids': sorted(removed)},
+        )
+
+
+def ingest_table(spec: TableSpec, data_dir: str = DATA_DIR, chunk_size: int = CHUNK_SIZE, force: bool = False,
+                 stats: RejectionStats = None):
+    """Stage the new and changed races of one csv, or the whole file for tables without a raceId.
+
+    Returns (changed partitions, total partitions, inserted, updated, deleted, seasons, races, previous)
+    where seasons are the seasonIds the change is limited to and races the staged and removed raceIds,
+    both None when it can touch any season, and previous the ids the changed rows had before, see
+    reload_table. None for an unchanged file.
+    """
+    path = os.path.join(data_dir, spec.file_name)
+    fingerprint = file_fingerprint(path)
+    with engine.connect() as connection:
+        stored = stored_file(connection, spec.table)
+        known = stored_partitions(connection, spec.table) if partitioned(spec) else {}
+    if not force and stored is not None and stored.fingerprint == fingerprint:
+        return None
+
+    if not partitioned(spec):
+        inserted, updated, _, unchanged, _, previous = reload_table(spec, data_dir=data_dir, stats=stats)
+        with engine.begin() as connection:
+            save_fingerprints(connection, spec, fingerprint, inserted + updated + unchanged, {})
+        return 1, 1, inserted, updated, 0, None, None, previous
+
+    race_seasons = {}
+    partitions = partition_fingerprints(read_frames(spec, data_dir=data_dir, chunk_size=chunk_size, stats=stats), race_seasons)
+    high_water = stored.highWaterRaceId if stored is not None and stored.highWaterRaceId is not None else 0
+    changed = {
+        race_id: value for race_id, value in partitions.items()
+        if force or race_id > high_water or known.get(race_id) != value
+    }
+    # Races with stored rows but none left in the file
+    removed = set(known) - set(partitions)
+    staged = set(changed) | removed
+
+    inserted = updated = deleted = 0
+    seasons, previous = set(), {}
+    if staged:
+        with engine.connect() as connection:
+            missing = staged - set(race_seasons)
+            race_seasons.update(lookup_race_seasons(connection, missing) if missing else {})
+        seasons = {race_seasons[race_id] for race_id in staged if race_id in race_seasons}
+        # Second pass over the file, only the rows of the changed races reach the staging table
+        frames = (
+            frame[frame['raceId'].isin(list(changed))]
+            for frame in read_frames(spec, data_dir=data_dir, chunk_size=chunk_size, stats=RejectionStats(spec.table))
+        )
+        inserted, updated, deleted, _, _, previous = reload_table(spec, data_dir=data_dir, frames=frames, seasons=seasons, replace_races=staged)
+
+    with engine.begin() as connection:
+        save_fingerprints(connection, spec, fingerprint, sum(count for _, count in partitions.values()), changed, removed)
+    return len(staged), len(partitions), inserted, updated, deleted, seasons, staged, previous
+
+
+def ingest_all(data_dir: str = DATA_DIR, chunk_size: int = CHUNK_SIZE, force: bool = False, specs=TABLE_SPECS):
+    """Ingest every csv incrementally and print the changed races and rows per table."""
+    print(f"{'table':<24}{'races':>12}{'inserted':>10}{'updated':>10}{'deleted':>10}{'seconds':>10}")
+    changed, seasons, rejected = set(), set(), []
+    changed_races = {}
+    previous_ids = {entity: set() for entity in STATS}
+    every_season = False
+    for spec in specs:
+        stats = RejectionStats(spec.table)
+        started = time.perf_counter()
+        try:
+            outcome = ingest_table(spec, data_dir=data_dir, chunk_size=chunk_size, force=force, stats=stats)
+        except Exception as e:
+            print(f"❌ Error ingesting {spec.table}: {e}")
+            break
+        elapsed = time.perf_counter() - started
+        rejected.extend(stats.lines())
+        if outcome is None:
+            print(f"{spec.table:<24}{'unchanged':>12}{0:>10}{0:>10}{0:>10}{elapsed:>10.2f}")
+            continue
+        partitions, total, inserted, updated, deleted, table_seasons, table_races, previous = outcome
+        print(f"{spec.table:<24}{f'{partitions}/{total}':>12}{inserted:>10}{updated:>10}{deleted:>10}{elapsed:>10.2f}")
+        if inserted or updated or deleted:
+            changed.add(spec.table)
+            if table_seasons is None:
+                every_season = True
+            else:
+                seasons |= table_seasons
+            if table_races is not None:
+                changed_races[spec.table] = table_races
+            for entity, ids in previous.items():
+                previous_ids[entity] |= ids
+
+    for line in rejected:
+        print(line)
+
+    affected = None if every_season else seasons
+    if changed & SOURCE_TABLES:
+        races = set().union(*(changed_races.get(table, ()) for table in SOURCE_TABLES))
+        with engine.begin() as connection:
+            refresh_analytics(connection, races)
+        print(f"✅ Lap analytics refreshed for {len(races)} races")
+    if changed & STANDINGS_SOURCES:
+        with engine.begin() as connection:
+            races = derivable_races(connection, changed_races)
+            update_standings(connection, races)
+        print(f"✅ Standings recomputed from the first changed round of {len(races)} races")
+    if changed & STATS_SOURCES:
+        races = set().union(*(changed_races.get(table, ()) for table in STATS_SOURCES))
+        with engine.begin() as connection:
+            refresh_stats(connection, races, previous_ids)
+        print(f"✅ Career and season stats refreshed for the drivers and constructors of {len(races)} races")
+    if changed & TEAMMATE_SOURCES:
+        races = set().union(*(changed_races.get(table, ()) for table in TEAMMATE_SOURCES))
+        with engine.begin() as connection:
+            refresh_teammates(connection, races)
+        print("✅ Teammate head to heads refreshed for the seasons of the changed races")
+    if changed:
+        print(f"✅ Changed {', '.join(sorted(changed))} for {'every season' if affected is None else f'seasons {sorted(affected)}'}")
+    else:
+        print("✅ Nothing changed")
+    return changed, affected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest only the races whose csv rows are new or changed.")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="folder with the csv files")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows parsed per chunk")
+    parser.add_argument("--tables", nargs="+", choices=[spec.table for spec in TABLE_SPECS], metavar="TABLE")
+    parser.add_argument("--force", action="store_true", help="stage every race, ignoring the stored fingerprints")
+    args = parser.parse_args(argv)
+    specs = [spec for spec in TABLE_SPECS if not args.tables or spec.table in args.tables]
+    ingest_all(args.data_dir, args.chunk_size, force=args.force, specs=specs)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
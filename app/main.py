@@ -1,16 +1,35 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.routers import drivers, races, circuits, results, laps, seasons, sprint_results, status, pit_stops, constructor_results, constructor_standings, constructors
+from app.cache import ResponseCacheMiddleware
+from app.changes import listen
+from app.etag import ConditionalGetMiddleware
+from app.routers import drivers, races, circuits, results, laps, seasons, sprint_results, status, pit_stops, constructor_results, constructor_standings, driver_standings, constructors, exports, metrics, compare
 from fastapi.middleware.cors import CORSMiddleware
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Table change notifications from other processes, e.g. the reload scripts, invalidate the caches
+    listener = await listen()
+    yield
+    if listener is not None:
+        await listener.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
+# Added before CORS so they run inside it and never cache the per-origin CORS headers.
+# The conditional GET check runs first, a 304 skips both the response cache and the route.
+app.add_middleware(ResponseCacheMiddleware)
+app.add_middleware(ConditionalGetMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow all origins (you can restrict this later to specific domains)
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods (GET, POST, etc.)
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["Link", "ETag"],  # Lets the frontend read the next page link of list routes and the ETag
 )
 
 # Include routers
@@ -25,5 +44,9 @@ app.include_router(status.router)
 app.include_router(pit_stops.router)
 app.include_router(constructor_results.router)
 app.include_router(constructor_standings.router)
+app.include_router(driver_standings.router)
 app.include_router(constructors.router)
+app.include_router(exports.router)
+app.include_router(compare.router)
+app.include_router(metrics.router)
 
@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import deque
+
+from app.config import DB_MAX_OVERFLOW
+
+# Number of recent checkouts kept for the wait time percentiles
+WAIT_SAMPLES = 1000
+
+
+class PoolMetrics:
+    """Checkout wait times of one engine's connection pool, in milliseconds."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.checkouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.recent = deque(maxlen=WAIT_SAMPLES)
+        self.lock = threading.Lock()
+
+    def record(self, started: float):
+        wait_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.recent.append(wait_ms)
+
+    def snapshot(self):
+        pool = self.engine.pool
+        with self.lock:
+            recent = sorted(self.recent)
+            stats = {
+                "checkouts": self.checkouts,
+                "wait_ms_avg": self.total_wait_ms / self.checkouts if self.checkouts else 0.0,
+                "wait_ms_p95": recent[int(len(recent) * 0.95) - 1] if recent else 0.0,
+                "wait_ms_max": self.max_wait_ms,
+            }
+        stats["pool"] = type(pool).__name__
+        if hasattr(pool, "size"):
+            # QueuePool, saturation is the share of all allowed connections that are in use
+            capacity = pool.size() + DB_MAX_OVERFLOW
+            stats["size"] = pool.size()
+            stats["checked_out"] = pool.checkedout()
+            stats["overflow"] = max(pool.overflow(), 0)
+            stats["saturation"] = pool.checkedout() / capacity if capacity else 0.0
+        return stats
@@ -1,9 +1,36 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Time, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Date, DateTime, Time, ForeignKey, Index, UniqueConstraint, Computed, DDL, event, func
 from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.dialects.postgresql import JSONB
 from .database import Base
 
+# Parses "1:27.452", "27.452" and "1:30:00.001" into milliseconds, NULL for anything else.
+# The *Ms columns are generated from the time strings with it, the strings stay for display.
+LAP_TIME_MS_FUNCTION = r'''
+CREATE OR REPLACE FUNCTION lap_time_ms(value text) RETURNS integer
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE
+        WHEN value ~ '^\d+:\d{1,2}:\d{1,2}(\.\d+)?$' THEN round((
+            split_part(value, ':', 1)::numeric * 3600 + split_part(value, ':', 2)::numeric * 60 + split_part(value, ':', 3)::numeric
+        ) * 1000)::integer
+        WHEN value ~ '^\d+:\d{1,2}(\.\d+)?$' THEN round((
+            split_part(value, ':', 1)::numeric * 60 + split_part(value, ':', 2)::numeric
+        ) * 1000)::integer
+        WHEN value ~ '^\d+(\.\d+)?$' THEN round(value::numeric * 1000)::integer
+    END
+$$
+'''
+event.listen(Base.metadata, 'before_create', DDL(LAP_TIME_MS_FUNCTION))
+
+
+def time_ms(column: str):
+    """Integer milliseconds generated from a time string column."""
+    return Column(Integer, Computed(f'lap_time_ms("{column}")', persisted=True))
+
 class Driver(Base):
     __tablename__ = 'drivers'
+    __table_args__ = (
+        UniqueConstraint('driverRef', name='uq_drivers_driver_ref'),
+    )
     driverId = Column(Integer, primary_key=True)
     driverRef = Column(String)
     number = Column(Integer)
@@ -33,6 +60,9 @@ class Status(Base):
 
 class Season(Base):
     __tablename__ = 'seasons'
+    __table_args__ = (
+        UniqueConstraint('year', name='uq_seasons_year'),
+    )
     seasonId = Column(Integer, primary_key=True, autoincrement=True)
     year = Column(Integer, nullable=False)
     # Relationship to races
@@ -40,6 +70,9 @@ class Season(Base):
 
 class Constructor(Base):
     __tablename__ = 'constructors'
+    __table_args__ = (
+        UniqueConstraint('constructorRef', name='uq_constructors_constructor_ref'),
+    )
     constructorId = Column(Integer, primary_key=True)
     constructorRef = Column(String, nullable=False)
     name = Column(String, nullable=False)
@@ -56,6 +89,9 @@ class Constructor(Base):
 
 class Circuit(Base):
     __tablename__ = 'circuits'
+    __table_args__ = (
+        UniqueConstraint('circuitRef', name='uq_circuits_circuit_ref'),
+    )
     circuitId = Column(Integer, primary_key=True)
     circuitRef = Column(String)
     name = Column(String)
@@ -72,6 +108,10 @@ class Circuit(Base):
 
 class Race(Base):
     __tablename__ = 'races'
+    __table_args__ = (
+        UniqueConstraint('seasonId', 'round', name='uq_races_season_round'),
+        Index('ix_races_circuit', 'circuitId'),
+    )
     #raceId
     raceId = Column(Integer, primary_key=True)
     #seasonId
@@ -112,6 +152,13 @@ class Race(Base):
 
 class Result(Base):
     __tablename__ = 'results'
+    __table_args__ = (
+        Index('ix_results_race_position_order', 'raceId', 'positionOrder'),
+        Index('ix_results_driver_race', 'driverId', 'raceId'),
+        Index('ix_results_constructor_race', 'constructorId', 'raceId'),
+        Index('ix_results_status', 'statusId'),
+        Index('ix_results_race_fastest_lap', 'raceId', 'fastestLapMs'),
+    )
     resultId = Column(Integer, primary_key=True)
     raceId = Column(Integer, ForeignKey('races.raceId'))
     driverId = Column(Integer, ForeignKey('drivers.driverId'))
@@ -121,13 +168,14 @@ class Result(Base):
     position = Column(Integer)
     positionText = Column(String)
     positionOrder = Column(Integer)
-    points = Column(Integer)
+    points = Column(Float)
     laps = Column(Integer)
     time = Column(String)
     milliseconds = Column(Integer)
     fastestLap = Column(Integer)
     rank = Column(Integer)
     fastestLapTime = Column(String)
+    fastestLapMs = time_ms('fastestLapTime')
     fastestLapSpeed = Column(Float)
     statusId = Column(Integer, ForeignKey('status.statusId'))
 
@@ -139,6 +187,11 @@ class Result(Base):
 
 class PitStop(Base):
     __tablename__ = 'pit_stops'
+    __table_args__ = (
+        UniqueConstraint('raceId', 'driverId', 'stop', name='uq_pit_stops_race_driver_stop'),
+        Index('ix_pit_stops_driver_race', 'driverId', 'raceId'),
+        Index('ix_pit_stops_lap', 'lapId'),
+    )
     pitStopId = Column(Integer, primary_key=True, autoincrement=True)
     raceId = Column(Integer, ForeignKey('races.raceId'))
     driverId = Column(Integer, ForeignKey('drivers.driverId'))
@@ -156,6 +209,12 @@ class PitStop(Base):
 
 class Qualifying(Base):
     __tablename__ = 'qualifying'
+    __table_args__ = (
+        Index('ix_qualifying_race_driver', 'raceId', 'driverId'),
+        Index('ix_qualifying_driver_race', 'driverId', 'raceId'),
+        Index('ix_qualifying_constructor_race', 'constructorId', 'raceId'),
+        Index('ix_qualifying_race_position', 'raceId', 'position'),
+    )
     qualifyId = Column(Integer, primary_key=True)
     raceId = Column(Integer, ForeignKey('races.raceId'))
     driverId = Column(Integer, ForeignKey('drivers.driverId'))
@@ -165,6 +224,9 @@ class Qualifying(Base):
     q1 = Column(String)
     q2 = Column(String)
     q3 = Column(String)
+    q1Ms = time_ms('q1')
+    q2Ms = time_ms('q2')
+    q3Ms = time_ms('q3')
 
     # Relationships
     race = relationship('Race', back_populates='qualifying')
@@ -173,10 +235,14 @@ class Qualifying(Base):
 
 class ConstructorResult(Base):
     __tablename__ = 'constructor_results'
+    __table_args__ = (
+        Index('ix_constructor_results_race_constructor', 'raceId', 'constructorId'),
+        Index('ix_constructor_results_constructor_race', 'constructorId', 'raceId'),
+    )
     constructorResultsId = Column(Integer, primary_key=True)
     raceId = Column(Integer, ForeignKey('races.raceId'))
     constructorId = Column(Integer, ForeignKey('constructors.constructorId'))
-    points = Column(Integer)
+    points = Column(Float)
     status = Column(String, nullable=True)
 
     #relationships
@@ -186,10 +252,14 @@ class ConstructorResult(Base):
 
 class ConstructorStanding(Base):
     __tablename__ = 'constructor_standings'
+    __table_args__ = (
+        UniqueConstraint('raceId', 'constructorId', name='uq_constructor_standings_race_constructor'),
+        Index('ix_constructor_standings_constructor_race', 'constructorId', 'raceId'),
+    )
     constructorStandingsId = Column(Integer, primary_key=True)
     raceId = Column(Integer, ForeignKey('races.raceId'))
     constructorId = Column(Integer, ForeignKey('constructors.constructorId'))
-    points = Column(Integer)
+    points = Column(Float)
     position = Column(Integer)
     positionText = Column(String)
     wins = Column(Integer)
@@ -202,10 +272,14 @@ class ConstructorStanding(Base):
 
 class DriverStanding(Base):
     __tablename__ = 'driver_standings'
+    __table_args__ = (
+        UniqueConstraint('raceId', 'driverId', name='uq_driver_standings_race_driver'),
+        Index('ix_driver_standings_driver_race', 'driverId', 'raceId'),
+    )
     driverStandingsId = Column(Integer, primary_key=True)
     raceId = Column(Integer, ForeignKey('races.raceId'))
     driverId = Column(Integer, ForeignKey('drivers.driverId'))
-    points = Column(Integer)
+    points = Column(Float)
     position = Column(Integer)
     positionText = Column(String)
     wins = Column(Integer)
@@ -216,6 +290,11 @@ class DriverStanding(Base):
 
 class LapTime(Base):
     __tablename__ = 'lap_times'
+    __table_args__ = (
+        UniqueConstraint('raceId', 'driverId', 'lap', name='uq_lap_times_race_driver_lap'),
+        Index('ix_lap_times_driver_race', 'driverId', 'raceId'),
+        Index('ix_lap_times_race_milliseconds', 'raceId', 'milliseconds'),
+    )
     lapId = Column(Integer, primary_key=True, autoincrement=True)
     raceId = Column(Integer, ForeignKey('races.raceId'))
     driverId = Column(Integer, ForeignKey('drivers.driverId'))
@@ -231,6 +310,11 @@ class LapTime(Base):
 
 class SprintResult(Base):
     __tablename__ = 'sprint_results'
+    __table_args__ = (
+        Index('ix_sprint_results_race_position_order', 'raceId', 'positionOrder'),
+        Index('ix_sprint_results_driver_race', 'driverId', 'raceId'),
+        Index('ix_sprint_results_constructor_race', 'constructorId', 'raceId'),
+    )
     sprintResultId = Column(Integer, primary_key=True)
     raceId = Column(Integer, ForeignKey('races.raceId'))
     driverId = Column(Integer, ForeignKey('drivers.driverId'))
@@ -240,12 +324,13 @@ class SprintResult(Base):
     position = Column(Integer)
     positionText = Column(String)
     positionOrder = Column(Integer)
-    points = Column(Integer)
+    points = Column(Float)
     laps = Column(Integer)
     time = Column(String)
     milliseconds = Column(Integer)
     fastestLap = Column(Integer)
     fastestLapTime = Column(String)
+    fastestLapMs = time_ms('fastestLapTime')
     statusId = Column(Integer, ForeignKey('status.statusId'))
 
     #Relationships
@@ -255,3 +340,124 @@ class SprintResult(Base):
     status = relationship('Status', back_populates='sprint_results')
 
 
+class TableVersion(Base):
+    """Change counter of a table, bumped in the transaction of every write to it."""
+    __tablename__ = 'table_versions'
+    tableName = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    changedAt = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class IngestFile(Base):
+    """Fingerprint of the csv file a table was last ingested from, an unchanged file is skipped."""
+    __tablename__ = 'ingest_files'
+    tableName = Column(String, primary_key=True)
+    fileName = Column(String, nullable=False)
+    fingerprint = Column(String, nullable=False)
+    rows = Column(Integer, nullable=False)
+    # Highest raceId ingested, partitions above it are new without comparing fingerprints
+    highWaterRaceId = Column(Integer)
+    loadedAt = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class IngestPartition(Base):
+    """Fingerprint of the rows of one race in one table, only changed races are staged again."""
+    __tablename__ = 'ingest_partitions'
+    tableName = Column(String, primary_key=True)
+    raceId = Column(Integer, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    rows = Column(Integer, nullable=False)
+    loadedAt = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class StatColumns:
+    """Totals shared by the season and career statistics of drivers and constructors, see app/stats.py."""
+    races = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    podiums = Column(Integer, nullable=False, default=0)
+    poles = Column(Integer, nullable=False, default=0)
+    fastestLaps = Column(Integer, nullable=False, default=0)
+    # Race and sprint points, sprintPoints is the sprint share
+    points = Column(Float, nullable=False, default=0)
+    sprintWins = Column(Integer, nullable=False, default=0)
+    sprintPoints = Column(Float, nullable=False, default=0)
+    bestFinish = Column(Integer)
+    # Race results without a classified position, and their count per status text
+    dnfs = Column(Integer, nullable=False, default=0)
+    dnfsByStatus = Column(JSONB, nullable=False, server_default='{}')
+
+
+class DriverSeasonStat(StatColumns, Base):
+    __tablename__ = 'driver_season_stats'
+    driverId = Column(Integer, primary_key=True)
+    seasonId = Column(Integer, primary_key=True)
+
+
+class DriverCareerStat(StatColumns, Base):
+    __tablename__ = 'driver_career_stats'
+    driverId = Column(Integer, primary_key=True)
+    seasons = Column(Integer, nullable=False, default=0)
+
+
+class ConstructorSeasonStat(StatColumns, Base):
+    __tablename__ = 'constructor_season_stats'
+    constructorId = Column(Integer, primary_key=True)
+    seasonId = Column(Integer, primary_key=True)
+
+
+class ConstructorCareerStat(StatColumns, Base):
+    __tablename__ = 'constructor_career_stats'
+    constructorId = Column(Integer, primary_key=True)
+    seasons = Column(Integer, nullable=False, default=0)
+
+
+class TeammateStat(Base):
+    """Head to head of a driver and a teammate in one season and team, see app/compare.py.
+
+    Every pair is stored once for each driver, so both lookups are a primary key prefix.
+    """
+    __tablename__ = 'teammate_stats'
+    driverId = Column(Integer, primary_key=True)
+    teammateId = Column(Integer, primary_key=True)
+    seasonId = Column(Integer, primary_key=True)
+    constructorId = Column(Integer, primary_key=True)
+    # Races both have a result in, and how many of them the driver finished ahead in
+    races = Column(Integer, nullable=False, default=0)
+    raceAhead = Column(Integer, nullable=False, default=0)
+    # Qualifying sessions both set a position in, and how many the driver was ahead in
+    qualifying = Column(Integer, nullable=False, default=0)
+    qualifyingAhead = Column(Integer, nullable=False, default=0)
+    # Laps where neither was on an in or out lap, and the driver's mean lap time minus the teammate's
+    laps = Column(Integer, nullable=False, default=0)
+    paceGapMs = Column(Integer)
+
+
+class LapGap(Base):
+    """Race time, gaps and rolling pace of a driver after each lap, see app/analytics.py."""
+    __tablename__ = 'lap_gaps'
+    raceId = Column(Integer, primary_key=True)
+    lap = Column(Integer, primary_key=True)
+    driverId = Column(Integer, primary_key=True)
+    position = Column(Integer)
+    milliseconds = Column(Integer)
+    cumulativeMs = Column(BigInteger)
+    gapToLeaderMs = Column(BigInteger)
+    gapToAheadMs = Column(BigInteger)
+    rollingPaceMs = Column(Integer)
+
+    __table_args__ = (
+        Index('ix_lap_gaps_race_driver', 'raceId', 'driverId', 'lap'),
+    )
+
+
+class LapStint(Base):
+    """Laps of a driver between two pit stops, see app/analytics.py."""
+    __tablename__ = 'lap_stints'
+    raceId = Column(Integer, primary_key=True)
+    driverId = Column(Integer, primary_key=True)
+    stint = Column(Integer, primary_key=True)
+    startLap = Column(Integer)
+    endLap = Column(Integer)
+    laps = Column(Integer)
+    averageMs = Column(Integer)
+    bestMs = Column(Integer)
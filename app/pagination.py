@@ -0,0 +1,132 @@
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Query, Request, Response
+from sqlalchemy import and_, false, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 10000
+
+
+def encode_cursor(values: list):
+    """Opaque cursor for the key of the last row on a page."""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def sort_key(key):
+    """(column, descending) of an order_by key, a column or column.desc()."""
+    if isinstance(key, UnaryExpression) and key.modifier is operators.desc_op:
+        return key.element, True
+    return key, False
+
+
+def parse_value(column, value):
+    """Convert a cursor or query string value to the python type of the column, None stays None."""
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    try:
+        if isinstance(value, python_type):
+            return value
+        if hasattr(python_type, "fromisoformat"):
+            return python_type.fromisoformat(str(value))
+        return python_type(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid value for {column.key}: {value}")
+
+
+def after_key(keys, values):
+    """Rows after the given key values in the order of keys.
+
+    Ascending keys with no NULLs compare as one row value, which is a single index range.
+    Otherwise the condition is spelled out key by key, with PostgreSQL's default of NULLs
+    last when ascending and first when descending.
+    """
+    sorted_keys = [sort_key(key) for key in keys]
+    if not any(descending or column.nullable for column, descending in sorted_keys):
+        return tuple_(*keys) > tuple_(*values)
+
+    branches = []
+    for index, (column, descending) in enumerate(sorted_keys):
+        value = values[index]
+        if descending:
+            later = column.isnot(None) if value is None else column < value
+        else:
+            later = false() if value is None else or_(column > value, column.is_(None))
+        equal = [prior.is_not_distinct_from(values[position]) for position, (prior, _) in enumerate(sorted_keys[:index])]
+        branches.append(and_(*equal, later))
+    return or_(*branches)
+
+
+class Page:
+    """Keyset pagination for list routes.
+
+    Rows are ordered by the given key columns and the next page starts after the key of
+    the last row, so every page is one index range scan no matter how deep the client goes.
+    The URL of the next page is returned in the Link header.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        response: Response,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+        after: Optional[str] = None,
+    ):
+        self.request = request
+        self.response = response
+        self.limit = limit
+        self.after = after
+
+    def apply(self, statement, *keys):
+        """Restrict a select() to this page, one row past the limit tells if there is a next page."""
+        if self.after:
+            values = decode_cursor(self.after)
+            if len(values) != len(keys):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            values = [parse_value(sort_key(key)[0], value) for key, value in zip(keys, values)]
+            statement = statement.filter(after_key(keys, values))
+        return statement.order_by(*keys).limit(self.limit + 1)
+
+    def finish(self, rows: list, keys):
+        """Drop the look-ahead row and point the Link header at the next page."""
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            cursor = encode_cursor([getattr(rows[-1], sort_key(key)[0].key) for key in keys])
+            next_url = self.request.url.include_query_params(after=cursor)
+            self.response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return rows
+
+    async def paginate_async(self, db: AsyncSession, statement, *keys):
+        rows = await fetch_all(db, self.apply(statement, *keys))
+        return self.finish(list(rows), keys)
+
+
+async def fetch_all(db: AsyncSession, statement):
+    """ORM objects for a select() of one entity, row tuples for a select() of columns."""
+    result = await db.execute(statement)
+    descriptions = statement.column_descriptions
+    if len(descriptions) == 1 and descriptions[0]["expr"] is descriptions[0]["entity"]:
+        return result.scalars().all()
+    return result.all()
+
+
+async def paginate_async(db: AsyncSession, statement, page: Optional[Page], *keys):
+    """Apply the page to the select(), without a page every row is returned in key order."""
+    if page is None:
+        return await fetch_all(db, statement.order_by(*keys))
+    return await page.paginate_async(db, statement, *keys)
@@ -0,0 +1,63 @@
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Everything the driver page shows, built in PostgreSQL like the race weekend payloads. Every
+# section is one scalar subquery aggregating its rows with to_jsonb and json_agg, so the page
+# costs one statement on one connection instead of seven requests. season= limits the race
+# sections to the races of one championship year, the seasons section always lists every
+# season the driver raced in so the page can offer the others.
+
+# Section -> subquery, {races} is the condition on the section's raceId
+SECTIONS = {
+    'results': '''
+        SELECT COALESCE(json_agg(to_jsonb(t) ORDER BY t."resultId"), '[]')
+        FROM results t WHERE t."driverId" = d."driverId"{races}''',
+    'races': '''
+        SELECT COALESCE(json_agg(to_jsonb(t) ORDER BY t."raceId"), '[]')
+        FROM races t WHERE t."raceId" IN (SELECT "raceId" FROM results WHERE "driverId" = d."driverId"){races}''',
+    'qualifying': '''
+        SELECT COALESCE(json_agg(to_jsonb(t) ORDER BY t."qualifyId"), '[]')
+        FROM qualifying t WHERE t."driverId" = d."driverId"{races}''',
+    'driver_standings': '''
+        SELECT COALESCE(json_agg(to_jsonb(t) ORDER BY t."driverStandingsId"), '[]')
+        FROM driver_standings t WHERE t."driverId" = d."driverId"{races}''',
+    'sprint_results': '''
+        SELECT COALESCE(json_agg(to_jsonb(t) ORDER BY t."sprintResultId"), '[]')
+        FROM sprint_results t WHERE t."driverId" = d."driverId"{races}''',
+    'seasons': '''
+        SELECT COALESCE(json_agg(to_jsonb(t) ORDER BY t.year), '[]')
+        FROM seasons t WHERE t."seasonId" IN (
+            SELECT r."seasonId" FROM races r JOIN results x ON x."raceId" = r."raceId" WHERE x."driverId" = d."driverId"
+        )''',
+}
+
+SEASON_RACES = '''
+        AND t."raceId" IN (
+            SELECT r."raceId" FROM races r JOIN seasons s ON s."seasonId" = r."seasonId" WHERE s.year = :season
+        )'''
+
+
+@lru_cache(maxsize=None)
+def profile_sql(sections: tuple, by_season: bool):
+    races = SEASON_RACES if by_season else ''
+    fields = ''.join(
+        f",\n    '{name}', ({SECTIONS[name].format(races=races)}\n    )" for name in sections
+    )
+    return f'''
+SELECT json_build_object(
+    'driver', to_jsonb(d){fields}
+)::text
+FROM drivers d
+WHERE d."driverId" = :driver_id
+'''
+
+
+async def get_driver_profile(db: AsyncSession, driver_id: int, sections=tuple(SECTIONS), season: Optional[int] = None):
+    """JSON text of the driver and the chosen sections, None when the driver does not exist."""
+    params = {"driver_id": driver_id}
+    if season is not None:
+        params["season"] = season
+    return await db.scalar(text(profile_sql(tuple(sections), season is not None)), params)
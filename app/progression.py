@@ -0,0 +1,70 @@
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Championship progression of a season, the points and position of every driver or constructor
+# after each round, built in PostgreSQL like the race weekend payloads. The standings tables hold
+# one snapshot per round, so the whole season is one join of its races with their standings rows.
+# Rounds without standings, e.g. races still to run, are left out. An entry is null for the rounds
+# before a driver or constructor first appeared.
+
+# Standings of /seasons/{season_id}/standings/{kind}: (table, entity column)
+KINDS = {
+    'drivers': ('driver_standings', 'driverId'),
+    'constructors': ('constructor_standings', 'constructorId'),
+}
+
+
+@lru_cache(maxsize=None)
+def progression_sql(kind: str, up_to_round: bool):
+    table, entity = KINDS[kind]
+    round_filter = ' AND r.round <= :after_round' if up_to_round else ''
+    return f'''
+WITH rounds AS (
+    SELECT r."raceId", r.round, r.name
+    FROM races r
+    WHERE r."seasonId" = :season_id{round_filter}
+      AND EXISTS (SELECT 1 FROM {table} t WHERE t."raceId" = r."raceId")
+),
+snapshots AS (
+    SELECT t."{entity}" AS id, k.round, t.points, t.position
+    FROM {table} t
+    JOIN rounds k ON k."raceId" = t."raceId"
+),
+lines AS (
+    SELECT e.id,
+        array_agg(s.points ORDER BY k.round) AS points,
+        array_agg(s.position ORDER BY k.round) AS positions,
+        (array_agg(s.position ORDER BY k.round DESC))[1] AS final
+    FROM (SELECT DISTINCT id FROM snapshots) e
+    CROSS JOIN rounds k
+    LEFT JOIN snapshots s ON s.id = e.id AND s.round = k.round
+    GROUP BY e.id
+)
+SELECT json_build_object(
+    'seasonId', se."seasonId",
+    'year', se.year,
+    'rounds', (
+        SELECT COALESCE(json_agg(json_build_object('round', round, 'raceId', "raceId", 'name', name) ORDER BY round), '[]')
+        FROM rounds
+    ),
+    '{kind}', (
+        SELECT COALESCE(json_agg(
+            json_build_object('{entity}', id, 'points', points, 'positions', positions) ORDER BY final NULLS LAST, id
+        ), '[]')
+        FROM lines
+    )
+)::text
+FROM seasons se
+WHERE se."seasonId" = :season_id
+'''
+
+
+async def get_season_progression(db: AsyncSession, season_id: int, kind: str, after_round: Optional[int] = None):
+    """JSON text of the points and positions by round, None when the season does not exist."""
+    params = {"season_id": season_id}
+    if after_round is not None:
+        params["after_round"] = after_round
+    return await db.scalar(text(progression_sql(kind, after_round is not None)), params)
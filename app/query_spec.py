@@ -0,0 +1,140 @@
+import re
+from typing import Optional
+
+from fastapi import HTTPException, Query, Request
+from sqlalchemy import select
+
+from app.fast_json import select_rows
+from app.models import Race, Season
+from app.pagination import parse_value
+
+# Filters, projection and sort for the list routes, parsed from the query string and compiled
+# into the one select() the route runs, so the filtering happens in PostgreSQL on its indexes.
+#
+#   fields=raceId,lap,milliseconds   only these fields of the response schema
+#   race_id=1                        equality on a column, named in snake_case
+#   driver_id_in=1,4,20              any of the values, a repeated parameter does the same
+#   milliseconds_lt=90000            range, also _lte, _gt and _gte
+#   season=2021, season_gte=2010     rows of races in those championship years
+#   sort=-milliseconds,lap           order, "-" for descending, the primary key breaks ties
+
+# Query parameters of the pagination and the projection, never filters
+RESERVED = {"limit", "after", "fields", "sort"}
+
+RANGES = {
+    "gte": lambda column, value: column >= value,
+    "gt": lambda column, value: column > value,
+    "lte": lambda column, value: column <= value,
+    "lt": lambda column, value: column < value,
+}
+
+
+def snake_case(name: str):
+    return re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", name).lower()
+
+
+def split_list(value: str):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class ListQuery:
+    """Projection, filters and sort of one list request for a model and its response schema."""
+
+    def __init__(self, model, schema, params, fields: Optional[str] = None, sort: Optional[str] = None):
+        self.model = model
+        self.schema = schema
+        self.columns = {name: getattr(model, name) for name in schema.model_fields}
+        self.fields = self.parse_fields(fields)
+        self.sort = self.parse_sort(sort)
+        self.filters = []
+        season_filters = []
+
+        values = {}
+        for name, value in params.multi_items():
+            if name not in RESERVED:
+                values.setdefault(name, []).extend(split_list(value))
+        by_parameter = {snake_case(name): column for name, column in self.columns.items()}
+        for name, items in values.items():
+            if not items:
+                raise HTTPException(status_code=400, detail=f"Empty filter {name}")
+            base, _, operator = name.rpartition("_")
+            if name in by_parameter or name == "season":
+                base, operator = name, "in" if len(items) > 1 else "eq"
+            elif operator not in RANGES and operator != "in":
+                raise HTTPException(status_code=400, detail=f"Unknown filter {name}")
+            if operator in RANGES and len(items) > 1:
+                raise HTTPException(status_code=400, detail=f"{name} takes one value")
+
+            if base == "season":
+                season_filters.append(self.condition(Season.year, operator, items))
+            elif base in by_parameter:
+                self.filters.append(self.condition(by_parameter[base], operator, items))
+            else:
+                raise HTTPException(status_code=400, detail=f"Unknown filter {name}")
+
+        if season_filters:
+            self.filters.append(self.season_filter(season_filters))
+
+    def parse_fields(self, fields: Optional[str]):
+        if fields is None:
+            return None
+        names = split_list(fields)
+        unknown = [name for name in names if name not in self.columns]
+        if unknown or not names:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown) or fields}")
+        return list(dict.fromkeys(names))
+
+    def parse_sort(self, sort: Optional[str]):
+        """[(column, descending)] in the order given."""
+        if sort is None:
+            return []
+        keys = []
+        for name in split_list(sort):
+            descending = name.startswith("-")
+            column = self.columns.get(name.lstrip("-+"))
+            if column is None:
+                raise HTTPException(status_code=400, detail=f"Cannot sort by {name}")
+            keys.append((column, descending))
+        return keys
+
+    @staticmethod
+    def condition(column, operator: str, items: list):
+        values = [parse_value(column, item) for item in items]
+        if operator == "eq":
+            return column == values[0]
+        if operator == "in":
+            return column.in_(values)
+        return RANGES[operator](column, values[0])
+
+    def season_filter(self, conditions: list):
+        """One semi-join from the table's raceId through races to seasons."""
+        if self.model is Race:
+            return Race.seasonId.in_(select(Season.seasonId).where(*conditions))
+        if not hasattr(self.model, "raceId"):
+            raise HTTPException(status_code=400, detail="Unknown filter season")
+        races = select(Race.raceId).join(Season, Season.seasonId == Race.seasonId).where(*conditions)
+        return self.model.raceId.in_(races)
+
+    def keys(self):
+        """Order and pagination keys: the sort columns, then the primary key."""
+        keys = [column.desc() if descending else column for column, descending in self.sort]
+        sorted_names = {column.key for column, _ in self.sort}
+        primary_key = [getattr(self.model, column.key) for column in self.model.__table__.primary_key]
+        return keys + [column for column in primary_key if column.key not in sorted_names]
+
+    def statement(self):
+        extra = [column for column, _ in self.sort]
+        return select_rows(self.model, self.schema, self.fields, extra).where(*self.filters)
+
+
+def list_query(model, schema):
+    """Dependency parsing a ListQuery for the model, the filters are read from the raw query string."""
+
+    def dependency(
+        request: Request,
+        fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+        sort: Optional[str] = Query(None, description='Comma separated fields to sort by, "-" for descending'),
+    ):
+        return ListQuery(model, schema, request.query_params, fields, sort)
+
+    return dependency
@@ -1,22 +1,41 @@
-import pandas as pd
+import sys
+import time
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
-from app.models import Result, DriverStanding, ConstructorStanding, ConstructorResult
-
-def reload_results(db: Session):
+from app.analytics import SOURCE_TABLES, refresh_analytics
+from app.changes import notify
+from app.config import DATA_DIR
+from app.database import SessionLocal, engine
+from app.models import Result, DriverStanding, ConstructorStanding, ConstructorResult, Season, LapTime, PitStop
+from app.bulk_loader import copy_frame, quote, read_frames, reset_sequence, resolve_pit_stop_laps, upsert_statement
+from app.csv_specs import SPECS_BY_MODEL, TABLE_SPECS, RejectionStats, TableSpec, records
+from app.standings import SOURCE_TABLES as STANDINGS_SOURCES, derivable_races, update_standings
+from app.compare import SOURCE_TABLES as TEAMMATE_SOURCES, refresh_teammates
+from app.stats import SOURCE_TABLES as STATS_SOURCES, STATS, refresh_stats
+
+# Tables whose primary key is generated by the database are matched on their unique natural key instead
+NATURAL_KEYS = {
+    Season: ('year',),
+    LapTime: ('raceId', 'driverId', 'lap'),
+    PitStop: ('raceId', 'driverId', 'stop'),
+}
+
+
+def read_records(model, data_dir: str = DATA_DIR):
+    """The model's CSV coerced by its spec, as a list of row dicts. Rejected values are reported."""
+    spec = SPECS_BY_MODEL[model]
+    stats = RejectionStats(spec.table)
+    rows = [row for frame in read_frames(spec, data_dir=data_dir, stats=stats) for row in records(frame)]
+    stats.report()
+    return rows
+
+
+def reload_results(db: Session, data_dir: str = DATA_DIR):
     """Reload results data from CSV and update database."""
     rows_edited = 0
-    file_path = "/Users/nooralindeflaten/Downloads/f1_results/results.csv"
+    changed_races = set()
 
     try:
-        # Load CSV
-        results = pd.read_csv(file_path)
-
-        # Convert data types safely
-        results['points'] = pd.to_numeric(results['points'], errors='coerce').fillna(0).astype(int)
-        results['fastestLapSpeed'] = pd.to_numeric(results['fastestLapSpeed'], errors='coerce')
-
-        for _, row in results.iterrows():
+        for row in read_records(Result, data_dir):
             existing_result = db.query(Result).filter(Result.resultId == row['resultId']).first()
 
             if existing_result:
@@ -24,12 +43,20 @@ def reload_results(db: Session):
                 if (existing_result.points != row['points'] or
                     existing_result.fastestLapSpeed != row['fastestLapSpeed']):
 
+                    if existing_result.points != row['points']:
+                        changed_races.add(existing_result.raceId)
                     existing_result.points = row['points']
                     existing_result.fastestLapSpeed = row['fastestLapSpeed']
                     rows_edited += 1
             else:
                 continue  # Skip if the result does not exist
 
+        # Changed points move the standings from their round on, in the same transaction
+        if changed_races:
+            db.flush()
+            update_standings(db.connection(), changed_races)
+            refresh_stats(db.connection(), changed_races)
+
         # Commit changes
         db.commit()
         print(f"✅ {rows_edited} rows updated successfully!")
@@ -39,18 +66,11 @@ def reload_results(db: Session):
         db.rollback()  # Rollback to avoid partial updates
 
 
-def reload_driver_standings(db: Session):
+def reload_driver_standings(db: Session, data_dir: str = DATA_DIR):
     rows_edited = 0
-    file_path = "/Users/nooralindeflaten/Downloads/f1_results/driver_standings.csv"
 
     try:
-        # Load CSV
-        results = pd.read_csv(file_path)
-
-        # Convert data types safely
-        results['points'] = pd.to_numeric(results['points'], errors='coerce').fillna(0).astype(int)
-
-        for _, row in results.iterrows():
+        for row in read_records(DriverStanding, data_dir):
             existing_result = db.query(DriverStanding).filter(DriverStanding.driverStandingsId == row['driverStandingsId']).first()
 
             if existing_result:
@@ -70,18 +90,11 @@ def reload_driver_standings(db: Session):
         print(f"❌ Error loading results data: {e}")
         db.rollback()  # Rollback to avoid partial updates
 
-def reload_constructor_standings(db: Session):
+def reload_constructor_standings(db: Session, data_dir: str = DATA_DIR):
     rows_edited = 0
-    file_path = "/Users/nooralindeflaten/Downloads/f1_results/constructor_standings.csv"
 
     try:
-        # Load CSV
-        results = pd.read_csv(file_path)
-
-        # Convert data types safely
-        results['points'] = pd.to_numeric(results['points'], errors='coerce').fillna(0).astype(int)
-
-        for _, row in results.iterrows():
+        for row in read_records(ConstructorStanding, data_dir):
             existing_result = db.query(ConstructorStanding).filter(ConstructorStanding.constructorStandingsId == row['constructorStandingsId']).first()
 
             if existing_result:
@@ -102,18 +115,11 @@ def reload_constructor_standings(db: Session):
         db.rollback()  # Rollback to avoid partial updates
 
 
-def reload_constructor_results(db: Session):
+def reload_constructor_results(db: Session, data_dir: str = DATA_DIR):
     rows_edited = 0
-    file_path = "/Users/nooralindeflaten/Downloads/f1_results/constructor_results.csv"
 
     try:
-        # Load CSV
-        results = pd.read_csv(file_path)
-
-        # Convert data types safely
-        results['points'] = pd.to_numeric(results['points'], errors='coerce').fillna(0).astype(int)
-
-        for _, row in results.iterrows():
+        for row in read_records(ConstructorResult, data_dir):
             existing_result = db.query(ConstructorResult).filter(ConstructorResult.constructorResultsId == row['constructorResultsId']).first()
 
             if existing_result:
@@ -132,8 +138,163 @@ def reload_constructor_results(db: Session):
     except Exception as e:
         print(f"❌ Error loading results data: {e}")
         db.rollback()  # Rollback to avoid partial updates
-def main():
-    """Database session management."""
+
+
+def delete_missing(cursor, model, staging, key, race_ids, previous=()):
+    """Delete the rows of the races that are not in the staging table, every row when staging is None.
+
+    Returns the deleted row count, their raceIds and the distinct values of every previous column.
+    """
+    table = quote(model.__table__.name)
+    missing = 't."raceId" = ANY(%(race_ids)s)'
+    if staging is not None:
+        matches = ' AND '.join(f's.{quote(name)} = t.{quote(name)}' for name in key)
+        missing += f' AND NOT EXISTS (SELECT 1 FROM {staging} s WHERE {matches})'
+    params = {'race_ids': sorted(race_ids)}
+    if model is LapTime:
+        # The stops keep their row, only the reference to the removed lap is cleared
+        cursor.execute(f'UPDATE pit_stops p SET "lapId" = NULL FROM {table} t WHERE p."lapId" = t."lapId" AND {missing}', params)
+    returned = ''.join(f', t.{quote(name)}' for name in previous)
+    aggregates = ''.join(f', array_agg(DISTINCT {quote(name)})' for name in previous)
+    cursor.execute(
+        f'WITH deleted AS (DELETE FROM {table} t WHERE {missing} RETURNING t."raceId"{returned}) '
+        f'SELECT count(*), array_agg(DISTINCT "raceId"){aggregates} FROM deleted',
+        params,
+    )
+    return cursor.fetchone()
+
+
+def reload_table(spec: TableSpec, data_dir: str = DATA_DIR, stats: RejectionStats = None, frames=None, seasons: set = None,
+                 replace_races: set = None):
+    """Diff one CSV against its table through a temporary staging table.
+
+    frames replaces the chunks read from the CSV, to stage only part of it. seasons limits the
+    change notification to those seasonIds. replace_races are raceIds whose rows are all staged,
+    their rows missing from the staging table are deleted.
+    Returns (inserted, updated, deleted, unchanged) row counts, the raceIds of the inserted,
+    updated and deleted rows, None for a table without a raceId, and for the sources of the stats
+    {entity column: ids} of the drivers and constructors the updated and deleted rows had before.
+    """
+    model = spec.model
+    table = model.__table__.name
+    staging = quote(f'staging_{table}')
+    key = NATURAL_KEYS.get(model, tuple(column.name for column in model.__table__.primary_key.columns))
+    staged = inserted = updated = deleted = 0
+    columns = None
+    by_race = 'raceId' in model.__table__.columns
+    races = set() if by_race else None
+    # An updated row can move to another race, driver or constructor, the old ones are stale as well
+    moved = ('raceId',) if by_race and 'raceId' not in key else ()
+    entities = tuple(STATS) if table in STATS_SOURCES else ()
+    previous = {name: set() for name in moved + entities}
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute('SET LOCAL statement_timeout = 0')
+        if frames is None:
+            frames = read_frames(spec, data_dir=data_dir, stats=stats)
+        for frame in frames:
+            if columns is None:
+                columns = list(frame.columns)
+                names = ', '.join(quote(name) for name in columns)
+                cursor.execute(
+                    f'CREATE TEMP TABLE {staging} ON COMMIT DROP AS '
+                    f'SELECT {names} FROM {quote(table)} WITH NO DATA'
+                )
+            copy_frame(cursor, f'staging_{table}', frame)
+            staged += len(frame)
+
+        if columns is not None:
+            cursor.execute(f'ANALYZE {staging}')
+            cursor.execute(upsert_statement(table, staging, columns, key, races=by_race, previous=moved + entities))
+            if by_race:
+                inserted, updated, race_ids, *before = cursor.fetchone()
+                races = set(race_ids or ())
+                for name, values in zip(moved + entities, before):
+                    previous[name] |= set(values or ())
+            else:
+                inserted, updated = cursor.fetchone()
+        if replace_races:
+            deleted, race_ids, *before = delete_missing(
+                cursor, model, staging if columns is not None else None, key, replace_races, entities,
+            )
+            races |= set(race_ids or ())
+            for name, values in zip(entities, before):
+                previous[name] |= set(values or ())
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+    if inserted or updated or deleted:
+        with engine.begin() as connection:
+            if inserted:
+                # New laps also fill the stops whose lap was removed by an earlier load
+                if model in (PitStop, LapTime):
+                    resolve_pit_stop_laps(connection)
+                reset_sequence(connection, model)
+            notify(connection, {table}, seasons)
+
+    if by_race:
+        races |= previous.pop('raceId', set())
+    return inserted, updated, deleted, staged - inserted - updated, races, previous
+
+
+def reload_all(data_dir: str = DATA_DIR):
+    """Upsert every CSV and print inserted, updated and unchanged counts per table."""
+    print(f"{'table':<24}{'inserted':>10}{'updated':>10}{'unchanged':>11}{'seconds':>10}")
+    changed_races = {}
+    previous_ids = {entity: set() for entity in STATS}
+    rejected = []
+    for spec in TABLE_SPECS:
+        table = spec.table
+        stats = RejectionStats(table)
+        started = time.perf_counter()
+        try:
+            inserted, updated, _, unchanged, races, previous = reload_table(spec, data_dir=data_dir, stats=stats)
+        except Exception as e:
+            print(f"❌ Error reloading {table}: {e}")
+            break
+        elapsed = time.perf_counter() - started
+        print(f"{table:<24}{inserted:>10}{updated:>10}{unchanged:>11}{elapsed:>10.2f}")
+        if inserted or updated:
+            changed_races[table] = races
+            for entity, ids in previous.items():
+                previous_ids[entity] |= ids
+        rejected.extend(stats.lines())
+
+    for line in rejected:
+        print(line)
+
+    # Every source table has a raceId, the derived tables are refreshed for the changed races only
+    if changed_races.keys() & SOURCE_TABLES:
+        with engine.begin() as connection:
+            refresh_analytics(connection, set().union(*(changed_races.get(table, ()) for table in SOURCE_TABLES)))
+        print("✅ Lap analytics refreshed")
+    if changed_races.keys() & STANDINGS_SOURCES:
+        with engine.begin() as connection:
+            races = derivable_races(connection, changed_races)
+            update_standings(connection, races)
+        print(f"✅ Standings recomputed from the first changed round of {len(races)} races")
+    if changed_races.keys() & STATS_SOURCES:
+        with engine.begin() as connection:
+            refresh_stats(connection, set().union(*(changed_races.get(table, ()) for table in STATS_SOURCES)), previous_ids)
+        print("✅ Career and season stats refreshed")
+    if changed_races.keys() & TEAMMATE_SOURCES:
+        with engine.begin() as connection:
+            refresh_teammates(connection, set().union(*(changed_races.get(table, ()) for table in TEAMMATE_SOURCES)))
+        print("✅ Teammate head to heads refreshed")
+
+
+def main(mode: str = "orm"):
+    """Database session management, mode "upsert" diffs every table through staging tables."""
+    if mode == "upsert":
+        reload_all()
+        return
+
     db = SessionLocal()
     try:
         reload_constructor_results(db)
@@ -141,4 +302,4 @@ def main():
         db.close()
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else "orm")
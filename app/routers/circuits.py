@@ -1,28 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db
+from app.pagination import Page
 from app.schemas import Circuit, CircuitBase, CircuitCreate, CircuitUpdate, RaceResponse
-from app import crud, models
+from app import crud, async_crud, models
 from typing import List
 
 router = APIRouter()
 
 @router.get("/circuits/")
-def get_all_circuits(db: Session = Depends(get_db)):
-    return crud.get_circuits(db=db)
+async def get_all_circuits(page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.get_circuits(db=db, page=page)
 
-@router.get("/circuits/{circuitId}", response_model=Circuit)
-def get_circuit(circuit_id: int, db: Session = Depends(get_db)):
-    circuit = crud.get_circuit(db, circuit_id)
+@router.get("/circuits/{circuit_id}", response_model=Circuit)
+async def get_circuit(circuit_id: int, db: AsyncSession = Depends(get_async_db)):
+    circuit = await async_crud.get_circuit(db, circuit_id, options=crud.CIRCUIT_LOADERS)
     if not circuit:
         raise HTTPException(status_code=404, detail="Circuit not found")
     return circuit
 
-@router.get("/circuits/{circuitId}/races/", response_model=List[RaceResponse])
-def get_circuit_race(circuit_id: int, db: Session = Depends(get_db)):
-    races = crud.get_races_on_circuit(db, circuit_id=circuit_id)
-    if not races:
-        raise HTTPException(status_code=404, detail="Races not found")
+@router.get("/circuits/{circuit_id}/races/", response_model=List[RaceResponse])
+async def get_circuit_race(circuit_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    races = await async_crud.get_races_on_circuit(db, circuit_id=circuit_id, page=page)
+    if races is None:
+        raise HTTPException(status_code=404, detail="Circuit not found")
+    return races
 
 @router.post("/circuits/", response_model=Circuit)
 def create_Circuit(Circuit: CircuitCreate, db: Session = Depends(get_db)):
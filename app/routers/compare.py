@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.compare import get_comparison
+from app.database import get_async_db
+from typing import Optional
+
+router = APIRouter()
+
+@router.get("/compare/drivers")
+async def compare_drivers(
+    a: int = Query(..., description="driverId of the first driver"),
+    b: int = Query(..., description="driverId of the second driver"),
+    season: Optional[int] = Query(None, description="Only the races of this championship year"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Race and qualifying head to head and lap pace gap of driver a against driver b over their shared races."""
+    if a == b:
+        raise HTTPException(status_code=400, detail="Compare two different drivers")
+    payload = await get_comparison(db, a, b, season)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    return Response(content=payload, media_type="application/json")
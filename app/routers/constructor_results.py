@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import schemas, crud
-from app.database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas, crud, async_crud
+from app.database import SessionLocal, get_async_db
+from app.fast_json import rows_response
+from app.pagination import Page
+from app.query_spec import ListQuery, list_query
 from typing import List
 
 router = APIRouter()
@@ -16,13 +20,15 @@ def get_db():
 
 # Route to get all constructor results
 @router.get("/constructor_results", response_model=List[schemas.ConstructorResultResponse])
-def get_constructor_results(db: Session = Depends(get_db)):
-    return crud.get_constructor_results(db)
+async def get_constructor_results(page: Page = Depends(), query: ListQuery = Depends(list_query(models.ConstructorResult, schemas.ConstructorResultResponse)),
+                                  db: AsyncSession = Depends(get_async_db)):
+    rows = await async_crud.get_constructor_results(db, query, page=page)
+    return rows_response(rows, schemas.ConstructorResultResponse, page, query.fields)
 
 # Route to get a constructor result by ID
 @router.get("/constructor_results/{result_id}", response_model=schemas.ConstructorResultResponse)
-def get_constructor_result(result_id: int, db: Session = Depends(get_db)):
-    db_constructor_result = crud.get_constructor_result_by_id(db, result_id)
+async def get_constructor_result(result_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_constructor_result = await async_crud.get_constructor_result_by_id(db, result_id)
     if db_constructor_result is None:
         raise HTTPException(status_code=404, detail="Constructor result not found")
     return db_constructor_result
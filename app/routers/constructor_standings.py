@@ -2,21 +2,27 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import schemas, crud
-from app.database import SessionLocal, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas, crud, async_crud
+from app.database import SessionLocal, get_db, get_async_db
+from app.fast_json import rows_response
+from app.pagination import Page
+from app.query_spec import ListQuery, list_query
 from typing import List
 
 router = APIRouter()
 
 # Route to get all constructor standings
 @router.get("/constructor_standings", response_model=List[schemas.ConstructorStandingResponse])
-def get_constructor_standings(db: Session = Depends(get_db)):
-    return crud.get_constructor_standings(db)
+async def get_constructor_standings(page: Page = Depends(), query: ListQuery = Depends(list_query(models.ConstructorStanding, schemas.ConstructorStandingResponse)),
+                                    db: AsyncSession = Depends(get_async_db)):
+    rows = await async_crud.get_constructor_standings(db, query, page=page)
+    return rows_response(rows, schemas.ConstructorStandingResponse, page, query.fields)
 
 # Route to get a constructor standing by ID
 @router.get("/constructor_standings/{standing_id}", response_model=schemas.ConstructorStandingResponse)
-def get_constructor_standing(standing_id: int, db: Session = Depends(get_db)):
-    db_constructor_standing = crud.get_constructor_standing_by_id(db, standing_id)
+async def get_constructor_standing(standing_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_constructor_standing = await async_crud.get_constructor_standing_by_id(db, standing_id)
     if db_constructor_standing is None:
         raise HTTPException(status_code=404, detail="Constructor standing not found")
     return db_constructor_standing
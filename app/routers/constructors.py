@@ -1,9 +1,13 @@
 # controllers.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from app import schemas, crud
-from app.database import SessionLocal, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas, crud, async_crud
+from app.database import SessionLocal, get_db, get_async_db
+from app.fast_json import rows_response
+from app.pagination import Page
+from app.stats import get_stats
 from typing import List
 
 
@@ -12,52 +16,60 @@ router = APIRouter()
 
 # Route to get all constructors
 @router.get("/constructors", response_model=List[schemas.ConstructorResponse])
-def get_constructors(db: Session = Depends(get_db)):
-    return crud.get_constructors(db)
+async def get_constructors(page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.get_constructors(db, page=page)
 
 # Route to get a constructor by ID
 @router.get("/constructors/{constructor_id}", response_model=schemas.ConstructorResponse)
-def get_constructor(constructor_id: int, db: Session = Depends(get_db)):
-    db_constructor = crud.get_constructor_by_id(db, constructor_id)
+async def get_constructor(constructor_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_constructor = await async_crud.get_constructor_by_id(db, constructor_id)
     if db_constructor is None:
         raise HTTPException(status_code=404, detail="Constructor not found")
     return db_constructor
 
 #Relationships
 @router.get("/constructors/{constructor_id}/constructor_standings", response_model=List[schemas.ConstructorStandingResponse])
-def get_constructor_const_stand(constructor_id: int, db: Session = Depends(get_db)):
-    db_constructor_standings = crud.get_constructor_standings_by_constructor(db, constructor_id)
+async def get_constructor_const_stand(constructor_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    db_constructor_standings = await async_crud.get_constructor_standings_by_constructor(db, constructor_id, page=page)
     if db_constructor_standings is None:
         raise HTTPException(status_code=404, detail="Constructor not found")
     return db_constructor_standings
 
 @router.get("/constructors/{constructor_id}/constructor_results", response_model=List[schemas.ConstructorResultResponse])
-def get_constructor_const_results(constructor_id: int, db: Session = Depends(get_db)):
-    db_constructor_result = crud.get_constructor_results_by_constructor(db, constructor_id)
+async def get_constructor_const_results(constructor_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    db_constructor_result = await async_crud.get_constructor_results_by_constructor(db, constructor_id, page=page)
     if db_constructor_result is None:
         raise HTTPException(status_code=404, detail="Constructor not found")
     return db_constructor_result
 
 @router.get("/constructors/{constructor_id}/results", response_model=List[schemas.ResultResponse])
-def get_results_constructor(constructor_id: int, db: Session = Depends(get_db)):
-    results = crud.get_results_from_constructor(db, constructor_id)
+async def get_results_constructor(constructor_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    results = await async_crud.get_results_from_constructor(db, constructor_id, page=page, schema=schemas.ResultResponse)
     if results is None:
         raise HTTPException(status_code=404, detail="Constructor not found")
-    return results
+    return rows_response(results, schemas.ResultResponse, page)
 
 @router.get("/constructors/{constructor_id}/qualifying", response_model=List[schemas.QualifyingResponse])
-def get_constructor_qualifying(constructor_id: int, db: Session = Depends(get_db)):
-    qualifying = crud.get_qualifying_constructor(db, constructor_id)
+async def get_constructor_qualifying(constructor_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    qualifying = await async_crud.get_qualifying_constructor(db, constructor_id, page=page, schema=schemas.QualifyingResponse)
     if qualifying is None:
         raise HTTPException(status_code=404, detail="Constructor not found")
-    return qualifying
+    return rows_response(qualifying, schemas.QualifyingResponse, page)
 
 @router.get("/constructors/{constructor_id}/sprint_results", response_model=List[schemas.SprintResultResponse])
-def get_constructor_sprint(constructor_id: int, db: Session = Depends(get_db)):
-    sprint_results = crud.get_constructor_sprint_results(db, constructor_id)
+async def get_constructor_sprint(constructor_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    sprint_results = await async_crud.get_constructor_sprint_results(db, constructor_id, page=page, schema=schemas.SprintResultResponse)
     if sprint_results is None:
         raise HTTPException(status_code=404, detail="Constructor sprint not found")
-    return sprint_results
+    return rows_response(sprint_results, schemas.SprintResultResponse, page)
+
+@router.get("/constructors/{constructor_id}/stats")
+async def get_constructor_stats(constructor_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Career totals and the totals of every season, read from the stats tables."""
+    payload = await get_stats(db, "constructorId", constructor_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Constructor not found")
+    return Response(content=payload, media_type="application/json")
 
 # Route to create a new constructor
 @router.post("/constructors", response_model=schemas.ConstructorResponse)
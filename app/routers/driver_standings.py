@@ -2,8 +2,12 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import schemas, crud
-from app.database import SessionLocal, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas, crud, async_crud
+from app.database import SessionLocal, get_db, get_async_db
+from app.fast_json import rows_response
+from app.pagination import Page
+from app.query_spec import ListQuery, list_query
 from typing import List
 
 router = APIRouter()
@@ -11,21 +15,26 @@ router = APIRouter()
 
 # Route to get all driver standings
 @router.get("/driver_standings", response_model=List[schemas.DriverStandingResponse])
-def get_driver_standings(db: Session = Depends(get_db)):
-    return crud.get_driver_standings(db)
+async def get_driver_standings(page: Page = Depends(), query: ListQuery = Depends(list_query(models.DriverStanding, schemas.DriverStandingResponse)),
+                               db: AsyncSession = Depends(get_async_db)):
+    rows = await async_crud.get_driver_standings(db, query, page=page)
+    return rows_response(rows, schemas.DriverStandingResponse, page, query.fields)
 
 # Route to get a specific driver standing by ID
 @router.get("/driver_standings/{standing_id}", response_model=schemas.DriverStandingResponse)
-def get_driver_standing(standing_id: int, db: Session = Depends(get_db)):
-    db_driver_standing = crud.get_driver_standing_by_id(db, standing_id)
+async def get_driver_standing(standing_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_driver_standing = await async_crud.get_driver_standing_by_id(db, standing_id)
     if db_driver_standing is None:
         raise HTTPException(status_code=404, detail="Driver Standing not found")
     return db_driver_standing
 
 # Route to get all standings for a specific driver
 @router.get("/drivers/{driver_id}/driver_standings", response_model=List[schemas.DriverStandingResponse])
-def get_driver_standings_by_driver(driver_id: int, db: Session = Depends(get_db)):
-    return crud.get_driver_standings_by_driver_id(db, driver_id)
+async def get_driver_standings_by_driver(driver_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    driver_standings = await async_crud.get_driver_standings_from_driver(db, driver_id, page=page)
+    if driver_standings is None:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    return driver_standings
 
 # Route to create a new driver standing
 @router.post("/driver_standings", response_model=schemas.DriverStandingResponse)
@@ -1,13 +1,21 @@
 # app/routers/drivers.py
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas import (
     Driver, DriverBase, PitStopResponse,
     DriverCreate, DriverUpdate, DriverResponse, ResultResponse,
     QualifyingResponse, LapTimeResponse,
     DriverStandingResponse, SprintResultResponse, RaceResponse)
-from app import crud, models
-from app.database import get_db
+from app import crud, async_crud
+from app.database import get_db, get_async_db
+from app.fast_json import rows_response
+from app.compare import get_teammates
+from app.pagination import Page
+from app.profile import SECTIONS, get_driver_profile
+from app.query_spec import split_list
+from app.stats import get_stats
+from app.weekend import get_driver_weekend
 from typing import List, Optional
 
 router = APIRouter()
@@ -17,120 +25,124 @@ def create_driver(driver: DriverCreate, db: Session = Depends(get_db)):
     db_driver = crud.create_driver(db=db, driver=driver)
     return db_driver
 
-@router.put("/drivers/", response_model=List[DriverResponse])
-def get_drivers(db: Session = Depends(get_db)):
-    return crud.get_drivers(db)
+@router.get("/drivers/", response_model=List[DriverResponse])
+async def get_drivers(page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.get_drivers(db, page=page)
 
 
 
 @router.get("/drivers/{driver_id}", response_model=DriverResponse)
-def read_driver(driver_id: int, db: Session = Depends(get_db)):
-    db_driver = crud.get_driver_by_id(db,driver_id=driver_id)
+async def read_driver(driver_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_driver = await async_crud.get_driver_by_id(db,driver_id=driver_id)
     if db_driver is None:
         raise HTTPException(status_code=404, detail="Driver not found")
     return db_driver
 
 @router.get("/drivers/{driver_id}/results", response_model=List[ResultResponse])
-def read_driver_result(driver_id: int, db: Session = Depends(get_db)):
-    db_results = crud.get_results_from_driver(db, driver_id)
+async def read_driver_result(driver_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    db_results = await async_crud.get_results_from_driver(db, driver_id, page=page, schema=ResultResponse)
     if db_results is None:
         raise HTTPException(status_code=404, detail="Driver not found")
-    return db_results
+    return rows_response(db_results, ResultResponse, page)
 
 @router.get("/drivers/{driver_id}/qualifying", response_model=List[QualifyingResponse])
-def read_driver_qualifying(driver_id: int, db: Session = Depends(get_db)):
-    qualifying = crud.get_qualifying_from_driver(db, driver_id)
+async def read_driver_qualifying(driver_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    qualifying = await async_crud.get_qualifying_from_driver(db, driver_id, page=page, schema=QualifyingResponse)
     if qualifying is None:
         raise HTTPException(status_code=404, detail="Driver not found")
-    return qualifying
+    return rows_response(qualifying, QualifyingResponse, page)
 
 @router.get("/drivers/{driver_id}/pit_stops", response_model=List[PitStopResponse])
-def read_driver_pit_stops(driver_id: int, db: Session = Depends(get_db)):
-    db_results = crud.get_pit_stops_from_driver(db, driver_id)
+async def read_driver_pit_stops(driver_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    db_results = await async_crud.get_pit_stops_from_driver(db, driver_id, page=page, schema=PitStopResponse)
     if db_results is None:
         raise HTTPException(status_code=404, detail="Driver not found")
-    return db_results
+    return rows_response(db_results, PitStopResponse, page)
 
 @router.get("/drivers/{driver_id}/lap_times", response_model=List[LapTimeResponse])
-def read_driver_laps(driver_id: int, db: Session = Depends(get_db)):
-    lap_times = crud.get_lap_times_from_driver(db, driver_id)
+async def read_driver_laps(driver_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    lap_times = await async_crud.get_lap_times_from_driver(db, driver_id, page=page, schema=LapTimeResponse)
     if lap_times is None:
         raise HTTPException(status_code=404, detail="Driver not found")
-    return lap_times
+    return rows_response(lap_times, LapTimeResponse, page)
 
 @router.get("/drivers/{driver_id}/driver_standings", response_model=List[DriverStandingResponse])
-def read_driver_standings(driver_id: int, db: Session = Depends(get_db)):
-    driver_standings = crud.get_driver_standings_from_driver(db, driver_id)
+async def read_driver_standings(driver_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    driver_standings = await async_crud.get_driver_standings_from_driver(db, driver_id, page=page)
     if driver_standings is None:
         raise HTTPException(status_code=404, detail="Driver not found")
     return driver_standings
 
 @router.get("/drivers/{driver_id}/sprint_results", response_model=List[SprintResultResponse])
-def read_driver_sprint_results(driver_id: int, db: Session = Depends(get_db)):
-    sprint_results = crud.get_sprint_results_from_driver(db, driver_id)
+async def read_driver_sprint_results(driver_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    sprint_results = await async_crud.get_sprint_results_from_driver(db, driver_id, page=page, schema=SprintResultResponse)
     if sprint_results is None:
         raise HTTPException(status_code=404, detail="Driver not found")
-    return sprint_results
+    return rows_response(sprint_results, SprintResultResponse, page)
 
 
 @router.get("/drivers/{driver_id}/races", response_model=List[RaceResponse])
-def get_driver_races(driver_id: int, db: Session = Depends(get_db)):
+async def get_driver_races(driver_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Retrieve all races where the driver participated."""
-    races = crud.get_races_by_driver_id(db, driver_id)
+    races = await async_crud.get_races_by_driver_id(db, driver_id, page=page)
 
-    if not races:
-        raise HTTPException(status_code=404, detail="No races found for this driver")
+    if races is None:
+        raise HTTPException(status_code=404, detail="Driver not found")
 
     return races
 
 
 
 
-@router.get("/drivers/{driver_id}/races/{race_id}/full_data/")
-def get_driver_race_data(driver_id: int, race_id: int, db: Session = Depends(get_db)):
-    """Fetches all relevant data for a driver in a specific race."""
+@router.get("/drivers/{driver_id}/profile")
+async def get_driver_profile_data(
+    driver_id: int,
+    include: Optional[str] = Query(None, description=f"Comma separated sections, all by default: {', '.join(SECTIONS)}"),
+    season: Optional[int] = Query(None, description="Only the races of this championship year"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """The driver with the results, races, qualifying, standings, sprint results and seasons of the driver page in one response."""
+    sections = tuple(SECTIONS)
+    if include is not None:
+        names = split_list(include)
+        unknown = [name for name in names if name not in SECTIONS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+        sections = tuple(name for name in SECTIONS if name in names)
+    payload = await get_driver_profile(db, driver_id, sections, season)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    return Response(content=payload, media_type="application/json")
 
-    # Fetch driver info
-    driver = db.query(models.Driver).filter(models.Driver.driverId == driver_id).first()
-    if not driver:
-        return {"error": "Driver not found"}
 
-    # Fetch race info
-    race = db.query(models.Race).filter(models.Race.raceId == race_id).first()
-    if not race:
-        return {"error": "Race not found"}
+@router.get("/drivers/{driver_id}/stats")
+async def get_driver_stats(driver_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Career wins, podiums, poles, fastest laps, points and DNFs by status, plus the same per season."""
+    payload = await get_stats(db, "driverId", driver_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    return Response(content=payload, media_type="application/json")
+
 
-    # Fetch all related data
-    result = db.query(models.Result).filter(models.Result.driverId == driver_id, models.Result.raceId == race_id).first()
-    pit_stops = db.query(models.PitStop).filter(models.PitStop.driverId == driver_id, models.PitStop.raceId == race_id).all()
-    lap_times = db.query(models.LapTime).filter(models.LapTime.driverId == driver_id, models.LapTime.raceId == race_id).all()
-    qualifying = db.query(models.Qualifying).filter(models.Qualifying.driverId == driver_id, models.Qualifying.driverId == race_id).first()
-    standings = db.query(models.DriverStanding).filter(models.DriverStanding.driverId == driver_id, models.DriverStanding.raceId == race_id).first()
-    sprint_results = db.query(models.SprintResult).filter(models.SprintResult.driverId == driver_id, models.SprintResult.raceId == race_id).first()
-
-    return {
-        "driver": {
-            "driverId": driver.driverId,
-            "driverRef": driver.driverRef,
-            "code": driver.code,
-            "name": f"{driver.forename} {driver.surname}",
-            "nationality": driver.nationality,
-            "dob": driver.dob,
-        },
-        "race": {
-            "id": race.raceId,
-            "name": race.name,
-            "seasonId": race.seasonId,
-            "round": race.round,
-            "circuit": race.circuitId,
-        },
-        "result": result,
-        "pit_stops": pit_stops,
-        "lap_times": lap_times,
-        "qualifying": qualifying,
-        "standings": standings,
-        "sprint_results": sprint_results
-    }
+@router.get("/drivers/{driver_id}/teammates")
+async def get_driver_teammates(driver_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Head to head against every teammate, one row per season and team."""
+    payload = await get_teammates(db, driver_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get("/drivers/{driver_id}/races/{race_id}/full_data/")
+async def get_driver_race_data(driver_id: int, race_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Fetches all relevant data for a driver in a specific race, same payload as /races/{race_id}/weekend/drivers/{driver_id}."""
+    weekend = await get_driver_weekend(db, race_id, driver_id)
+    if weekend is None:
+        return {"error": "Race not found"}
+    driver_found, payload = weekend
+    if not driver_found:
+        return {"error": "Driver not found"}
+    return Response(content=payload, media_type="application/json")
 
 
 @router.put("/drivers/{driver_id}", response_model=Driver)
@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.columnar import arrow_schema, ipc_stream, parquet_stream
+from app.database import engine
+from app.models import LapTime, PitStop, Qualifying, Race, Result, Season, SprintResult
+
+router = APIRouter()
+
+# Rows fetched from the server-side cursor and written to the client per chunk
+EXPORT_CHUNK_SIZE = 5000
+
+
+class ExportTable(str, Enum):
+    lap_times = "lap_times"
+    results = "results"
+    pit_stops = "pit_stops"
+    qualifying = "qualifying"
+    sprint_results = "sprint_results"
+
+
+EXPORT_MODELS = {
+    ExportTable.lap_times: LapTime,
+    ExportTable.results: Result,
+    ExportTable.pit_stops: PitStop,
+    ExportTable.qualifying: Qualifying,
+    ExportTable.sprint_results: SprintResult,
+}
+
+
+def export_statement(model, season: Optional[int], race_id: Optional[int], driver_id: Optional[int]):
+    """Select the table columns with the filters pushed down into SQL, in primary key order."""
+    table = model.__table__
+    statement = select(table).order_by(*table.primary_key.columns)
+    if race_id is not None:
+        statement = statement.where(table.c.raceId == race_id)
+    if driver_id is not None:
+        statement = statement.where(table.c.driverId == driver_id)
+    if season is not None:
+        races = select(Race.raceId).join(Season, Race.seasonId == Season.seasonId).where(Season.year == season)
+        statement = statement.where(table.c.raceId.in_(races))
+    return statement
+
+
+def stream_partitions(statement):
+    """Yield the column names, then row chunks from a server-side cursor so memory stays constant."""
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=EXPORT_CHUNK_SIZE).execute(statement)
+        yield list(result.keys())
+        yield from result.partitions()
+
+
+def ndjson_lines(statement):
+    chunks = stream_partitions(statement)
+    columns = next(chunks)
+    for rows in chunks:
+        yield "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows)
+
+
+def csv_text(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def csv_lines(statement):
+    # The header is written before the first chunk, a filter matching no rows still gets it
+    chunks = stream_partitions(statement)
+    yield csv_text([next(chunks)])
+    for rows in chunks:
+        yield csv_text(rows)
+
+
+@router.get("/export/{table}.ndjson")
+def export_ndjson(table: ExportTable, season: Optional[int] = None, race_id: Optional[int] = None, driver_id: Optional[int] = None):
+    """Stream a table as newline delimited JSON, season is the championship year."""
+    statement = export_statement(EXPORT_MODELS[table], season, race_id, driver_id)
+    return StreamingResponse(ndjson_lines(statement), media_type="application/x-ndjson")
+
+
+@router.get("/export/{table}.csv")
+def export_csv(table: ExportTable, season: Optional[int] = None, race_id: Optional[int] = None, driver_id: Optional[int] = None):
+    """Stream a table as CSV with a header row, season is the championship year."""
+    statement = export_statement(EXPORT_MODELS[table], season, race_id, driver_id)
+    headers = {"Content-Disposition": f'attachment; filename="{table.value}.csv"'}
+    return StreamingResponse(csv_lines(statement), media_type="text/csv", headers=headers)
+
+
+@router.get("/export/{table}.arrow")
+def export_arrow(table: ExportTable, season: Optional[int] = None, race_id: Optional[int] = None, driver_id: Optional[int] = None):
+    """Stream a table as an Arrow IPC stream with typed columns, season is the championship year."""
+    model = EXPORT_MODELS[table]
+    statement = export_statement(model, season, race_id, driver_id)
+    headers = {"Content-Disposition": f'attachment; filename="{table.value}.arrow"'}
+    return StreamingResponse(ipc_stream(statement, arrow_schema(model.__table__)), media_type="application/vnd.apache.arrow.stream", headers=headers)
+
+
+@router.get("/export/{table}.parquet")
+def export_parquet(table: ExportTable, season: Optional[int] = None, race_id: Optional[int] = None, driver_id: Optional[int] = None):
+    """Stream a table as a zstd compressed Parquet file, season is the championship year."""
+    model = EXPORT_MODELS[table]
+    statement = export_statement(model, season, race_id, driver_id)
+    headers = {"Content-Disposition": f'attachment; filename="{table.value}.parquet"'}
+    return StreamingResponse(parquet_stream(statement, arrow_schema(model.__table__)), media_type="application/vnd.apache.parquet", headers=headers)
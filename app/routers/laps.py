@@ -1,7 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from app import crud, models, schemas
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import crud, async_crud, models, schemas
+from app.database import get_db, get_async_db
+from app.fast_json import rows_response
+from app.pagination import Page
+from app.query_spec import ListQuery, list_query
 from typing import List
 
 router = APIRouter()
@@ -11,12 +15,14 @@ def create_lap(lap_time: schemas.LapTimeCreate, db: Session = Depends(get_db)):
     return crud.create_lap_time(db,lap_time)
 
 @router.get("/lap_times/", response_model=List[schemas.LapTimeResponse])
-def get_all_lap_times(db: Session = Depends(get_db)):
-    return crud.get_lap_times(db)
+async def get_all_lap_times(page: Page = Depends(), query: ListQuery = Depends(list_query(models.LapTime, schemas.LapTimeResponse)),
+                            db: AsyncSession = Depends(get_async_db)):
+    rows = await async_crud.get_lap_times(db, query, page=page)
+    return rows_response(rows, schemas.LapTimeResponse, page, query.fields)
 
 @router.get("/lap_times/{lap_id}", response_model=schemas.LapTimeResponse)
-def get_lap_times_id(lap_id: int, db: Session = Depends(get_db)):
-    db_result = crud.get_lap_time(db,lap_id)
+async def get_lap_times_id(lap_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_result = await async_crud.get_lap_time(db,lap_id)
     if db_result is None:
         raise HTTPException(status_code=404, detail="Lap not found")
     return db_result
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from app.cache import response_cache
+from app.database import async_pool_metrics, pool_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics/pool")
+def get_pool_metrics():
+    """Checkout wait times and saturation of the sync and async connection pools."""
+    return {"sync": pool_metrics.snapshot(), "async": async_pool_metrics.snapshot()}
+
+
+@router.get("/metrics/cache")
+def get_cache_metrics():
+    """Hit and miss counters and memory use of the response cache."""
+    return response_cache.snapshot()
@@ -2,8 +2,12 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import schemas, crud
-from app.database import SessionLocal, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas, crud, async_crud
+from app.database import SessionLocal, get_db, get_async_db
+from app.fast_json import rows_response
+from app.pagination import Page
+from app.query_spec import ListQuery, list_query
 from typing import List
 
 
@@ -11,21 +15,23 @@ router = APIRouter()
 
 # Route to get all pit stops
 @router.get("/pit_stops", response_model=List[schemas.PitStopResponse])
-def get_pit_stops(db: Session = Depends(get_db)):
-    return crud.get_pit_stops(db)
+async def get_pit_stops(page: Page = Depends(), query: ListQuery = Depends(list_query(models.PitStop, schemas.PitStopResponse)),
+                        db: AsyncSession = Depends(get_async_db)):
+    rows = await async_crud.get_pit_stops(db, query, page=page)
+    return rows_response(rows, schemas.PitStopResponse, page, query.fields)
 
 # Route to get a pit stop by ID
 @router.get("/pit_stops/{pit_stop_id}", response_model=schemas.PitStopResponse)
-def get_pit_stop(pit_stop_id: int, db: Session = Depends(get_db)):
-    db_pit_stop = crud.get_pit_stop_by_id(db, pit_stop_id)
+async def get_pit_stop(pit_stop_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_pit_stop = await async_crud.get_pit_stop_by_id(db, pit_stop_id)
     if db_pit_stop is None:
         raise HTTPException(status_code=404, detail="Pit stop not found")
     return db_pit_stop
 
 # Route to get a pit stop by ID
 @router.get("/pit_stops/{pit_stop_id}/lap_times/", response_model=schemas.LapTimeResponse)
-def get_pit_stop(pit_stop_id: int, db: Session = Depends(get_db)):
-    db_lap = crud.get_pit_stop_by_lap(db, pit_stop_id)
+async def get_pit_stop(pit_stop_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_lap = await async_crud.get_pit_stop_by_lap(db, pit_stop_id)
     if db_lap is None:
         raise HTTPException(status_code=404, detail="Pit stop not found")
     return db_lap
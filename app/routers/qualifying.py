@@ -1,15 +1,14 @@
 # controllers.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import SessionLocal, get_db, get_async_db
 from app.crud import (
     create_qualifying,
     update_qualifying_position,
-    delete_qualifying,
-    get_qualifying_id)
-from app import schemas
-from typing import List
+    delete_qualifying)
+from app import schemas, async_crud
 
 router = APIRouter()
 
@@ -20,9 +19,12 @@ def add_qualifying(qualifying: schemas.QualifyingResponse, db: Session = Depends
 
 
 
-@router.get("/qualifying/{qualify_id}", response_model=List[schemas.QualifyingResponse])
-def get_qualifying(qualify_id: int, db: Session = Depends(get_db)):
-    return get_qualifying_id(db, qualify_id)
+@router.get("/qualifying/{qualify_id}", response_model=schemas.QualifyingResponse)
+async def get_qualifying(qualify_id: int, db: AsyncSession = Depends(get_async_db)):
+    qualifying = await async_crud.get_qualifying_id(db, qualify_id)
+    if qualifying is None:
+        raise HTTPException(status_code=404, detail="Qualifying not found")
+    return qualifying
 
 
 @router.put("/qualifying/{qualifying_id}", response_model=schemas.QualifyingResponse)
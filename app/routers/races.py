@@ -1,75 +1,123 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app import crud, models, schemas
-from app.database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, models, schemas
+from app.database import get_async_db
+from app.fast_json import rows_response
+from app.pagination import Page
+from app.query_spec import ListQuery, list_query
+from app.weekend import get_driver_weekend, get_race_weekend
 from typing import List, Optional
 
 router = APIRouter()
 
 @router.get("/races/", response_model=List[schemas.RaceResponse])
-def get_all_races(db: Session = Depends(get_db)):
-    return crud.get_races(db)
+async def get_all_races(page: Page = Depends(), query: ListQuery = Depends(list_query(models.Race, schemas.RaceResponse)),
+                        db: AsyncSession = Depends(get_async_db)):
+    rows = await async_crud.get_races(db, query, page=page)
+    return rows_response(rows, schemas.RaceResponse, page, query.fields)
 
 @router.get("/races/{race_id}", response_model=schemas.RaceResponse)
-def get_races_id(race_id: int, db: Session = Depends(get_db)):
-    db_result = db.query(models.Race).filter(models.Race.raceId == race_id).first()
+async def get_races_id(race_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_result = await async_crud.get_race(db, race_id)
     if db_result is None:
         raise HTTPException(status_code=404, detail="Race not found")
     return db_result
 
+@router.get("/races/{race_id}/fastest_lap", response_model=schemas.FastestLapResponse)
+async def get_race_fastest_lap(race_id: int, db: AsyncSession = Depends(get_async_db)):
+    fastest = await async_crud.get_fastest_lap(db, race_id)
+    if fastest is None:
+        raise HTTPException(status_code=404, detail="No lap times for this race")
+    return fastest._mapping
+
+@router.get("/races/{race_id}/weekend")
+async def get_race_weekend_data(race_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Race, every driver's qualifying, sprint, result, laps, pit stops and standing, and the constructor tables in one payload."""
+    payload = await get_race_weekend(db, race_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Race not found")
+    return Response(content=payload, media_type="application/json")
+
+@router.get("/races/{race_id}/weekend/drivers/{driver_id}")
+async def get_driver_weekend_data(race_id: int, driver_id: int, db: AsyncSession = Depends(get_async_db)):
+    weekend = await get_driver_weekend(db, race_id, driver_id)
+    if weekend is None:
+        raise HTTPException(status_code=404, detail="Race not found")
+    driver_found, payload = weekend
+    if not driver_found:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get("/races/{race_id}/analytics/gaps", response_model=List[schemas.LapGapResponse])
+async def get_race_gaps(race_id: int, driver_id: Optional[int] = None, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Cumulative time, gap to the leader and to the car ahead and rolling pace of every driver after every lap."""
+    gaps = await async_crud.get_lap_gaps_from_race(db, race_id, driver_id=driver_id, page=page, schema=schemas.LapGapResponse)
+    if gaps is None:
+        raise HTTPException(status_code=404, detail="Race not found")
+    return rows_response(gaps, schemas.LapGapResponse, page)
+
+@router.get("/races/{race_id}/analytics/stints", response_model=List[schemas.LapStintResponse])
+async def get_race_stints(race_id: int, driver_id: Optional[int] = None, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Stints between the pit stops with their laps and pace."""
+    stints = await async_crud.get_stints_from_race(db, race_id, driver_id=driver_id, page=page, schema=schemas.LapStintResponse)
+    if stints is None:
+        raise HTTPException(status_code=404, detail="Race not found")
+    return rows_response(stints, schemas.LapStintResponse, page)
+
 
 @router.get("/races/{race_id}/qualifying/", response_model=List[schemas.QualifyingResponse])
-def get_race_qualify(race_id: int, db: Session = Depends(get_db)):
-    qualifying = crud.get_qualifying_from_race(db,race_id)
+async def get_race_qualify(race_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    qualifying = await async_crud.get_qualifying_from_race(db,race_id, page=page, schema=schemas.QualifyingResponse)
     if qualifying is None:
         raise HTTPException(status_code=404, detail="Race not found")
-    return qualifying
+    return rows_response(qualifying, schemas.QualifyingResponse, page)
 
 @router.get("/races/{race_id}/results/", response_model=List[schemas.ResultResponse])
-def get_race_results(race_id: int, db: Session = Depends(get_db)):
-    results = crud.get_results_from_race(db,race_id)
+async def get_race_results(race_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    results = await async_crud.get_results_from_race(db,race_id, page=page, schema=schemas.ResultResponse)
     if results is None:
         raise HTTPException(status_code=404, detail="Race not found")
-    return results
+    return rows_response(results, schemas.ResultResponse, page)
 
 @router.get("/races/{race_id}/sprint_races/", response_model=List[schemas.SprintResultResponse])
-def get_race_sprint(race_id: int, db: Session = Depends(get_db)):
-    sprint_races = crud.get_sprint_results_from_race(db,race_id)
+async def get_race_sprint(race_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    sprint_races = await async_crud.get_sprint_results_from_race(db,race_id, page=page, schema=schemas.SprintResultResponse)
     if sprint_races is None:
         raise HTTPException(status_code=404, detail="Race not found")
-    return sprint_races
+    return rows_response(sprint_races, schemas.SprintResultResponse, page)
 
 @router.get("/races/{race_id}/pit_stops/", response_model=List[schemas.PitStopResponse])
-def get_race_pit(race_id: int, db: Session = Depends(get_db)):
-    pit_stops = crud.get_pit_stops_from_race(db,race_id)
+async def get_race_pit(race_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    pit_stops = await async_crud.get_pit_stops_from_race(db,race_id, page=page, schema=schemas.PitStopResponse)
     if pit_stops is None:
         raise HTTPException(status_code=404, detail="Race not found")
-    return pit_stops
+    return rows_response(pit_stops, schemas.PitStopResponse, page)
 
 @router.get("/races/{race_id}/lap_times/", response_model=List[schemas.LapTimeResponse])
-def get_race_lap(race_id: int, db: Session = Depends(get_db)):
-    lap_times = crud.get_laps_from_race(db,race_id)
+async def get_race_lap(race_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    lap_times = await async_crud.get_laps_from_race(db,race_id, page=page, schema=schemas.LapTimeResponse)
     if lap_times is None:
         raise HTTPException(status_code=404, detail="Race not found")
-    return lap_times
+    return rows_response(lap_times, schemas.LapTimeResponse, page)
 
 @router.get("/races/{race_id}/driver_standings/", response_model=List[schemas.DriverStandingResponse])
-def get_race_driverStand(race_id: int, db: Session = Depends(get_db)):
-    driver_stands = crud.get_driver_standings_from_race(db,race_id)
+async def get_race_driverStand(race_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    driver_stands = await async_crud.get_driver_standings_from_race(db,race_id, page=page)
     if driver_stands is None:
         raise HTTPException(status_code=404, detail="Race not found")
     return driver_stands
 
 @router.get("/races/{race_id}/constructor_results/", response_model=List[schemas.ConstructorResultResponse])
-def get_race_const_res(race_id: int, db: Session = Depends(get_db)):
-    constructor_result = crud.get_constructor_results_from_race(db,race_id)
+async def get_race_const_res(race_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    constructor_result = await async_crud.get_constructor_results_from_race(db,race_id, page=page)
     if constructor_result is None:
         raise HTTPException(status_code=404, detail="Race for constructor result not found")
     return constructor_result
 
 @router.get("/races/{race_id}/constructor_standings/", response_model=List[schemas.ConstructorStandingResponse])
-def get_race_const_stand(race_id: int, db: Session = Depends(get_db)):
-    constructor_standings = crud.get_constructor_standings_from_race(db,race_id)
+async def get_race_const_stand(race_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    constructor_standings = await async_crud.get_constructor_standings_from_race(db,race_id, page=page)
     if constructor_standings is None:
         raise HTTPException(status_code=404, detail="Race for constructor result not found")
     return constructor_standings
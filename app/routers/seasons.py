@@ -1,22 +1,89 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app import crud, models, schemas
-from app.database import get_db
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, schemas
+from app.database import get_async_db
+from app.fast_json import rows_response
+from app.pagination import Page
+from app.progression import get_season_progression
+from typing import List, Optional
 
 router = APIRouter()
 
 @router.get("/seasons/", response_model=List[schemas.SeasonResponse])
-def get_seasons(db: Session = Depends(get_db)):
-    return db.query(models.Season).all()
+async def get_seasons(page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.get_seasons(db, page=page)
 
 @router.get("/seasons/{season_id}", response_model=schemas.SeasonResponse)
-def get_season_id(season_id: int, db: Session = Depends(get_db)):
-    return db.query(models.Season).filter(models.Season.seasonId == season_id).first()
+async def get_season_id(season_id: int, db: AsyncSession = Depends(get_async_db)):
+    season = await async_crud.get_season(db, season_id)
+    if season is None:
+        raise HTTPException(status_code=404, detail="Season not found")
+    return season
 
 @router.get("/seasons/{season_id}/races/", response_model=List[schemas.RaceResponse])
-def get_season_id(season_id: int, db: Session = Depends(get_db)):
-    races = crud.get_races_from_seasons(db, season_id)
+async def get_season_id(season_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    races = await async_crud.get_races_from_seasons(db, season_id, page=page)
     if races is None:
-        raise HTTPException(status_code=404,detail="No races found")
+        raise HTTPException(status_code=404, detail="Season not found")
     return races
+
+@router.get("/seasons/{season_id}/fastest_laps", response_model=List[schemas.FastestLapResponse])
+async def get_season_fastest_laps(season_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Fastest lap of every race in the season that has lap times."""
+    fastest_laps = await async_crud.get_fastest_laps_from_season(db, season_id)
+    if fastest_laps is None:
+        raise HTTPException(status_code=404, detail="Season not found")
+    return rows_response(fastest_laps, schemas.FastestLapResponse)
+
+@router.get("/seasons/{season_id}/poles", response_model=List[schemas.PoleResponse])
+async def get_season_poles(season_id: int, db: AsyncSession = Depends(get_async_db)):
+    poles = await async_crud.get_poles_from_season(db, season_id)
+    if poles is None:
+        raise HTTPException(status_code=404, detail="Season not found")
+    return rows_response(poles, schemas.PoleResponse)
+
+@router.get("/seasons/{season_id}/standings/drivers", response_model=List[schemas.SeasonDriverStandingResponse])
+async def get_season_driver_standings(
+    season_id: int,
+    after_round: Optional[int] = Query(None, ge=1, description="Standings after this round, the latest by default"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    standings = await async_crud.get_driver_standings_from_season(db, season_id, after_round)
+    if standings is None:
+        raise HTTPException(status_code=404, detail="Season not found")
+    return rows_response(standings, schemas.SeasonDriverStandingResponse)
+
+@router.get("/seasons/{season_id}/standings/constructors", response_model=List[schemas.SeasonConstructorStandingResponse])
+async def get_season_constructor_standings(
+    season_id: int,
+    after_round: Optional[int] = Query(None, ge=1, description="Standings after this round, the latest by default"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    standings = await async_crud.get_constructor_standings_from_season(db, season_id, after_round)
+    if standings is None:
+        raise HTTPException(status_code=404, detail="Season not found")
+    return rows_response(standings, schemas.SeasonConstructorStandingResponse)
+
+@router.get("/seasons/{season_id}/standings/drivers/progression")
+async def get_season_driver_progression(
+    season_id: int,
+    after_round: Optional[int] = Query(None, ge=1, description="Only the rounds up to this one"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Points and position of every driver after each round, one array entry per round."""
+    payload = await get_season_progression(db, season_id, "drivers", after_round)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Season not found")
+    return Response(content=payload, media_type="application/json")
+
+@router.get("/seasons/{season_id}/standings/constructors/progression")
+async def get_season_constructor_progression(
+    season_id: int,
+    after_round: Optional[int] = Query(None, ge=1, description="Only the rounds up to this one"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Points and position of every constructor after each round, one array entry per round."""
+    payload = await get_season_progression(db, season_id, "constructors", after_round)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Season not found")
+    return Response(content=payload, media_type="application/json")
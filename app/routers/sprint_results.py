@@ -2,8 +2,12 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import schemas, crud, models
-from app.database import SessionLocal, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas, crud, async_crud, models
+from app.database import SessionLocal, get_db, get_async_db
+from app.fast_json import rows_response
+from app.pagination import Page
+from app.query_spec import ListQuery, list_query
 from typing import List
 
 router = APIRouter()
@@ -12,13 +16,15 @@ router = APIRouter()
 
 # Route to get all sprint results
 @router.get("/sprint_results", response_model=List[schemas.SprintResultResponse])
-def get_sprint_results(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
-    return db.query(models.SprintResult).offset(skip).limit(limit).all()
+async def get_sprint_results(page: Page = Depends(), query: ListQuery = Depends(list_query(models.SprintResult, schemas.SprintResultResponse)),
+                             db: AsyncSession = Depends(get_async_db)):
+    rows = await async_crud.get_sprint_results(db, query, page=page)
+    return rows_response(rows, schemas.SprintResultResponse, page, query.fields)
 
 # Route to get a specific sprint result by ID
 @router.get("/sprint_results/{sprint_result_id}", response_model=schemas.SprintResultResponse)
-def get_sprint_result(sprint_result_id: int, db: Session = Depends(get_db)):
-    db_sprint_result = crud.get_sprint_result_by_id(db, sprint_result_id)
+async def get_sprint_result(sprint_result_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_sprint_result = await async_crud.get_sprint_result_by_id(db, sprint_result_id)
     if db_sprint_result is None:
         raise HTTPException(status_code=404, detail="Sprint Result not found")
     return db_sprint_result
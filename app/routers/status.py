@@ -2,8 +2,11 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import schemas, crud
-from app.database import SessionLocal, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas, crud, async_crud
+from app.database import SessionLocal, get_db, get_async_db
+from app.fast_json import rows_response
+from app.pagination import Page
 from typing import List
 
 router = APIRouter()
@@ -11,32 +14,32 @@ router = APIRouter()
 
 # Route to get all statuses
 @router.get("/status", response_model=List[schemas.Status])
-def get_statuses(db: Session = Depends(get_db)):
-    return crud.get_statuses(db)
+async def get_statuses(page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.get_statuses(db, page=page, options=crud.STATUS_LOADERS)
 
 # Route to get a status by ID
 @router.get("/status/{status_id}", response_model=schemas.StatusResponse)
-def get_status_val(status_id: int, db: Session = Depends(get_db)):
-    db_status = crud.get_status_by_id(db, status_id)
+async def get_status_val(status_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_status = await async_crud.get_status_by_id(db, status_id)
     if db_status is None:
         raise HTTPException(status_code=404, detail="Status not found")
     return db_status
 
 # Route to get a status by ID
 @router.get("/status/{status_id}/results/", response_model=List[schemas.ResultResponse])
-def get_status_results(status_id: int, db: Session = Depends(get_db)):
-    results = crud.get_results_from_status(db, status_id)
+async def get_status_results(status_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    results = await async_crud.get_results_from_status(db, status_id, page=page, schema=schemas.ResultResponse)
     if results is None:
         raise HTTPException(status_code=404, detail="Status not found")
-    return results
+    return rows_response(results, schemas.ResultResponse, page)
 
 # Route to get a status by ID
 @router.get("/status/{status_id}/sprint_results/", response_model=List[schemas.SprintResultResponse])
-def get_status_results(status_id: int, db: Session = Depends(get_db)):
-    sprint_results = crud.get_results_from_status(db, status_id)
+async def get_status_sprint_results(status_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    sprint_results = await async_crud.get_sprint_results_from_status(db, status_id, page=page, schema=schemas.SprintResultResponse)
     if sprint_results is None:
         raise HTTPException(status_code=404, detail="Status not found")
-    return sprint_results
+    return rows_response(sprint_results, schemas.SprintResultResponse, page)
 
 # Route to create a new status
 @router.post("/statuses", response_model=schemas.Status)
@@ -53,7 +53,7 @@ class CircuitUpdate(BaseModel):
 
 class Circuit(CircuitBase):
     circuitId: int
-    races: List["Race"] = []  # Circular reference to Race
+    races: List["RaceResponse"] = []  # Races at the circuit, without their own children
 
     class Config:
         from_attributes = True
@@ -74,7 +74,7 @@ class PitStopResponse(BaseModel):
     pitStopId: int
     raceId: int
     driverId: int
-    lapId: int  # Ensure it references LapTime correctly
+    lapId: Optional[int]  # Ensure it references LapTime correctly
     stop: Optional[int]
     lap: int
     time: Optional[time]
@@ -88,10 +88,10 @@ class PitStopCreate(PitStopBase):
     pass
 
 
-class PitStop(PitStopBase, IDBase):
-    race: "Race"
-    driver: "Driver"
-    lap_time: "LapTime"  # Added relationship to LapTime
+class PitStop(PitStopBase):
+    race: "RaceResponse"
+    driver: "DriverResponse"
+    lap_time: Optional["LapTimeResponse"]  # Added relationship to LapTime
 
     class Config:
         from_attributes = True
@@ -123,14 +123,17 @@ class QualifyingResponse(BaseModel):
     q1: Optional[str]
     q2: Optional[str]
     q3: Optional[str]
+    q1Ms: Optional[int] = None
+    q2Ms: Optional[int] = None
+    q3Ms: Optional[int] = None
     class Config:
         from_attributes = True
 
 class Qualifying(QualifyingBase):
     qualifyId: int
-    race: "Race"
-    constructor: "Constructor"
-    driver: "Driver"
+    race: "RaceResponse"
+    constructor: "ConstructorResponse"
+    driver: "DriverResponse"
 
     class Config:
         from_attributes = True
@@ -162,17 +165,17 @@ class RaceCreate(RaceBase):
 class Race(RaceBase):
     raceId: int
     #Many races can have the same season and circuit
-    season: "Season"
-    circuit: "Circuit"
+    season: "SeasonResponse"
+    circuit: "CircuitResponse"
     #A single raceId can occur multiple times in these
-    qualifying: List["Qualifying"] = []
-    results: List["Result"] = []
-    sprint_results: List["SprintResult"] = []
-    pit_stops: List["PitStop"] = []
-    lap_times: List["LapTime"] = []
-    driver_standings: List["DriverStanding"] = []
-    constructor_standings: List["ConstructorStanding"] = []
-    constructor_results: List["ConstructorResult"] = []
+    qualifying: List["QualifyingResponse"] = []
+    results: List["ResultResponse"] = []
+    sprint_results: List["SprintResultResponse"] = []
+    pit_stops: List["PitStopResponse"] = []
+    lap_times: List["LapTimeResponse"] = []
+    driver_standings: List["DriverStandingResponse"] = []
+    constructor_standings: List["ConstructorStandingResponse"] = []
+    constructor_results: List["ConstructorResultResponse"] = []
 
     class Config:
         from_attributes = True
@@ -219,11 +222,11 @@ class ConstructorCreate(ConstructorBase):
 
 class Constructor(ConstructorBase):
     constructorId: int
-    constructor_results: List["ConstructorResult"] = []
-    constructor_standings: List["ConstructorStanding"] = []
-    results: List["Result"] = []
-    qualifying: List[Qualifying] = []
-    sprint_results: List["SprintResult"] = []
+    constructor_results: List["ConstructorResultResponse"] = []
+    constructor_standings: List["ConstructorStandingResponse"] = []
+    results: List["ResultResponse"] = []
+    qualifying: List["QualifyingResponse"] = []
+    sprint_results: List["SprintResultResponse"] = []
 
     class Config:
         from_attributes = True
@@ -270,12 +273,12 @@ class DriverUpdate(BaseModel):
 class Driver(DriverBase):
     driverId: int
     # A single driver can have multiple
-    results: List["Result"] = []
-    qualifying: List["Qualifying"] = []
-    pit_stops: List["PitStop"] = []
-    lap_times: List["LapTime"] = []
-    driver_standings: List["DriverStanding"] = []
-    sprint_results: List["SprintResult"] = []
+    results: List["ResultResponse"] = []
+    qualifying: List["QualifyingResponse"] = []
+    pit_stops: List["PitStopResponse"] = []
+    lap_times: List["LapTimeResponse"] = []
+    driver_standings: List["DriverStandingResponse"] = []
+    sprint_results: List["SprintResultResponse"] = []
 
     class Config:
         from_attributes = True
@@ -284,7 +287,7 @@ class Driver(DriverBase):
 class ConstructorResultBase(BaseModel):
     raceId: int
     constructorId: int
-    points: Optional[int]
+    points: Optional[float]
     status: Optional[str]
     class Config:
         from_attributes = True
@@ -292,7 +295,7 @@ class ConstructorResultResponse(BaseModel):
     constructorResultsId: int
     raceId: int
     constructorId: int
-    points: Optional[int]
+    points: Optional[float]
     status: Optional[str]
     class Config:
         from_attributes = True
@@ -304,8 +307,8 @@ class ConstructorResultCreate(ConstructorResultBase):
 class ConstructorResult(ConstructorResultBase):
     constructorResultsId: int
     #Many constructorResults can contain the same race or circuit
-    race: "Race"
-    constructor: "Constructor"
+    race: "RaceResponse"
+    constructor: "ConstructorResponse"
     class Config:
         from_attributes = True
 
@@ -313,7 +316,7 @@ class ConstructorResult(ConstructorResultBase):
 class ConstructorStandingBase(BaseModel):
     raceId: int
     constructorId: int
-    points: int
+    points: float
     position: int
     positionText: str
     wins: int
@@ -322,7 +325,7 @@ class ConstructorStandingResponse(BaseModel):
     constructorStandingsId: int
     raceId: int
     constructorId: int
-    points: int
+    points: float
     position: int
     positionText: str
     wins: int
@@ -334,8 +337,8 @@ class ConstructorStandingCreate(ConstructorStandingBase):
 
 class ConstructorStanding(ConstructorStandingBase):
     constructorStandingsId: int
-    race: "Race"
-    constructor: "Constructor"
+    race: "RaceResponse"
+    constructor: "ConstructorResponse"
 
     class Config:
         from_attributes = True
@@ -345,7 +348,7 @@ class ConstructorStanding(ConstructorStandingBase):
 class DriverStandingBase(BaseModel):
     raceId: int
     driverId: int
-    points: int
+    points: float
     position: int
     positionText: str
     wins: int
@@ -354,7 +357,7 @@ class DriverStandingResponse(BaseModel):
     driverStandingsId: int
     raceId: int
     driverId: int
-    points: int
+    points: float
     position: Optional[int]
     positionText: Optional[str]
     wins: Optional[int]
@@ -367,8 +370,8 @@ class DriverStandingCreate(DriverStandingBase):
 
 class DriverStanding(DriverStandingBase):
     driverStandingsId: int
-    race: "Race"
-    driver: "Driver"
+    race: "RaceResponse"
+    driver: "DriverResponse"
 
     class Config:
         from_attributes = True
@@ -389,9 +392,9 @@ class LapTimeCreate(LapTimeBase):
 
 class LapTime(LapTimeBase):
     lapId: int
-    race: "Race"
-    driver: "Driver"
-    pit_stop: "PitStop"  # Added relationship to PitStop
+    race: "RaceResponse"
+    driver: "DriverResponse"
+    pit_stop: Optional["PitStopResponse"]  # Added relationship to PitStop
 
     class Config:
         from_attributes = True
@@ -430,7 +433,7 @@ class ResultBase(BaseModel):
     position: Optional[int]
     positionText: Optional[str]
     positionOrder: Optional[int]
-    points: Optional[int]
+    points: Optional[float]
     laps: Optional[int]
     time: Optional[str]
     milliseconds: Optional[int]
@@ -453,13 +456,14 @@ class ResultResponse(BaseModel):
     position: Optional[int]
     positionText: Optional[str]
     positionOrder: Optional[int]
-    points: Optional[int] = None
+    points: Optional[float] = None
     laps: Optional[int]
     time: Optional[str]
     milliseconds: Optional[int]
     fastestLap: Optional[int]
     rank: Optional[int]
     fastestLapTime: Optional[str]
+    fastestLapMs: Optional[int] = None
     fastestLapSpeed: Optional[float]
     statusId: Optional[int]
 
@@ -468,10 +472,10 @@ class ResultResponse(BaseModel):
 
 class Result(ResultBase):
     resultId: int
-    race: "Race"
-    driver: "Driver"
-    constructor: "Constructor"
-    status: "Status"
+    race: "RaceResponse"
+    driver: "DriverResponse"
+    constructor: "ConstructorResponse"
+    status: "StatusResponse"
 
     class Config:
         from_attributes = True
@@ -492,7 +496,7 @@ class SeasonResponse(BaseModel):
 
 class Season(SeasonBase):
     seasonId: int
-    races: List["Race"] = []
+    races: List["RaceResponse"] = []
 
     class Config:
         from_attributes = True
@@ -507,7 +511,7 @@ class SprintResultBase(BaseModel):
     position: Optional[int]
     positionText: Optional[str]
     positionOrder: Optional[int]
-    points: Optional[int]
+    points: Optional[float]
     laps: Optional[int]
     time: Optional[str]
     milliseconds: Optional[int]
@@ -529,12 +533,13 @@ class SprintResultResponse(BaseModel):
     position: Optional[int]
     positionText: Optional[str]
     positionOrder: Optional[int]
-    points: Optional[int]
+    points: Optional[float]
     laps: Optional[int]
     time: Optional[str]
     milliseconds: Optional[int]
     fastestLap: Optional[int]
     fastestLapTime: Optional[str]
+    fastestLapMs: Optional[int] = None
     statusId: Optional[int]
 
     class Config:
@@ -542,10 +547,10 @@ class SprintResultResponse(BaseModel):
 
 class SprintResult(SprintResultBase):
     sprintResultId: int
-    race: "Race"
-    constructor: "Constructor"
-    driver: "Driver"
-    status: "Status"
+    race: "RaceResponse"
+    constructor: "ConstructorResponse"
+    driver: "DriverResponse"
+    status: "StatusResponse"
 
     class Config:
         from_attributes = True
@@ -560,13 +565,94 @@ class StatusCreate(StatusBase):
 
 class StatusResponse(BaseModel):
     statusId: int
-    year: int
+    status: str
+
+    class Config:
+        from_attributes = True
+
+class Status(StatusBase):
+    statusId: int
+    results: List["ResultResponse"] = []
+    sprint_results: List["SprintResultResponse"] = []
+    class Config:
+        from_attributes = True
+
+
+# Lap analytics tables
+class LapGapResponse(BaseModel):
+    raceId: int
+    driverId: int
+    lap: int
+    position: Optional[int]
+    milliseconds: Optional[int]
+    cumulativeMs: Optional[int]
+    gapToLeaderMs: Optional[int]
+    gapToAheadMs: Optional[int]  # None for the leader
+    rollingPaceMs: Optional[int]  # Average of the last five laps
+
+    class Config:
+        from_attributes = True
+
+
+class LapStintResponse(BaseModel):
+    raceId: int
+    driverId: int
+    stint: int
+    startLap: int
+    endLap: int
+    laps: int
+    averageMs: Optional[int]
+    bestMs: Optional[int]
 
     class Config:
         from_attributes = True
 
-class Status(StatusBase, IDBase):
-    results: List["Result"] = []
-    sprint_results: List["SprintResult"] = []
+
+class FastestLapResponse(BaseModel):
+    raceId: int
+    round: int
+    driverId: int
+    lap: int
+    time: Optional[str]
+    milliseconds: int
+
+    class Config:
+        from_attributes = True
+
+
+class PoleResponse(BaseModel):
+    raceId: int
+    round: int
+    driverId: int
+    constructorId: int
+    time: Optional[str]  # Best of the session that decided the pole, Q3 when it was held
+    milliseconds: Optional[int]
+
+    class Config:
+        from_attributes = True
+
+
+class SeasonDriverStandingResponse(BaseModel):
+    raceId: int  # Race of the round the standings are taken after
+    round: int
+    driverId: int
+    points: float
+    position: Optional[int]
+    positionText: Optional[str]
+    wins: Optional[int]
+
+    class Config:
+        from_attributes = True
+
+
+class SeasonConstructorStandingResponse(BaseModel):
+    raceId: int
+    round: int
+    constructorId: int
+    points: float
+    position: Optional[int]
+    positionText: Optional[str]
+    wins: Optional[int]
+
     class Config:
         from_attributes = True
@@ -0,0 +1,226 @@
+import argparse
+import sys
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from app.bulk_loader import copy_frame, quote, reset_sequence, upsert_statement
+from app.changes import notify
+from app.database import engine
+from app.models import ConstructorStanding, DriverStanding
+
+# Championship standings derived from results and sprint_results, so a corrected result reaches
+# driver_standings and constructor_standings without reloading their csv files. For every round
+# the points, wins and finishing positions are summed cumulatively per driver and constructor and
+# ranked with the countback tie-break: points, then the number of wins, then of second places and
+# so on. Sprints add points but no wins or countback places. A change to a race recomputes its
+# season from that round onward, earlier rounds cannot change, and the rows are diffed into the
+# standings tables through a staging table so only the changed ones are written.
+# Only seasons from FIRST_DERIVED_YEAR on are derived, before it drivers dropped their worst
+# results and there was no constructors' championship until 1958, so the csv standings of those
+# seasons are kept as they are. A driver or constructor excluded from a championship, e.g. "D"
+# as positionText in the csv, keeps that positionText and is ranked after the others.
+
+# Tables the standings are computed from
+SOURCE_TABLES = {"results", "sprint_results"}
+
+# (model, entity column) of the standings tables
+STANDINGS = [
+    (DriverStanding, "driverId"),
+    (ConstructorStanding, "constructorId"),
+]
+
+STANDINGS_TABLES = {model.__table__.name for model, _ in STANDINGS}
+
+COLUMNS = ["raceId", "points", "position", "positionText", "wins"]
+
+# Every result counts from 1991 on, both championships are the plain sum of the points
+FIRST_DERIVED_YEAR = 1991
+
+ENTRIES_SQL = '''
+    SELECT x."raceId", x."driverId", x."constructorId", x.points{position}, r."seasonId", r.round
+    FROM {table} x
+    JOIN races r ON r."raceId" = x."raceId"
+    WHERE r."seasonId" = ANY(:seasons)
+'''
+
+
+# Championship exclusions, the latest non numeric positionText of each entity in the seasons
+EXCLUSIONS_SQL = '''
+    SELECT DISTINCT ON (r."seasonId", t."{entity}") r."seasonId", t."{entity}", t."positionText"
+    FROM {table} t
+    JOIN races r ON r."raceId" = t."raceId"
+    WHERE r."seasonId" = ANY(:seasons) AND t."positionText" !~ '^[0-9]+$'
+    ORDER BY r."seasonId", t."{entity}", r.round DESC
+'''
+
+
+def affected_rounds(connection, race_ids):
+    """{seasonId: first round to recompute} for the changed races of the seasons the engine derives."""
+    rows = connection.execute(text('''
+        SELECT r."seasonId", MIN(r.round)
+        FROM races r
+        JOIN seasons s ON s."seasonId" = r."seasonId"
+        WHERE r."raceId" = ANY(:race_ids) AND s.year >= :first_year
+        GROUP BY r."seasonId"
+    '''), {'race_ids': sorted(race_ids), 'first_year': FIRST_DERIVED_YEAR}).all()
+    return dict(rows)
+
+
+def derivable_races(connection, changed_races: dict):
+    """raceIds whose standings to recompute after a load, from {table: changed raceIds}.
+
+    The races of changed results and sprint results, except in seasons whose standings the same
+    load brought from the csv files, those are taken as they are.
+    """
+    sources = set().union(*(changed_races.get(table) or () for table in SOURCE_TABLES))
+    loaded = set().union(*(changed_races.get(table) or () for table in STANDINGS_TABLES))
+    if not sources or not loaded:
+        return sources
+    return set(connection.execute(text('''
+        SELECT "raceId" FROM races
+        WHERE "raceId" = ANY(:sources)
+          AND "seasonId" NOT IN (SELECT "seasonId" FROM races WHERE "raceId" = ANY(:loaded) AND "seasonId" IS NOT NULL)
+    '''), {'sources': sorted(sources), 'loaded': sorted(loaded)}).scalars())
+
+
+def read_exclusions(connection, table: str, entity: str, seasons):
+    """{(seasonId, entity id): positionText} of the entities excluded from the championship."""
+    rows = connection.execute(text(EXCLUSIONS_SQL.format(table=table, entity=entity)), {'seasons': sorted(seasons)}).all()
+    return {(season_id, entity_id): position_text for season_id, entity_id, position_text in rows}
+
+
+def read_entries(connection, seasons):
+    """Every result and sprint result of the seasons, sprints without a countback position."""
+    frames = [
+        pd.read_sql_query(text(ENTRIES_SQL.format(table=table, position=position)), connection,
+                          params={'seasons': sorted(seasons)})
+        for table, position in (("results", ", x.position"), ("sprint_results", ""))
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def compute_standings(entries: pd.DataFrame, entity: str, exclusions: dict = None):
+    """Standings after every round of the seasons in entries, one row per entity and race.
+
+    An entity appears from its first round of the season on, rounds without any entry are skipped.
+    exclusions maps (seasonId, entity id) to the positionText of an entity excluded from that
+    championship, it is ranked after everyone else.
+    """
+    entries = entries.dropna(subset=[entity]).astype({entity: int, "raceId": int, "seasonId": int, "round": int})
+    keys = ["seasonId", entity, "round"]
+
+    # Finishes in every position, the columns are the countback order
+    places = pd.get_dummies(entries["position"].astype("Int64"), prefix="p", dtype=int)
+    places = places[sorted(places.columns, key=lambda name: int(name[2:]))]
+    per_round = pd.concat([entries[keys], entries["points"].fillna(0), places], axis=1)
+    per_round = per_round.groupby(keys, sort=False).sum()
+
+    rounds = entries[["seasonId", "round", "raceId"]].drop_duplicates(["seasonId", "round"])
+    first = entries.groupby(["seasonId", entity], as_index=False)["round"].min().rename(columns={"round": "first"})
+    grid = first.merge(rounds, on="seasonId")
+    grid = grid[grid["round"] >= grid["first"]].drop(columns="first")
+    grid = grid.sort_values(keys).set_index(keys)
+
+    totals = per_round.reindex(grid.index, fill_value=0).groupby(level=["seasonId", entity]).cumsum()
+    standings = grid.join(totals).reset_index()
+    standings["wins"] = standings["p_1"] if "p_1" in standings else 0
+
+    exclusions = exclusions or {}
+    excluded = pd.Series(
+        [exclusions.get(key) for key in zip(standings["seasonId"], standings[entity])], index=standings.index, dtype=object,
+    )
+    standings["classified"] = excluded.isna()
+
+    # Rank within each round, entities level on points and every countback place share the position
+    countback = ["classified", "points"] + list(places.columns)
+    standings = standings.sort_values(
+        ["seasonId", "round"] + countback + [entity],
+        ascending=[True, True] + [False] * len(countback) + [True],
+    )
+    level = standings.groupby(["seasonId", "round"]).cumcount() + 1
+    tied = standings[["seasonId", "round"] + countback].eq(standings[["seasonId", "round"] + countback].shift()).all(axis=1)
+    standings["position"] = level.mask(tied).ffill().astype(int)
+    standings["positionText"] = excluded.fillna(standings["position"].astype(str))
+    return standings
+
+
+def write_standings(connection, model, entity: str, standings: pd.DataFrame, race_ids: list):
+    """Diff the standings of the recomputed races into the table, returns (inserted, updated, deleted)."""
+    table = model.__table__.name
+    staging = f"staging_{table}"
+    columns = [COLUMNS[0], entity] + COLUMNS[1:]
+    names = ', '.join(quote(name) for name in columns)
+
+    # COPY needs the DBAPI cursor, it runs in the connection's transaction
+    cursor = connection.connection.cursor()
+    cursor.execute(f'CREATE TEMP TABLE {quote(staging)} ON COMMIT DROP AS SELECT {names} FROM {quote(table)} WITH NO DATA')
+    copy_frame(cursor, staging, standings[columns])
+    reset_sequence(connection, model)
+    inserted, updated = connection.execute(text(upsert_statement(table, quote(staging), columns, ("raceId", entity)))).one()
+    deleted = connection.execute(text(f'''
+        DELETE FROM {quote(table)} t
+        WHERE t."raceId" = ANY(:race_ids)
+          AND NOT EXISTS (SELECT 1 FROM {quote(staging)} s WHERE s."raceId" = t."raceId" AND s.{quote(entity)} = t.{quote(entity)})
+    '''), {'race_ids': race_ids}).rowcount
+    cursor.execute(f'DROP TABLE {quote(staging)}')
+    return inserted, updated, deleted
+
+
+def update_standings(connection, race_ids):
+    """Recompute the standings from the earliest changed round of each season, in the connection's transaction.
+
+    race_ids are the races whose results or sprint results changed, races of seasons before
+    FIRST_DERIVED_YEAR are left alone. Returns {table: (inserted, updated, deleted)}.
+    """
+    first_rounds = affected_rounds(connection, race_ids)
+    if not first_rounds:
+        return {}
+    entries = read_entries(connection, first_rounds)
+    recomputed = connection.execute(text('''
+        SELECT r."raceId" FROM races r
+        JOIN unnest(CAST(:seasons AS int[]), CAST(:rounds AS int[])) AS f("seasonId", round) ON f."seasonId" = r."seasonId"
+        WHERE r.round >= f.round
+    '''), {'seasons': list(first_rounds), 'rounds': list(first_rounds.values())}).scalars().all()
+
+    counts = {}
+    for model, entity in STANDINGS:
+        exclusions = read_exclusions(connection, model.__table__.name, entity, first_rounds)
+        standings = compute_standings(entries, entity, exclusions)
+        standings = standings[standings["round"] >= standings["seasonId"].map(first_rounds)]
+        counts[model.__table__.name] = write_standings(connection, model, entity, standings, recomputed)
+
+    changed = {table for table, written in counts.items() if any(written)}
+    if changed:
+        notify(connection, changed, set(first_rounds))
+    return counts
+
+
+def print_counts(counts: dict):
+    for table, (inserted, updated, deleted) in counts.items():
+        print(f"{table:<24}{inserted:>10}{updated:>10}{deleted:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute the driver and constructor standings from the results.")
+    parser.add_argument("--seasons", nargs="+", type=int, metavar="YEAR", required=True,
+                        help=f"championship years to recompute, from {FIRST_DERIVED_YEAR} on")
+    args = parser.parse_args(argv)
+    skipped = sorted(year for year in args.seasons if year < FIRST_DERIVED_YEAR)
+    if skipped:
+        print(f"⚠️ Skipped {', '.join(map(str, skipped))}, standings before {FIRST_DERIVED_YEAR} come from the csv files")
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        race_ids = connection.execute(text('''
+            SELECT r."raceId" FROM races r JOIN seasons s ON s."seasonId" = r."seasonId" WHERE s.year = ANY(:years)
+        '''), {'years': args.seasons}).scalars().all()
+        counts = update_standings(connection, race_ids)
+    print(f"{'table':<24}{'inserted':>10}{'updated':>10}{'deleted':>10}")
+    print_counts(counts)
+    print(f"✅ Standings recomputed in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,207 @@
+import time
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.changes import notify
+from app.database import engine
+from app.models import ConstructorCareerStat, ConstructorSeasonStat, DriverCareerStat, DriverSeasonStat
+
+# Career and season statistics of drivers and constructors, stored in tables so a profile reads
+# one row instead of scanning results, qualifying and sprint_results. The loaders refresh them
+# after those tables change, only for the drivers and constructors of the changed races: their
+# season rows are recomputed from the source tables and their career row is summed from the
+# season rows. Plain tables rather than materialized views because a view can only be
+# refreshed whole.
+
+# Tables the statistics are computed from
+SOURCE_TABLES = {"results", "sprint_results", "qualifying"}
+
+# Entity column -> (season table, career table)
+STATS = {
+    "driverId": (DriverSeasonStat.__tablename__, DriverCareerStat.__tablename__),
+    "constructorId": (ConstructorSeasonStat.__tablename__, ConstructorCareerStat.__tablename__),
+}
+
+STATS_TABLES = {table for tables in STATS.values() for table in tables}
+
+TOTALS = ['races', 'wins', 'podiums', 'poles', '"fastestLaps"', 'points', '"sprintWins"', '"sprintPoints"']
+
+SEASON_STATS_SQL = '''
+INSERT INTO {season_table} ("{entity}", "seasonId", races, wins, podiums, poles, "fastestLaps", points,
+                            "sprintWins", "sprintPoints", "bestFinish", dnfs, "dnfsByStatus")
+WITH race_rows AS (
+    SELECT x."{entity}" AS id, r."seasonId", x."raceId", x.position, x.points, x.rank, x."statusId"
+    FROM results x
+    JOIN races r ON r."raceId" = x."raceId"
+    WHERE x."{entity}" IS NOT NULL{ids}
+),
+race_stats AS (
+    SELECT id, "seasonId",
+        COUNT(DISTINCT "raceId") AS races,
+        COUNT(*) FILTER (WHERE position = 1) AS wins,
+        COUNT(*) FILTER (WHERE position <= 3) AS podiums,
+        COUNT(*) FILTER (WHERE rank = 1) AS fastest_laps,
+        COALESCE(SUM(points), 0) AS points,
+        MIN(position) AS best_finish,
+        COUNT(*) FILTER (WHERE position IS NULL) AS dnfs
+    FROM race_rows
+    GROUP BY id, "seasonId"
+),
+dnf_stats AS (
+    SELECT id, "seasonId", jsonb_object_agg(status, count) AS by_status
+    FROM (
+        SELECT x.id, x."seasonId", COALESCE(s.status, 'Unknown') AS status, COUNT(*) AS count
+        FROM race_rows x
+        LEFT JOIN status s ON s."statusId" = x."statusId"
+        WHERE x.position IS NULL
+        GROUP BY 1, 2, 3
+    ) dnf
+    GROUP BY id, "seasonId"
+),
+sprint_stats AS (
+    SELECT x."{entity}" AS id, r."seasonId",
+        COUNT(*) FILTER (WHERE x.position = 1) AS wins,
+        COALESCE(SUM(x.points), 0) AS points
+    FROM sprint_results x
+    JOIN races r ON r."raceId" = x."raceId"
+    WHERE x."{entity}" IS NOT NULL{ids}
+    GROUP BY 1, 2
+),
+pole_stats AS (
+    SELECT x."{entity}" AS id, r."seasonId", COUNT(*) AS poles
+    FROM qualifying x
+    JOIN races r ON r."raceId" = x."raceId"
+    WHERE x.position = 1 AND x."{entity}" IS NOT NULL{ids}
+    GROUP BY 1, 2
+),
+keys AS (
+    SELECT id, "seasonId" FROM race_stats
+    UNION SELECT id, "seasonId" FROM sprint_stats
+    UNION SELECT id, "seasonId" FROM pole_stats
+)
+SELECT k.id, k."seasonId",
+    COALESCE(rs.races, 0), COALESCE(rs.wins, 0), COALESCE(rs.podiums, 0), COALESCE(ps.poles, 0),
+    COALESCE(rs.fastest_laps, 0), COALESCE(rs.points, 0) + COALESCE(ss.points, 0),
+    COALESCE(ss.wins, 0), COALESCE(ss.points, 0), rs.best_finish, COALESCE(rs.dnfs, 0),
+    COALESCE(ds.by_status, '{{}}')
+FROM keys k
+LEFT JOIN race_stats rs ON rs.id = k.id AND rs."seasonId" = k."seasonId"
+LEFT JOIN dnf_stats ds ON ds.id = k.id AND ds."seasonId" = k."seasonId"
+LEFT JOIN sprint_stats ss ON ss.id = k.id AND ss."seasonId" = k."seasonId"
+LEFT JOIN pole_stats ps ON ps.id = k.id AND ps."seasonId" = k."seasonId"
+WHERE k."seasonId" IS NOT NULL
+'''
+
+CAREER_STATS_SQL = '''
+INSERT INTO {career_table} ("{entity}", seasons, {totals}, "bestFinish", dnfs, "dnfsByStatus")
+SELECT s."{entity}", COUNT(*), {sums}, MIN(s."bestFinish"), SUM(s.dnfs),
+    COALESCE((
+        SELECT jsonb_object_agg(status, count)
+        FROM (
+            SELECT d.key AS status, SUM(d.value::int) AS count
+            FROM {season_table} x, jsonb_each_text(x."dnfsByStatus") d
+            WHERE x."{entity}" = s."{entity}"
+            GROUP BY d.key
+        ) dnf
+    ), '{{}}')
+FROM {season_table} s
+WHERE true{ids}
+GROUP BY s."{entity}"
+'''
+
+
+@lru_cache(maxsize=None)
+def refresh_statements(entity: str, limited: bool):
+    """(deletes, season insert, career insert) for every row, or for the rows of the :ids when limited."""
+    season_table, career_table = STATS[entity]
+    ids = f' AND x."{entity}" = ANY(:ids)' if limited else ''
+    where = f' WHERE "{entity}" = ANY(:ids)' if limited else ''
+    delete = [f'DELETE FROM {season_table}{where}', f'DELETE FROM {career_table}{where}']
+    season = SEASON_STATS_SQL.format(season_table=season_table, entity=entity, ids=ids)
+    career = CAREER_STATS_SQL.format(
+        career_table=career_table, season_table=season_table, entity=entity,
+        totals=', '.join(TOTALS), sums=', '.join(f'SUM(s.{column})' for column in TOTALS),
+        ids=f' AND s."{entity}" = ANY(:ids)' if limited else '',
+    )
+    return delete, season, career
+
+
+def affected_ids(connection, race_ids):
+    """{entity column: ids} of the drivers and constructors with a row in any of the races."""
+    affected = {}
+    for entity in STATS:
+        affected[entity] = connection.execute(text(f'''
+            SELECT "{entity}" FROM results WHERE "raceId" = ANY(:race_ids) AND "{entity}" IS NOT NULL
+            UNION SELECT "{entity}" FROM sprint_results WHERE "raceId" = ANY(:race_ids) AND "{entity}" IS NOT NULL
+            UNION SELECT "{entity}" FROM qualifying WHERE "raceId" = ANY(:race_ids) AND "{entity}" IS NOT NULL
+        '''), {'race_ids': sorted(race_ids)}).scalars().all()
+    return affected
+
+
+def refresh_stats(connection, race_ids=None, previous_ids: dict = None):
+    """Recompute the statistics in the connection's transaction, readers keep the old rows until it commits.
+
+    race_ids limits the refresh to the drivers and constructors of those races, None refreshes everyone.
+    previous_ids adds {entity column: ids} read before the change, rows moved away from them leave
+    no trace in the races.
+    """
+    affected = affected_ids(connection, race_ids) if race_ids is not None else {entity: None for entity in STATS}
+    for entity, ids in (previous_ids or {}).items():
+        if affected[entity] is not None:
+            affected[entity] = sorted(set(affected[entity]) | ids)
+    if not any(ids is None or ids for ids in affected.values()):
+        return
+    for entity, ids in affected.items():
+        if ids is not None and not ids:
+            continue
+        deletes, season, career = refresh_statements(entity, ids is not None)
+        params = {'ids': ids} if ids is not None else {}
+        for statement in deletes:
+            connection.execute(text(statement), params)
+        connection.execute(text(season), params)
+        connection.execute(text(career), params)
+    notify(connection, STATS_TABLES)
+
+
+STATS_PAYLOAD_SQL = '''
+SELECT json_build_object(
+    '{entity}', e."{entity}",
+    'career', (SELECT to_json(c) FROM {career_table} c WHERE c."{entity}" = e."{entity}"),
+    'seasons', (
+        SELECT COALESCE(json_agg(to_json(s) ORDER BY s.year), '[]')
+        FROM (
+            SELECT se.year, x.*
+            FROM {season_table} x
+            JOIN seasons se ON se."seasonId" = x."seasonId"
+            WHERE x."{entity}" = e."{entity}"
+        ) s
+    )
+)::text
+FROM {entity_table} e
+WHERE e."{entity}" = :id
+'''
+
+ENTITY_TABLES = {"driverId": "drivers", "constructorId": "constructors"}
+
+
+async def get_stats(db: AsyncSession, entity: str, entity_id: int) -> Optional[str]:
+    """JSON text of the career row and the season rows, None when the driver or constructor does not exist."""
+    season_table, career_table = STATS[entity]
+    statement = STATS_PAYLOAD_SQL.format(
+        entity=entity, entity_table=ENTITY_TABLES[entity], season_table=season_table, career_table=career_table,
+    )
+    return await db.scalar(text(statement), {"id": entity_id})
+
+
+def refresh_all():
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        refresh_stats(connection)
+    print(f"✅ Refreshed {', '.join(sorted(STATS_TABLES))} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    refresh_all()
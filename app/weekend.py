@@ -0,0 +1,127 @@
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Race weekend payloads built entirely in PostgreSQL. Every table of the weekend is one CTE
+# filtered on the race (and the driver for the per-driver variant), the rows are turned into
+# JSON with to_jsonb and json_agg, and the whole response comes back as one text value that
+# the routes send as is. One statement per request, no ORM objects.
+
+RACE = '''
+    race AS (
+        SELECT json_build_object(
+            'raceId', r."raceId", 'name', r.name, 'seasonId', r."seasonId", 'year', s.year,
+            'round', r.round, 'date', r.date, 'time', r.time,
+            'circuit', json_build_object(
+                'circuitId', c."circuitId", 'name', c.name, 'location', c.location, 'country', c.country
+            )
+        ) AS race
+        FROM races r
+        LEFT JOIN seasons s ON s."seasonId" = r."seasonId"
+        LEFT JOIN circuits c ON c."circuitId" = r."circuitId"
+        WHERE r."raceId" = :race_id
+    )'''
+
+# One row per driver, (table, order) where order picks the first row when a driver has several
+SINGLE_ROWS = {
+    'res': ('results', '"resultId"'),
+    'qual': ('qualifying', '"qualifyId"'),
+    'spr': ('sprint_results', '"sprintResultId"'),
+    'stand': ('driver_standings', '"driverStandingsId"'),
+}
+
+# Every row of the driver, (table, order of the json array)
+MANY_ROWS = {
+    'stops': ('pit_stops', 'stop'),
+    'laps': ('lap_times', 'lap'),
+}
+
+# Keys match the original full_data payload so the driver page keeps working
+ENTRY_FIELDS = '''
+    'driver', json_build_object(
+        'driverId', d."driverId", 'driverRef', d."driverRef", 'code', d.code,
+        'name', d.forename || ' ' || d.surname, 'nationality', d.nationality, 'dob', d.dob
+    ),
+    'result', res.row,
+    'qualifying', qual.row,
+    'sprint_results', spr.row,
+    'standings', stand.row,
+    'pit_stops', COALESCE(stops.rows, '[]'),
+    'lap_times', COALESCE(laps.rows, '[]')'''
+
+ENTRY_JOINS = '''
+    LEFT JOIN res ON res."driverId" = d."driverId"
+    LEFT JOIN qual ON qual."driverId" = d."driverId"
+    LEFT JOIN spr ON spr."driverId" = d."driverId"
+    LEFT JOIN stand ON stand."driverId" = d."driverId"
+    LEFT JOIN stops ON stops."driverId" = d."driverId"
+    LEFT JOIN laps ON laps."driverId" = d."driverId"'''
+
+
+def table_ctes(driver_filter: str):
+    ctes = [RACE]
+    for name, (table, order) in SINGLE_ROWS.items():
+        ctes.append(f'''
+    {name} AS (
+        SELECT DISTINCT ON ("driverId") "driverId", to_jsonb(t) AS row
+        FROM {table} t
+        WHERE "raceId" = :race_id{driver_filter}
+        ORDER BY "driverId", {order}
+    )''')
+    for name, (table, order) in MANY_ROWS.items():
+        ctes.append(f'''
+    {name} AS (
+        SELECT "driverId", json_agg(to_jsonb(t) ORDER BY t.{order}) AS rows
+        FROM {table} t
+        WHERE "raceId" = :race_id{driver_filter}
+        GROUP BY "driverId"
+    )''')
+    return 'WITH' + ','.join(ctes)
+
+
+# Drivers of the weekend are the ones with a result, qualifying, sprint, lap or pit stop row,
+# ordered by finishing position and then grid position for the ones that did not start
+RACE_WEEKEND_SQL = table_ctes('') + f''',
+    entrants AS (
+        SELECT "driverId" FROM res UNION SELECT "driverId" FROM qual UNION SELECT "driverId" FROM spr
+        UNION SELECT "driverId" FROM stops UNION SELECT "driverId" FROM laps
+    )
+SELECT json_build_object(
+    'race', race.race,
+    'drivers', (
+        SELECT COALESCE(json_agg(
+            json_build_object({ENTRY_FIELDS})
+            ORDER BY (res.row->>'positionOrder')::int NULLS LAST, (qual.row->>'position')::int NULLS LAST, d."driverId"
+        ), '[]')
+        FROM entrants e
+        JOIN drivers d ON d."driverId" = e."driverId"{ENTRY_JOINS}
+    ),
+    'constructor_results', (
+        SELECT COALESCE(json_agg(to_jsonb(t) ORDER BY t."constructorResultsId"), '[]')
+        FROM constructor_results t WHERE "raceId" = :race_id
+    ),
+    'constructor_standings', (
+        SELECT COALESCE(json_agg(to_jsonb(t) ORDER BY t.position), '[]')
+        FROM constructor_standings t WHERE "raceId" = :race_id
+    )
+)::text
+FROM race
+'''
+
+DRIVER_WEEKEND_SQL = table_ctes(' AND "driverId" = :driver_id') + f'''
+SELECT d."driverId" IS NOT NULL, json_build_object('race', race.race, {ENTRY_FIELDS})::text
+FROM race
+LEFT JOIN drivers d ON d."driverId" = :driver_id{ENTRY_JOINS}
+'''
+
+
+async def get_race_weekend(db: AsyncSession, race_id: int) -> Optional[str]:
+    """JSON text of the whole weekend, None when the race does not exist."""
+    return await db.scalar(text(RACE_WEEKEND_SQL), {"race_id": race_id})
+
+
+async def get_driver_weekend(db: AsyncSession, race_id: int, driver_id: int):
+    """(driver exists, JSON text) of one driver's weekend, None when the race does not exist."""
+    row = (await db.execute(text(DRIVER_WEEKEND_SQL), {"race_id": race_id, "driver_id": driver_id})).first()
+    return tuple(row) if row else None
@@ -0,0 +1,108 @@
+"""Compare the row by row isdigit parsing with the vectorized column specs on the Ergast CSV files.
+
+The row path is what the ORM loaders used to do: iterrows() and, per value,
+int(x) if str(x).isdigit() else None, float the same way, strptime for dates and times.
+The spec path is app/csv_specs.TableSpec.coerce on the same chunks. Besides the timings
+it prints how many values the row path turned into None although they are valid
+(fractional points, negative numbers, ...) and the rejection stats of the specs.
+No database is needed, races get their year as seasonId.
+
+    python -m benchmarks.csv_parsing --data-dir ~/Downloads/f1_results
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from app.bulk_loader import CHUNK_SIZE
+from app.config import DATA_DIR
+from app.csv_specs import TABLE_SPECS, RejectionStats
+from app.models import Race
+
+
+def parse_row_value(value, kind):
+    if kind == 'int':
+        return int(value) if str(value).isdigit() else None
+    if kind == 'float':
+        return float(value) if str(value).isdigit() else None
+    if kind in ('date', 'time'):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d' if kind == 'date' else '%H:%M:%S')
+        except (ValueError, TypeError):
+            return None
+    return value.strip() if isinstance(value, str) else None
+
+
+def row_path(spec, chunks):
+    columns = [column for column in spec.columns if column.name in chunks[0]]
+    lost = 0
+    for chunk in chunks:
+        for _, row in chunk.iterrows():
+            for column in columns:
+                value = row[column.name]
+                if parse_row_value(value, column.kind) is None and pd.notna(value):
+                    lost += 1
+    return lost
+
+
+def spec_path(spec, chunks):
+    stats = RejectionStats(spec.table)
+    for chunk in chunks:
+        spec.coerce(chunk, stats)
+    return stats
+
+
+def read_chunks(spec, data_dir: str, chunk_size: int):
+    chunks = []
+    for chunk in pd.read_csv(os.path.join(data_dir, spec.file_name), chunksize=chunk_size, **spec.read_options()):
+        chunk = chunk.rename(columns=spec.rename)
+        if spec.model is Race:
+            chunk['seasonId'] = chunk['year']
+        chunks.append(chunk)
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    rejected = []
+    totals = [0, 0.0, 0.0]
+    print(f"{'table':<24}{'rows':>10}{'row s':>9}{'spec s':>9}{'speedup':>9}{'row path lost':>15}")
+    for spec in TABLE_SPECS:
+        path = os.path.join(args.data_dir, spec.file_name)
+        if not os.path.exists(path):
+            print(f"⚠️ {spec.file_name} not found, skipped")
+            continue
+        chunks = read_chunks(spec, args.data_dir, args.chunk_size)
+
+        started = time.perf_counter()
+        lost = row_path(spec, chunks)
+        row_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        stats = spec_path(spec, chunks)
+        spec_seconds = time.perf_counter() - started
+
+        rows = stats.rows
+        speedup = row_seconds / spec_seconds if spec_seconds else 0
+        print(f"{spec.table:<24}{rows:>10}{row_seconds:>9.3f}{spec_seconds:>9.3f}{speedup:>8.1f}x{lost:>15}")
+        rejected.extend(stats.lines())
+        totals[0] += rows
+        totals[1] += row_seconds
+        totals[2] += spec_seconds
+
+    rows, row_seconds, spec_seconds = totals
+    if not rows:
+        raise SystemExit(f"❌ No CSV files found in {args.data_dir}")
+    print(f"{'total':<24}{rows:>10}{row_seconds:>9.3f}{spec_seconds:>9.3f}{row_seconds / spec_seconds:>8.1f}x")
+    for line in rejected:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
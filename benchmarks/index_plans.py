@@ -0,0 +1,79 @@
+"""Show EXPLAIN ANALYZE plans for the hot filter paths with and without the composite indexes.
+
+The "before" plans are taken inside a transaction that drops the indexes and natural key
+constraints declared in app/models.py and is rolled back afterwards, so the schema is untouched.
+
+    python -m benchmarks.index_plans
+"""
+from sqlalchemy import UniqueConstraint, text
+
+from app.database import engine
+from app.models import Base
+
+QUERIES = {
+    'drivers.get_driver_race_data lap_times': '''
+        SELECT * FROM lap_times WHERE "driverId" = :driver AND "raceId" = :race
+    ''',
+    'async_crud.get_results_from_race': '''
+        SELECT * FROM results WHERE "raceId" = :race ORDER BY "positionOrder"
+    ''',
+    'async_crud.get_results_from_driver': '''
+        SELECT * FROM results WHERE "driverId" = :driver
+    ''',
+    'async_crud.get_lap_times_from_driver': '''
+        SELECT * FROM lap_times WHERE "driverId" = :driver
+    ''',
+    'async_crud.get_qualifying_from_race': '''
+        SELECT * FROM qualifying WHERE "raceId" = :race AND "driverId" = :driver
+    ''',
+    'async_crud.get_pit_stops_from_driver': '''
+        SELECT * FROM pit_stops WHERE "driverId" = :driver AND "raceId" = :race
+    ''',
+    'async_crud.get_driver_standings_from_driver': '''
+        SELECT * FROM driver_standings WHERE "driverId" = :driver
+    ''',
+}
+
+
+def explain(connection, sql: str, params: dict):
+    rows = connection.execute(text(f'EXPLAIN (ANALYZE, BUFFERS) {sql}'), params).scalars().all()
+    return '\n'.join(rows)
+
+
+def drop_declared_indexes(connection):
+    """Drop every index and unique constraint the models declare, inside the caller's transaction."""
+    quote = engine.dialect.identifier_preparer.quote
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            connection.execute(text(f'DROP INDEX IF EXISTS {quote(index.name)}'))
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.name:
+                connection.execute(text(f'ALTER TABLE {quote(table.name)} DROP CONSTRAINT IF EXISTS {quote(constraint.name)}'))
+
+
+def main():
+    with engine.connect() as connection:
+        race, driver = connection.execute(text(
+            'SELECT "raceId", "driverId" FROM lap_times ORDER BY "lapId" DESC LIMIT 1'
+        )).one()
+        params = {'race': race, 'driver': driver}
+
+        after = {name: explain(connection, sql, params) for name, sql in QUERIES.items()}
+
+        try:
+            drop_declared_indexes(connection)
+            before = {name: explain(connection, sql, params) for name, sql in QUERIES.items()}
+        finally:
+            connection.rollback()
+
+    for name in QUERIES:
+        print(f"=== {name} (raceId={race}, driverId={driver})")
+        print("--- before")
+        print(before[name])
+        print("--- after")
+        print(after[name])
+        print()
+
+
+if __name__ == "__main__":
+    main()
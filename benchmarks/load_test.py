@@ -0,0 +1,81 @@
+"""Fire concurrent GET requests at a running API and report throughput and latency.
+
+Run it against the server before and after a change, for example:
+
+    uvicorn app.main:app --port 8000 --timeout-keep-alive 60
+    python -m benchmarks.load_test --base-url http://localhost:8000 --concurrency 50 200
+
+The client is CPU bound too: at a concurrency of 200 it needs more CPU than the server it
+measures, so run it on another machine or core, otherwise the numbers drop because the server
+is starved and not because of the pool. Uvicorn closes keep-alive connections idle for 5s by
+default, a pooled client connection that waited longer fails with RemoteProtocolError, hence
+--timeout-keep-alive. The errors column counts failures by kind.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+# Mix of single row lookups, child collections of a race/driver and a deep table page
+PATHS = [
+    '/drivers/1',
+    '/races/1',
+    '/races/1/results/',
+    '/drivers/1/results',
+    '/lap_times/?limit=100',
+    '/results?race_id=1',
+    '/pit_stops?limit=100',
+    '/seasons/1/races/',
+]
+
+
+async def worker(client: httpx.AsyncClient, deadline: float, latencies: list, errors: list):
+    i = 0
+    while time.perf_counter() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(base_url: str, concurrency: int, duration: float):
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(worker(client, deadline, latencies, errors) for _ in range(concurrency)))
+
+    kinds = ', '.join(f"{kind}: {count}" for kind, count in Counter(errors).items())
+    if len(latencies) < 2:
+        print(f"{concurrency:>11}  no successful requests, {len(errors)} errors {kinds}")
+        return
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{concurrency:>11}  {len(latencies) / duration:>9.1f}  {quantiles[49] * 1000:>8.1f}  "
+          f"{quantiles[94] * 1000:>8.1f}  {quantiles[98] * 1000:>8.1f}  {len(errors):>6}  {kinds}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[50, 200])
+    parser.add_argument('--duration', type=float, default=20, help='seconds per concurrency level')
+    args = parser.parse_args()
+
+    print(f"{'concurrency':>11}  {'req/s':>9}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'errors':>6}")
+    for concurrency in args.concurrency:
+        asyncio.run(run(args.base_url, concurrency, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare the response model path with the orjson row path for a large list of lap times.
+
+The response model path validates a LapTimeResponse per ORM object and encodes the result as
+FastAPI does for a response_model. The row path is app/fast_json.encode_rows on the column
+tuples the fast list routes select. Both get the same rows, taken from lap_times and repeated
+up to --rows when the table is smaller, and must produce the same JSON.
+
+    python -m benchmarks.serialization --rows 100000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import text
+
+from app.database import engine
+from app.fast_json import encode_rows
+from app.models import LapTime
+from app.schemas import LapTimeResponse
+
+
+def sample_rows(count: int):
+    names = ", ".join(f'"{name}"' for name in LapTimeResponse.model_fields)
+    with engine.connect() as connection:
+        rows = connection.execute(text(f'SELECT {names} FROM lap_times ORDER BY "lapId" LIMIT :count'), {"count": count}).all()
+    if not rows:
+        raise SystemExit("❌ lap_times is empty, load the data first")
+    rows = [tuple(row) for row in rows]
+    return (rows * (count // len(rows) + 1))[:count]
+
+
+def response_model_path(objects):
+    adapter = TypeAdapter(List[LapTimeResponse])
+    models = adapter.validate_python(objects, from_attributes=True)
+    return json.dumps(adapter.dump_python(models, mode="json"), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def row_path(rows):
+    return encode_rows(rows, LapTimeResponse)
+
+
+def measure(function, argument, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    body = function(argument)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = sample_rows(args.rows)
+    names = tuple(LapTimeResponse.model_fields)
+    objects = [LapTime(**dict(zip(names, row))) for row in rows]
+
+    model_seconds, model_peak, model_body = measure(response_model_path, objects, args.repeat)
+    row_seconds, row_peak, row_body = measure(row_path, rows, args.repeat)
+
+    if json.loads(model_body) != json.loads(row_body):
+        raise SystemExit("❌ The row path does not produce the same JSON as the response model")
+
+    print(f"{len(rows)} lap rows, {len(row_body) / 1024 / 1024:.1f} MB of JSON, best of {args.repeat}")
+    print(f"{'path':<16} {'seconds':>8} {'peak MB':>8}")
+    print(f"{'response model':<16} {model_seconds:>8.3f} {model_peak / 1024 / 1024:>8.1f}")
+    print(f"{'orjson rows':<16} {row_seconds:>8.3f} {row_peak / 1024 / 1024:>8.1f}")
+    print(f"✅ Same JSON, {model_seconds / row_seconds:.1f}x faster with {model_peak / max(row_peak, 1):.1f}x less peak memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Count the SQL statements each GET endpoint runs and fail when one goes over its budget.
+
+Every request goes through the app in-process with the engines instrumented, so a lazy load
+that sneaks into a response schema shows up as extra statements here. Exits with status 1
+when any endpoint runs more statements than allowed.
+
+    python -m benchmarks.statement_counts
+"""
+import os
+import sys
+
+# Count what the routes themselves run, not what the response cache and the 304s save
+os.environ["CACHE_ENABLED"] = "false"
+os.environ["ETAG_ENABLED"] = "false"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+from app.database import async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+# Path template -> max statements, list routes also with their query spec filters. Child
+# collections are one statement, plus one lookup of the parent when the collection is empty.
+# Nested responses add one statement per eager loaded collection.
+BUDGETS = {
+    '/drivers/': 1,
+    '/drivers/{driver_id}': 1,
+    '/drivers/{driver_id}/results': 2,
+    '/drivers/{driver_id}/qualifying': 2,
+    '/drivers/{driver_id}/pit_stops': 2,
+    '/drivers/{driver_id}/lap_times': 2,
+    '/drivers/{driver_id}/driver_standings': 2,
+    '/drivers/{driver_id}/sprint_results': 2,
+    '/drivers/{driver_id}/races': 2,
+    '/drivers/{driver_id}/races/{race_id}/full_data/': 1,
+    '/drivers/{driver_id}/profile': 1,
+    '/drivers/{driver_id}/profile?include=results,races,seasons&season=2000': 1,
+    '/drivers/{driver_id}/stats': 1,
+    '/drivers/{driver_id}/teammates': 1,
+    '/races/': 1,
+    '/races/{race_id}': 1,
+    '/races/{race_id}/results/': 2,
+    '/races/{race_id}/qualifying/': 2,
+    '/races/{race_id}/sprint_races/': 2,
+    '/races/{race_id}/pit_stops/': 2,
+    '/races/{race_id}/lap_times/': 2,
+    '/races/{race_id}/driver_standings/': 2,
+    '/races/{race_id}/analytics/gaps': 2,
+    '/races/{race_id}/analytics/stints': 2,
+    '/races/{race_id}/fastest_lap': 1,
+    '/races/{race_id}/weekend': 1,
+    '/races/{race_id}/weekend/drivers/{driver_id}': 1,
+    '/circuits/': 1,
+    '/circuits/{circuit_id}': 2,
+    '/circuits/{circuit_id}/races/': 2,
+    '/seasons/': 1,
+    '/seasons/{season_id}': 1,
+    '/seasons/{season_id}/races/': 2,
+    '/seasons/{season_id}/fastest_laps': 2,
+    '/seasons/{season_id}/poles': 2,
+    '/seasons/{season_id}/standings/drivers': 2,
+    '/seasons/{season_id}/standings/drivers?after_round=1': 2,
+    '/seasons/{season_id}/standings/constructors': 2,
+    '/seasons/{season_id}/standings/drivers/progression': 1,
+    '/seasons/{season_id}/standings/constructors/progression': 1,
+    '/status': 3,
+    '/status/{status_id}': 1,
+    '/status/{status_id}/results/': 2,
+    '/status/{status_id}/sprint_results/': 2,
+    '/constructors/': 1,
+    '/constructors/{constructor_id}/results': 2,
+    '/constructors/{constructor_id}/qualifying': 2,
+    '/constructors/{constructor_id}/constructor_standings': 2,
+    '/constructors/{constructor_id}/constructor_results': 2,
+    '/constructors/{constructor_id}/sprint_results': 2,
+    '/constructors/{constructor_id}/stats': 1,
+    '/results': 1,
+    '/pit_stops': 1,
+    '/pit_stops/{pit_stop_id}/lap_times/': 1,
+    '/lap_times/': 1,
+    '/lap_times/?race_id={race_id}&milliseconds_lt=90000&sort=-milliseconds&fields=lap,milliseconds': 1,
+    '/results?season_gte=2000&driver_id_in={driver_id},1&sort=position': 1,
+    '/sprint_results': 1,
+    '/driver_standings?race_id={race_id}': 1,
+    '/constructor_standings': 1,
+    '/constructor_results': 1,
+    '/compare/drivers?a={driver_id}&b=1': 1,
+    '/compare/drivers?a={driver_id}&b=1&season=2009': 1,
+}
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+def sample_ids():
+    """Ids of rows that exist, taken from the newest race so child collections are not empty."""
+    with engine.connect() as connection:
+        race_id, driver_id, constructor_id, status_id = connection.execute(text(
+            'SELECT "raceId", "driverId", "constructorId", "statusId" FROM results ORDER BY "resultId" DESC LIMIT 1'
+        )).one()
+        circuit_id, season_id = connection.execute(text(
+            'SELECT "circuitId", "seasonId" FROM races WHERE "raceId" = :race'
+        ), {'race': race_id}).one()
+        pit_stop_id = connection.execute(text(
+            'SELECT MIN("pitStopId") FROM pit_stops WHERE "lapId" IS NOT NULL'
+        )).scalar()
+    return {
+        'race_id': race_id, 'driver_id': driver_id, 'constructor_id': constructor_id,
+        'status_id': status_id, 'circuit_id': circuit_id, 'season_id': season_id,
+        'pit_stop_id': pit_stop_id,
+    }
+
+
+def main():
+    counter = StatementCounter()
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, 'before_cursor_execute', counter)
+
+    ids = sample_ids()
+    failures = 0
+    print(f"{'endpoint':<55} {'status':>6} {'statements':>10} {'budget':>6}")
+    with TestClient(app) as client:
+        for template, budget in BUDGETS.items():
+            path = template.format(**ids)
+            counter.count = 0
+            response = client.get(path)
+            over = counter.count > budget
+            failures += over
+            print(f"{template:<55} {response.status_code:>6} {counter.count:>10} {budget:>6}{'  ❌' if over else ''}")
+
+    if failures:
+        print(f"❌ {failures} endpoints ran more statements than their budget")
+        sys.exit(1)
+    print("✅ All endpoints within their statement budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,22 +22,17 @@ function DriverPage() {
     setLoading(true);
     setError(null);
 
-    Promise.all([
-      fetch(`http://127.0.0.1:8000/drivers/${driverId}`).then((res) => res.json()),
-      fetch(`http://127.0.0.1:8000/drivers/${driverId}/results`).then((res) => res.json()),
-      fetch(`http://127.0.0.1:8000/drivers/${driverId}/races`).then((res) => res.json()),
-      fetch(`http://127.0.0.1:8000/drivers/${driverId}/qualifying`).then((res) => res.json()),
-      fetch(`http://127.0.0.1:8000/drivers/${driverId}/driver_standings`).then((res) => res.json()),
-      fetch(`http://127.0.0.1:8000/drivers/${driverId}/sprint_results`).then((res) => res.json()),
-      fetch(`http://127.0.0.1:8000/seasons/`).then((res) => res.json()),
-    ])
-      .then(([driverData, resultsData, racesData, qualifyingData, standingsData, sprintResultsData, seasonsData]) => {
-        setDriver(driverData);
-        setResults(resultsData);
+    fetch(`http://127.0.0.1:8000/drivers/${driverId}/profile`)
+      .then((res) => res.json())
+      .then((profile) => {
+        const racesData = profile.races;
+        const seasonsData = profile.seasons;
+        setDriver(profile.driver);
+        setResults(profile.results);
         setRaces(racesData);
-        setQualifying(qualifyingData);
-        setStandings(standingsData);
-        setSprintResults(sprintResultsData);
+        setQualifying(profile.qualifying);
+        setStandings(profile.driver_standings);
+        setSprintResults(profile.sprint_results);
 
         // Create a map for { seasonId: year }
         const seasonMap = seasonsData.reduce((acc, season) => {